@@ -9,7 +9,12 @@ cd /d "%~dp0"
 
 :: Set Python path and run the downloader with all command line arguments.
 set PYTHONPATH=%cd%
+@REM python -m src.hbp.backfill %*
 python -m src.hbp.dbpopulator %*
 @REM python -m src.hbp.downloader %*
 @REM python -m src.hbp.plotter %*
+@REM python -m src.hbp.prewarm %*
+@REM python -m src.hbp.reprocess %*
+@REM python -m src.hbp.savantloader %*
 @REM python -m src.hbp.skeeter %*
+@REM python -m src.hbp.watcher %*
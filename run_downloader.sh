@@ -9,8 +9,13 @@ cd "$(dirname "$0")"
 
 ## Set Python path and run the downloader with all command line arguments.
 export PYTHONPATH="$(pwd)"
+# python3 -m src.hbp.backfill "$@"
 # python3 -m src.hbp.dbpopulator "$@"
 python3 -m src.hbp.downloader "$@"
 # python3 -m src.hbp.plotter "$@"
+# python3 -m src.hbp.prewarm "$@"
+# python3 -m src.hbp.reprocess "$@"
+# python3 -m src.hbp.savantloader "$@"
 # python3 -m src.hbp.skeeter "$@"
+# python3 -m src.hbp.watcher "$@"
 
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+## -------------------------------------------------------------------------- ##
+## HBP Backfill
+## Loads whole seasons of HBP events. The season range is split into date
+## shards that run across a process pool; finished shards are checkpointed in
+## the database, so a crashed or interrupted backfill picks up where it left
+## off.
+## -------------------------------------------------------------------------- ##
+
+
+import argparse
+import os
+import sys
+import time
+
+# Import application modules
+from .libhbp import basic
+from .libhbp import constants as const
+from .libhbp import func_baseball as bb
+from .libhbp import func_database as dbmgr
+from .libhbp import func_general as gen
+from .libhbp import httpclient as http
+from .libhbp.configurator import ConfigReader
+from .libhbp.logger import PrintLogger
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+
+## -------------------------------------------------------------------------- ##
+## SETUP
+## -------------------------------------------------------------------------- ##
+
+## Command line parsing
+parser = argparse.ArgumentParser(
+    description="Backfills the sqlite3 database with whole seasons of HBP events."
+)
+parser.add_argument(
+    "-f",
+    "--first-season",
+    type=int,
+    default=2015,
+    help="First season to backfill. Defaults to '%(default)s'.",
+)
+parser.add_argument(
+    "-l",
+    "--last-season",
+    type=int,
+    default=date.today().year,
+    help="Last season to backfill. Defaults to '%(default)s'.",
+)
+parser.add_argument(
+    "--shard-days",
+    type=int,
+    default=None,
+    help="Number of days in each shard of work.",
+)
+parser.add_argument(
+    "-w",
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of worker processes. Defaults to one per core.",
+)
+parser.add_argument(
+    "--redo",
+    action="store_true",
+    help="Ignore checkpoints and the games ledger, and run every shard again.",
+)
+parser.add_argument(
+    "--no-cache",
+    action="store_true",
+    help="Bypass the on-disk live feed cache entirely.",
+)
+parser.add_argument(
+    "--refresh-cache",
+    action="store_true",
+    help="Re-download live feeds even if they're cached, and update the cache.",
+)
+parser.add_argument(
+    "-n",
+    "--nolog",
+    action="store_true",
+    default=None,
+    help="Disable logging.",
+)
+parser.add_argument(
+    "-v",
+    "--verbose",
+    action="store_true",
+    default=None,
+    help="Enables verbose output.",
+)
+parser.add_argument(
+    "-vv",
+    "--double-verbose",
+    action="store_true",
+    default=None,
+    help="Enables really verbose output.",
+)
+
+args = parser.parse_args()
+
+## Read and update configuration
+config = ConfigReader(basic.verify_file_path(basic.sanitize_path(const.DEFAULT_CONFIG_INI_FILE)))
+
+shard_days = int(config.get("backfill", "shard_days"))
+if args.shard_days and args.shard_days > 0:
+    config.set("backfill", "shard_days", str(args.shard_days))
+    shard_days = args.shard_days
+
+num_workers = int(config.get("backfill", "workers")) or os.cpu_count()
+if args.workers and args.workers > 0:
+    config.set("backfill", "workers", str(args.workers))
+    num_workers = args.workers
+num_workers = min(num_workers, int(config.get("backfill", "max_workers")))
+
+## One politeness budget for the whole pool, split evenly across the workers.
+requests_per_second = float(config.get("operations", "requests_per_second"))
+request_burst       = float(config.get("operations", "request_burst"))
+
+redo = False
+if args.redo:
+    redo = True
+
+use_cache = True
+if args.no_cache:
+    use_cache = False
+
+refresh_cache = False
+if args.refresh_cache:
+    refresh_cache = True
+
+verbose = bool(int(config.get("operations", "verbose_output")))
+if args.verbose:
+    config.set("operations", "verbose_output", "1")
+    verbose = True
+
+double_verbose = bool(int(config.get("operations", "double_verbose")))
+if args.double_verbose:
+    config.set("operations", "verbose_output", "1")
+    config.set("operations", "double_verbose", "1")
+    verbose        = True
+    double_verbose = True
+
+## Set up logging
+if not args.nolog:
+    sys.stdout = PrintLogger(
+        config.get("paths", "log_dir"),
+        config.get("logging", "backfill_prefix"),
+    )
+
+
+## -------------------------------------------------------------------------- ##
+## HELPER FUNCTIONS
+## -------------------------------------------------------------------------- ##
+
+def init_worker(worker_rate: float, worker_burst: float):
+    ## Don't share the parent's HTTP connections across the fork.
+    http.reset_session()
+    http.set_rate_limit(worker_rate, worker_burst)
+
+
+def populate_game(game: list):
+    """Retry queue handler: fetches one game again and writes its HBPs."""
+    games_and_events = [bb.collect_mlb_game(game, double_verbose, use_cache, refresh_cache)]
+    dbmgr.insert_rows(games_and_events)
+    dbmgr.set_games_processed(games_and_events, "populated")
+
+
+def run_shard(shard_start: str, shard_end: str) -> list:
+    """Runs in a worker process. Fetches everything; the parent does the writing."""
+    date_list = gen.build_date_list(shard_start, (gen.parse_date_string(shard_end) - gen.parse_date_string(shard_start)).days + 1)
+    date_list = bb.filter_mlb_game_dates(date_list, double_verbose)
+    return bb.collect_mlb_hit_by_pitch_events_for_dates(date_list, double_verbose, use_cache, refresh_cache, not redo)
+
+
+## -------------------------------------------------------------------------- ##
+## MAIN ACTION
+## -------------------------------------------------------------------------- ##
+
+def main() -> int:
+    try:
+        print()
+
+        if verbose:
+            print(config.get_all())
+            print()
+
+        print("="*80)
+        print(f" ⚾ {config.get('app', 'name')} ⚾ ~~> 🗄️ Backfill")
+        print("="*80)
+        start_time = time.time()
+
+        recovered, failed_again = bb.retry_failed_mlb_games("populated", populate_game, double_verbose)
+        if recovered or failed_again:
+            print(f"🔁 Retried queued games: {recovered} recovered, {failed_again} still failing.")
+
+        ## Fetch the season calendars up front, so the workers all find them on disk.
+        for season in range(args.first_season, args.last_season + 1):
+            bb.get_mlb_season_calendar(season, double_verbose)
+
+        shards = gen.build_season_shards(args.first_season, args.last_season, shard_days)
+        if not redo:
+            shard_status = dbmgr.get_backfill_shard_status()
+            shards       = [shard for shard in shards if shard_status.get(shard) != "complete"]
+        print(f"🗄️ {len(shards)} shards of up to {shard_days} days to go for {args.first_season}-{args.last_season}, using {num_workers} workers at {requests_per_second} requests/second between them.")
+        print()
+
+        total_hbp_events = 0
+        failed_shards    = 0
+        partial_shards   = 0
+        executor         = ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=init_worker,
+            initargs=(requests_per_second / num_workers, max(1.0, request_burst / num_workers)),
+        )
+        try:
+            futures = {executor.submit(run_shard, *shard): shard for shard in shards}
+            for xshard, future in enumerate(as_completed(futures)):
+                shard_start, shard_end = futures[future]
+                try:
+                    games_and_events, failed_games = future.result()
+                except Exception as e:
+                    failed_shards = failed_shards + 1
+                    dbmgr.set_backfill_shard_status(shard_start, shard_end, "failed")
+                    print(f"[ERROR] [{xshard+1}/{len(shards)}] {shard_start} → {shard_end} failed: {e}")
+                    continue
+
+                hbp_count = sum(len(hbp_events) for game_deets, hbp_events in games_and_events)
+                new_rows  = dbmgr.insert_rows(games_and_events)
+                dbmgr.set_games_processed(games_and_events, "populated")
+                dbmgr.clear_fetch_retries([game_deets.game_pk for game_deets, hbp_events in games_and_events], "populated")
+                ## A shard with games missing isn't done. The retry queue gets
+                ## the first shot at them, but once it gives up, resuming the
+                ## backfill is what picks them back up; the ledger makes sure
+                ## only the missing games are fetched again.
+                shard_state = "partial" if failed_games else "complete"
+                dbmgr.set_backfill_shard_status(shard_start, shard_end, shard_state, hbp_count)
+                for game_pk, game_date, error in failed_games:
+                    dbmgr.queue_fetch_retry(game_pk, game_date, "populated", error)
+                total_hbp_events = total_hbp_events + hbp_count
+                print(f"✅ [{xshard+1}/{len(shards)}] {shard_start} → {shard_end}: {len(games_and_events)} games, {hbp_count} HBPs ({new_rows} new).")
+                if failed_games:
+                    partial_shards = partial_shards + 1
+                    print(f"  [WARNING] {len(failed_games)} games failed and were queued for a retry; the shard will be redone next run.")
+        except KeyboardInterrupt:
+            print("🛑 Interrupted! Finished shards are checkpointed; run again to resume.")
+            executor.shutdown(wait=False, cancel_futures=True)
+            return 1
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        print()
+        if failed_shards > 0:
+            print(f"[WARNING] {failed_shards} shards failed; run again to retry them.")
+        if partial_shards > 0:
+            print(f"[WARNING] {partial_shards} shards are missing games; run again to pick them up.")
+        print(f"⚾💥 Captured {total_hbp_events} during this run.")
+
+        print()
+        end_time = time.time()
+        elapsed = end_time - start_time
+        print("="*80)
+        print(f'Completed in {elapsed:.2f} seconds')
+        print("="*80)
+        print()
+        return 0
+
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
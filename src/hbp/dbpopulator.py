@@ -8,6 +8,7 @@
 
 
 import argparse
+import asyncio
 import pprint
 import sys
 import time
@@ -19,9 +20,13 @@ from .libhbp import func_general as gen
 from .libhbp import func_baseball as bb
 
 from .libhbp import basic
+from .libhbp import httpclient as http
 from .libhbp.configurator import ConfigReader
 from .libhbp.logger import PrintLogger
+from .libhbp.models import GameInfo
+from .libhbp.ratelimiter import TokenBucket
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -55,6 +60,35 @@ parser.add_argument(
     default=1,
     help="Number of days to check for HBP events. Defaults to '%(default)s'.",
 )
+parser.add_argument(
+    "-c",
+    "--concurrency",
+    type=int,
+    default=None,
+    help="Number of schedules/feeds to fetch at once. Anything over 1 switches to async mode.",
+)
+parser.add_argument(
+    "--redo",
+    action="store_true",
+    help="Process games again even if the games ledger says they're done.",
+)
+parser.add_argument(
+    "--statcast",
+    action="store_true",
+    help="Bulk load the date range from Statcast instead of going game by game through live feeds. "
+         "Statcast has no play_ids, so each game with an HBP still needs its live feed; "
+         "on a cold feed cache this isn't faster than the default.",
+)
+parser.add_argument(
+    "--no-cache",
+    action="store_true",
+    help="Bypass the on-disk live feed and Statcast caches entirely.",
+)
+parser.add_argument(
+    "--refresh-cache",
+    action="store_true",
+    help="Re-download live feeds even if they're cached, and update the cache.",
+)
 parser.add_argument(
     "-n",
     "--nolog",
@@ -88,7 +122,13 @@ args = parser.parse_args()
 ## Read and update configuration
 config = ConfigReader(basic.verify_file_path(basic.sanitize_path(const.DEFAULT_CONFIG_INI_FILE)))
 
-sleep_time = float(config.get("operations", "sleep_time"))
+requests_per_second = float(config.get("operations", "requests_per_second"))
+request_burst       = float(config.get("operations", "request_burst"))
+
+concurrency = int(config.get("operations", "concurrency"))
+if args.concurrency and args.concurrency > 0:
+    config.set("operations", "concurrency", str(args.concurrency))
+    concurrency = args.concurrency
 
 start_date = datetime.strftime(datetime.now() - timedelta(days=1), '%Y-%m-%d')
 if args.start_date:
@@ -102,6 +142,22 @@ backward = False
 if args.backward:
     backward = True
 
+redo = False
+if args.redo:
+    redo = True
+
+use_statcast = False
+if args.statcast:
+    use_statcast = True
+
+use_cache = True
+if args.no_cache:
+    use_cache = False
+
+refresh_cache = False
+if args.refresh_cache:
+    refresh_cache = True
+
 test_mode = bool(int(config.get("operations", "test_mode")))
 if args.test_mode:
     config.set("operations", "test_mode", "1")
@@ -127,6 +183,132 @@ if not args.nolog:
     )
 
 
+## -------------------------------------------------------------------------- ##
+## HELPER FUNCTIONS
+## -------------------------------------------------------------------------- ##
+
+def collect_game(game: list) -> tuple:
+    """
+    Pulls out a game's details and HBP events, fetching its feed at most once.
+    If that fails, the game goes on the retry queue and None comes back; if
+    it works, the game comes off the queue.
+    """
+    try:
+        return bb.collect_mlb_game(game, double_verbose, use_cache, refresh_cache, "populated")
+    except Exception as e:
+        attempts = dbmgr.queue_fetch_retry(game['gamePk'], game['officialDate'], "populated", e)
+        print(f"[ERROR] Couldn't fetch game {game['gamePk']}, queued retry {attempts}: {e}")
+        return None
+
+
+def populate_game(game: list):
+    """Retry queue handler. Raises if the game still can't be fetched."""
+    game_deets, hbp_events = bb.collect_mlb_game(game, double_verbose, use_cache, refresh_cache)
+    record_game(game_deets, hbp_events, 0)
+    dbmgr.set_games_processed([(game_deets, hbp_events)], "populated")
+
+
+def record_game(game_deets: GameInfo, hbp_events: list, hbp_count: int) -> int:
+    """Writes a game's HBP events to the database. Returns the running count."""
+    if double_verbose:
+        print("@ --------- GAME DEETS --------- ")
+        pprint.pprint(game_deets)
+        print("@ --------- HBP EVENTS --------- ")
+        pprint.pprint(hbp_events)
+        print("@ ------------ END ------------- ")
+        print()
+    ## "HBP EVENT" FOR LOOP
+    ## Loops through all the HBP events.
+    for j, event in enumerate(hbp_events):        
+        try:
+            dbinsert_result = dbmgr.insert_row(game_deets, event)
+            hbp_count = hbp_count + 1
+
+            if dbinsert_result:
+                print(f"  {hbp_count:02}. 👍 HBP {event.play_id} added to database.")
+            else:
+                print(f"  {hbp_count:02}. 🦋 HBP {event.play_id} is already in the database.", end='')
+                if dbmgr.has_been_downloaded(event.play_id):
+                    print(f" (dl)", end='')
+                if dbmgr.has_been_analyzed(event.play_id):
+                    print(f" (nz)", end='')
+                if dbmgr.has_been_skeeted(event.play_id):
+                    print(f" (sk)", end='')
+                print()                            
+        except KeyboardInterrupt:
+            dbmgr.remove_row(event.play_id)
+    return hbp_count
+
+
+def populate_sequentially(games_by_date: dict, limiter: TokenBucket) -> int:
+    total_hbp_events = 0
+    for xday, (game_date, mlb_games) in enumerate(games_by_date.items()):
+        print(f'⚾ [{xday+1}/{len(games_by_date)}] Found {len(mlb_games)} games on {game_date}. ⚾')
+    
+        ## "GAME" FOR LOOP
+        ## Loops through all the games for the day.
+        hbp_count = 0
+        for i, game in enumerate(mlb_games):
+            if bb.mlb_game_needs_feed(game):
+                limiter.acquire()
+            game_data = collect_game(game)
+            if game_data is None:
+                continue
+            game_deets, hbp_events = game_data
+            hbp_count = record_game(game_deets, hbp_events, hbp_count)
+            dbmgr.set_games_processed([(game_deets, hbp_events)], "populated")
+        print(f"💥 There were {hbp_count} total HBP events for this day. 💥")
+        print()
+        total_hbp_events = total_hbp_events + hbp_count
+    return total_hbp_events
+
+
+async def populate_concurrently(games_by_date: dict, limiter: TokenBucket, concurrency: int) -> int:
+    """
+    Fetches every feed in the date range at once, never more than
+    'concurrency' in flight. Results are still written day by day, game by
+    game, in schedule order, so the database ends up the same as a sequential
+    run.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+
+    async def throttled(func, *func_args):
+        async with semaphore:
+            await limiter.acquire_async()
+            return await asyncio.to_thread(func, *func_args)
+
+    async def fetch_game(game: list) -> tuple:
+        ## Games the schedule already rules out don't cost a request, so they
+        ## skip the limiter, but still stay off the event loop.
+        if not bb.mlb_game_needs_feed(game):
+            return await asyncio.to_thread(collect_game, game)
+        return await throttled(collect_game, game)
+
+    async def fetch_day(mlb_games: list) -> list:
+        return await asyncio.gather(*(fetch_game(game) for game in mlb_games))
+
+    day_tasks = [asyncio.create_task(fetch_day(mlb_games)) for mlb_games in games_by_date.values()]
+
+    total_hbp_events = 0
+    try:
+        for xday, (game_date, mlb_games) in enumerate(games_by_date.items()):
+            game_data = [collected for collected in await day_tasks[xday] if collected is not None]
+            print(f'⚾ [{xday+1}/{len(games_by_date)}] Found {len(mlb_games)} games on {game_date}. ⚾')
+
+            hbp_count = 0
+            for game_deets, hbp_events in game_data:
+                hbp_count = record_game(game_deets, hbp_events, hbp_count)
+            dbmgr.set_games_processed(game_data, "populated")
+            print(f"💥 There were {hbp_count} total HBP events for this day. 💥")
+            print()
+            total_hbp_events = total_hbp_events + hbp_count
+    finally:
+        for day_task in day_tasks:
+            day_task.cancel()
+    return total_hbp_events
+
+
 ## -------------------------------------------------------------------------- ##
 ## MAIN ACTION
 ## -------------------------------------------------------------------------- ##
@@ -144,57 +326,48 @@ def main(start_date: Optional[str] = None) -> int:
         print("="*80)
         start_time = time.time()
 
-        total_hbp_events = 0
-        for xday in range(num_days):
-            print(f'⚾ [{xday+1}/{num_days}] Checking {start_date} for games...', end='')
-            mlb_games = bb.get_mlb_games_for_date(start_date)
-            print(f'found {len(mlb_games)} games that day. ⚾')
-        
-            ## "GAME" FOR LOOP
-            ## Loops through all the games for the day.
-            hbp_count = 0
-            for i, game in enumerate(mlb_games):
-                game_deets = bb.get_mlb_game_deets(game, double_verbose) 
-                hbp_events = bb.get_mlb_hit_by_pitch_events_from_single_game(game, double_verbose)       
-        
-                if double_verbose:
-                    print("@ --------- GAME DEETS --------- ")
-                    pprint.pprint(game_deets)
-                    print("@ --------- HBP EVENTS --------- ")
-                    pprint.pprint(hbp_events)
-                    print("@ ------------ END ------------- ")
-                    print()
-                ## "HBP EVENT" FOR LOOP
-                ## Loops through all the HBP events.
-                for j, event in enumerate(hbp_events):        
-                    try:
-                        dbinsert_result = dbmgr.insert_row(game_deets, event)
-                        hbp_count = hbp_count + 1
-
-                        if dbinsert_result:
-                            print(f"  {hbp_count:02}. 👍 HBP {event['play_id']} added to database.")
-                        else:
-                            print(f"  {hbp_count:02}. 🦋 HBP {event['play_id']} is already in the database.", end='')
-                            if dbmgr.has_been_downloaded(event['play_id']):
-                                print(f" (dl)", end='')
-                            if dbmgr.has_been_analyzed(event['play_id']):
-                                print(f" (nz)", end='')
-                            if dbmgr.has_been_skeeted(event['play_id']):
-                                print(f" (sk)", end='')
-                            print()                            
-                    except KeyboardInterrupt:
-                        dbmgr.remove_row(event['play_id'])
-                time.sleep(sleep_time)
-            print(f"💥 There were {hbp_count} total HBP events for this day. 💥")
-            print()
-            total_hbp_events = total_hbp_events + hbp_count
+        date_list = gen.build_date_list(start_date, num_days, backward)
+        limiter   = TokenBucket(requests_per_second, request_burst)
+
+        if use_statcast:
+            ## pybaseball and pandas are heavy; only load them when asked to.
+            from .libhbp import func_statcast as sc
+            first_date, last_date = min(date_list), max(date_list)
+            print(f'📦 Bulk loading Statcast HBPs from {first_date} through {last_date}...')
+            total_hbp_events, new_rows = sc.populate_from_statcast(
+                first_date,
+                last_date,
+                use_cache=use_cache,
+                verbose_bool=verbose,
+                limiter=limiter,
+                lookup_workers=concurrency,
+            )
+            print(f"📦 {new_rows} of them are new to the database.")
+        else:
+            recovered, failed_again = bb.retry_failed_mlb_games("populated", populate_game, double_verbose)
+            if recovered or failed_again:
+                print(f"🔁 Retried queued games: {recovered} recovered, {failed_again} still failing.")
+
+            game_dates = bb.filter_mlb_game_dates(date_list, double_verbose)
+            print(f'📅 {len(game_dates)} of the {len(date_list)} days from {date_list[0]} through {date_list[-1]} have games.')
+            print(f'⚾ Checking them for games...', end='')
+            if game_dates:
+                limiter.acquire()
+            games_by_date = bb.get_mlb_games_for_dates(game_dates, double_verbose, refresh_cache)
+            print(f'found {sum(len(mlb_games) for mlb_games in games_by_date.values())} games. ⚾')
+            if not redo:
+                games_by_date, skipped_games = bb.drop_processed_mlb_games(games_by_date, "populated")
+                if skipped_games > 0:
+                    print(f"⏭️ Skipping {skipped_games} games that were already populated.")
 
-            if backward:
-                start_date = gen.subtract_one_day_from_date(start_date)
+            if concurrency > 1:
+                print(f"🚀 Async mode: up to {concurrency} requests in flight, {requests_per_second} requests/second.")
+                total_hbp_events = asyncio.run(populate_concurrently(games_by_date, limiter, concurrency))
             else:
-                start_date = gen.add_one_day_to_date(start_date)
+                total_hbp_events = populate_sequentially(games_by_date, limiter)
         
         print(f"⚾💥 Captured {total_hbp_events} during this run.")
+        print(f"🌐 HTTP concurrency: {http.concurrency_summary()}.")
 
         print()
         end_time = time.time()
@@ -20,8 +20,10 @@ from .libhbp import func_baseball as bb
 from .libhbp import func_database as dbmgr
 from .libhbp import func_general as gen
 from .libhbp import func_skeet as sk
+from .libhbp import httpclient as http
 from .libhbp.configurator import ConfigReader
 from .libhbp.logger import PrintLogger
+from .libhbp.videopool import VideoDownloadPool
 
 from datetime import date, datetime, timedelta
 from typing import Optional
@@ -61,6 +63,28 @@ parser.add_argument(
     action="store_true",
     help="Skips video download for each HBP.",
 )
+parser.add_argument(
+    "-w",
+    "--video-workers",
+    type=int,
+    default=None,
+    help="Number of videos to download at once.",
+)
+parser.add_argument(
+    "--redo",
+    action="store_true",
+    help="Process games again even if the games ledger says they're done.",
+)
+parser.add_argument(
+    "--no-cache",
+    action="store_true",
+    help="Bypass the on-disk live feed cache entirely.",
+)
+parser.add_argument(
+    "--refresh-cache",
+    action="store_true",
+    help="Re-download live feeds even if they're cached, and update the cache.",
+)
 parser.add_argument(
     "-n",
     "--nolog",
@@ -98,6 +122,14 @@ backward = False
 if args.backward:
     backward = True
 
+use_cache = True
+if args.no_cache:
+    use_cache = False
+
+refresh_cache = False
+if args.refresh_cache:
+    refresh_cache = True
+
 start_date = datetime.strftime(datetime.now() - timedelta(days=1), '%Y-%m-%d')
 if args.start_date:
     start_date = args.start_date
@@ -110,6 +142,15 @@ skip_video_dl = False
 if args.skip_video_dl:
     skip_video_dl = True
 
+video_workers = int(config.get("operations", "video_workers"))
+if args.video_workers and args.video_workers > 0:
+    config.set("operations", "video_workers", str(args.video_workers))
+    video_workers = args.video_workers
+
+redo = False
+if args.redo:
+    redo = True
+
 test_mode = bool(int(config.get("operations", "test_mode")))
 if args.test_mode:
     config.set("operations", "test_mode", "1")
@@ -138,6 +179,105 @@ if not args.nolog:
 skeet_dir = config.get("paths", "skeet_dir")
 video_dir = config.get("paths", "video_dir")
 
+## Videos download in the background while the next games are processed.
+## Games wait here, keyed by game_pk, until all their videos are in.
+video_pool    = VideoDownloadPool(video_workers, video_dir, verbose)
+pending_games = {}
+
+
+## -------------------------------------------------------------------------- ##
+## HELPER FUNCTIONS
+## -------------------------------------------------------------------------- ##
+
+def download_game(game: list, game_data: tuple, i: int) -> int:
+    """
+    Writes the skeets for one game, records its HBPs, and hands their videos
+    to the download pool. Returns the number of HBP events.
+    """
+    game_deets, hbp_events = game_data
+
+    if double_verbose:
+        print("@ --------- GAME DEETS --------- ")
+        pprint.pprint(game_deets)
+        print("@ --------- HBP EVENTS --------- ")
+        pprint.pprint(hbp_events)
+        print("@ ------------ END ------------- ")
+        print()
+
+    ## Nobody got hit during this game....
+    if hbp_events is None or len(hbp_events) == 0:
+        skeet_filename = sk.write_desc_skeet_text(game_deets, [], skeet_dir, double_verbose)
+        if verbose:
+            print(f"{i + 1}. Skeet File: {skeet_filename}")
+        skeet_text = sk.read_skeet_text(skeet_filename)
+        print(f"{skeet_text}")
+        print()
+        if not test_mode:
+            dbmgr.set_games_processed([(game_deets, [])], "downloaded")
+        return 0
+    
+    ## "HBP EVENT" FOR LOOP
+    ## Loops through all the HBP events.
+    for j, event in enumerate(hbp_events):      
+        ## Check if event is already in database. If not, add it.
+        dbdata = dbmgr.get_hbp_play_data(event.play_id)
+        if len(dbdata) == 0:
+            dbinsert_result = dbmgr.insert_row(game_deets, event)
+            if dbinsert_result:
+                print(f"👍 HBP {event.play_id} added to database.")
+            else:
+                raise Exception("Something is definitely wrong with the database file.")
+
+        ## Generate skeet
+        skeet_filename = sk.write_desc_skeet_text(game_deets, event, skeet_dir, double_verbose)
+        if verbose:
+            print(f"{i + 1}. Skeet File: {skeet_filename}")
+        ## Print skeet to screen
+        skeet_text = sk.read_skeet_text(skeet_filename)
+        print(f"{skeet_text}")
+        
+        ## Finally, download the video.    
+        if event.play_id is None or event.play_id == '':
+            print(f"😢 Video unavailable.")
+        else:
+            ## download video
+            if test_mode:
+                print("Pretending to download video....")
+            elif skip_video_dl:
+                pass
+            else:
+                video_pool.submit(game['gamePk'], event.play_id)
+
+        print()
+
+    if not test_mode:
+        pending_games[game_deets.game_pk] = (game_deets, hbp_events)
+    return len(hbp_events)
+
+
+def collect_videos(block: Optional[bool] = False):
+    """
+    Flags the videos the pool has finished since last time, then marks games
+    downloaded once every one of their videos made it, so a rerun retries
+    the rest. With block set, waits for every outstanding video first.
+    """
+    for result in video_pool.completed(block):
+        if result.ok:
+            dbmgr.set_download_flag(result.play_id)
+            print(f"VIDEO: {result.path}")
+        else:
+            print(f"😢 Video for {result.play_id} didn't download: {result.error}")
+
+    for game_pk, (game_deets, hbp_events) in list(pending_games.items()):
+        if all(event.play_id is None or dbmgr.has_been_downloaded(event.play_id) for event in hbp_events):
+            dbmgr.set_games_processed([(game_deets, hbp_events)], "downloaded")
+            del pending_games[game_pk]
+
+
+def download_retried_game(game: list):
+    """Retry queue handler. Raises if the game still can't be fetched."""
+    download_game(game, bb.collect_mlb_game(game, double_verbose, use_cache, refresh_cache), 0)
+
 
 ## -------------------------------------------------------------------------- ##
 ## MAIN ACTION
@@ -159,91 +299,59 @@ def main(start_date: Optional[str] = None) -> int:
         if start_date == date(2025, 11, 1):
             print(f"Given start date, {start_date}, is the default date.")
             start_date = dbmgr.get_latest_date_that_hasnt_been_downloaded()
+            if start_date is None:
+                start_date = bb.get_latest_mlb_game_date(gen.subtract_one_day_from_date(date.today().strftime("%Y-%m-%d")), double_verbose)
             print(f"New starting date: {start_date}")
             print()
 
+        recovered, failed_again = bb.retry_failed_mlb_games("downloaded", download_retried_game, double_verbose)
+        if recovered or failed_again:
+            print(f"🔁 Retried queued games: {recovered} recovered, {failed_again} still failing.")
+            print()
+
+        date_list  = gen.build_date_list(start_date, num_days, backward)
+        game_dates = bb.filter_mlb_game_dates(date_list, double_verbose)
+        print(f'📅 {len(game_dates)} of the {len(date_list)} days from {date_list[0]} through {date_list[-1]} have games.')
+        print(f'⚾ Checking them for games...', end='')
+        games_by_date = bb.get_mlb_games_for_dates(game_dates, double_verbose, refresh_cache)
+        print(f'found {sum(len(mlb_games) for mlb_games in games_by_date.values())} games. ⚾')
+        if not redo:
+            games_by_date, skipped_games = bb.drop_processed_mlb_games(games_by_date, "downloaded")
+            if skipped_games > 0:
+                print(f"⏭️ Skipping {skipped_games} games that were already downloaded.")
+        print()
+
         total_hbp_events = 0
-        for xday in range(num_days):
+        for game_date, mlb_games in games_by_date.items():
             print("--->")
-            print(f'⚾ Checking {start_date} for games...', end='')
-            mlb_games = bb.get_mlb_games_for_date(start_date)
-            print(f'found {len(mlb_games)} games that day. ⚾')
+            print(f'⚾ Found {len(mlb_games)} games on {game_date}. ⚾')
             print()
         
             ## "GAME" FOR LOOP
             ## Loops through all the games for the day.
             hbp_count = 0
             for i, game in enumerate(mlb_games):
-                game_deets = bb.get_mlb_game_deets(game, double_verbose) 
-                hbp_events = bb.get_mlb_hit_by_pitch_events_from_single_game(game, double_verbose)       
-        
-                if double_verbose:
-                    print("@ --------- GAME DEETS --------- ")
-                    pprint.pprint(game_deets)
-                    print("@ --------- HBP EVENTS --------- ")
-                    pprint.pprint(hbp_events)
-                    print("@ ------------ END ------------- ")
-                    print()
-
-                ## Nobody got hit during this game....
-                if hbp_events is None or len(hbp_events) == 0:
-                    skeet_filename = sk.write_desc_skeet_text(game_deets, [], skeet_dir, double_verbose)
-                    if verbose:
-                        print(f"{i + 1}. Skeet File: {skeet_filename}")
-                    skeet_text = sk.read_skeet_text(skeet_filename)
-                    print(f"{skeet_text}")
+                try:
+                    game_data = bb.collect_mlb_game(game, double_verbose, use_cache, refresh_cache, "downloaded")
+                except Exception as e:
+                    attempts = dbmgr.queue_fetch_retry(game['gamePk'], game['officialDate'], "downloaded", e)
+                    print(f"[ERROR] Couldn't fetch game {game['gamePk']}, queued retry {attempts}: {e}")
                     print()
                     continue
-                
-                ## "HBP EVENT" FOR LOOP
-                ## Loops through all the HBP events.
-                for j, event in enumerate(hbp_events):      
-                    hbp_count = hbp_count + 1
-                    
-                    ## Check if event is already in database. If not, add it.
-                    dbdata = dbmgr.get_hbp_play_data(event['play_id'])
-                    if len(dbdata) == 0:
-                        dbinsert_result = dbmgr.insert_row(game_deets, event)
-                        if dbinsert_result:
-                            print(f"👍 HBP {event['play_id']} added to database.")
-                        else:
-                            raise Exception("Something is definitely wrong with the database file.")
-
-                    ## Generate skeet
-                    skeet_filename = sk.write_desc_skeet_text(game_deets, event, skeet_dir, double_verbose)
-                    if verbose:
-                        print(f"{i + 1}. Skeet File: {skeet_filename}")
-                    ## Print skeet to screen
-                    skeet_text = sk.read_skeet_text(skeet_filename)
-                    print(f"{skeet_text}")
-                    
-                    ## Finally, download the video.    
-                    if event['play_id'] is None or event['play_id'] == '':
-                        print(f"😢 Video unavailable.")
-                    else:
-                        ## download video
-                        if test_mode:
-                            print("Pretending to download video....")
-                        elif skip_video_dl:
-                            pass
-                        else:
-                            video_filename = gen.download_baseball_savant_play(game['gamePk'], event['play_id'], verbose)
-                            print(f"VIDEO: {video_filename}")
-                            
-                            if os.path.exists(video_filename):
-                                dbmgr.set_download_flag(event['play_id'])                         
-
-                    print()
+                hbp_count = hbp_count + download_game(game, game_data, i)
+                collect_videos()
             print(f"💥 There were {hbp_count} total HBP events for this day. 💥")
             print("<---\n")
             total_hbp_events = total_hbp_events + hbp_count
-
-            if backward:
-                start_date = gen.subtract_one_day_from_date(start_date)
-            else:
-                start_date = gen.add_one_day_to_date(start_date)
         
+        if video_pool.pending > 0:
+            print(f"🎥 Waiting on {video_pool.pending} videos...")
+        collect_videos(block=True)
+        video_pool.close()
+
         print(f"⚾💥 Captured {total_hbp_events} during this run.")
+        print(f"🎥 Videos: {video_pool.summary()}.")
+        print(f"🌐 HTTP concurrency: {http.concurrency_summary()}.")
 
         print()
         end_time = time.time()
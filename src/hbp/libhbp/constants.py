@@ -18,9 +18,31 @@ SKEETS_VIDEO_LIMIT = 1000000  ## bytes
 BASEBALL_SAVANT_PLAY_VIDEO_URL = 'https://baseballsavant.mlb.com/sporty-videos'
 MLB_STATS_BASE_URL             = 'https://statsapi.mlb.com'
 MLB_STATS_SCHEDULE_STUB        = '/api/v1/schedule'
+MLB_STATS_SCHEDULE_HYDRATE     = 'linescore,boxscore'
+## Keeps the hydrated boxscore down to its team HBP counts; without it every
+## player's stats line comes along for every game. statsapi matches these
+## names at any depth, so this is everything we read out of a schedule entry.
+MLB_STATS_SCHEDULE_FIELDS      = ','.join([
+    'dates', 'date', 'games', 'gamePk', 'gameDate', 'officialDate', 'seriesDescription',
+    'status', 'abstractGameState', 'teams', 'home', 'away', 'team', 'name', 'score',
+    'leagueRecord', 'wins', 'losses', 'pct',
+    'linescore', 'innings', 'num', 'currentInning',
+    'boxscore', 'teamStats', 'batting', 'hitByPitch',
+])
 MLB_STATS_GAME_STUB            = '/api/v1/game/<<GAME_PK>>/content'
 MLB_STATS_LIVE_FEED_STUB       = '/api/v1.1/game/<<GAME_PK>>/feed/live'
+MLB_STATS_LIVE_DIFF_STUB       = '/api/v1.1/game/<<GAME_PK>>/feed/live/diffPatch'
 MLB_STATS_PLAYER_STUB          = '/api/v1/people/<<PLAYER_ID>>'
+MLB_STATS_PEOPLE_STUB          = '/api/v1/people'
+MLB_STATS_PEOPLE_BATCH_SIZE    = 50
+MLB_STATS_ROSTER_STUB          = '/api/v1/teams/<<TEAM_ID>>/roster'
+
+
+## ---------------------------------------------------------------------------->
+## Regular season + postseason window, used to skip the winter when backfilling.
+## ---------------------------------------------------------------------------->
+SEASON_START_MONTH_DAY = '03-01'
+SEASON_END_MONTH_DAY   = '11-30'
 
 
 ## ---------------------------------------------------------------------------->
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+import gzip
+import os
+import tempfile
+import threading
+
+from pathlib import Path
+from typing import Optional
+
+from .models import loads
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+
+FEED_EXTENSIONS = (".json.zst", ".json.gz", ".json")
+
+
+def read_feed_file(path: str) -> bytes:
+    """
+    Reads a single archived feed, compressed by FeedCache or not, and returns
+    the raw JSON bytes.
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        blob = f.read()
+    if path.name.endswith(".zst"):
+        if zstd is None:
+            raise RuntimeError(f"'{path}' is zstd-compressed but zstandard isn't installed.")
+        return zstd.ZstdDecompressor().decompressobj().decompress(blob)
+    if path.name.endswith(".gz"):
+        return gzip.decompress(blob)
+    return blob
+
+
+class FeedCache:
+    def __init__(self, cache_dir: str, max_mb: Optional[float] = 2048, compression: Optional[str] = "zstd"):
+        """
+        On-disk cache of raw live feeds, one compressed file per game_pk. Only
+        feeds for finished games belong in here; they don't change anymore.
+        Once the cache grows past max_mb, the least recently used feeds are
+        evicted.
+
+        :param cache_dir: Directory holding the cached feeds.
+        :param max_mb: Size cap for the whole cache, in megabytes.
+        :param compression: 'zstd' or 'gzip'. Falls back to gzip if the
+                            zstandard package isn't installed.
+        """
+        self.cache_dir   = Path(cache_dir)
+        self.max_bytes   = int(float(max_mb) * 1024 * 1024)
+        self.compression = "zstd" if compression == "zstd" and zstd is not None else "gzip"
+        self.extension   = ".json.zst" if self.compression == "zstd" else ".json.gz"
+        self._lock       = threading.Lock()
+        self._size       = None
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path_for(self, game_pk: int, extension: Optional[str] = None) -> Path:
+        return Path(self.cache_dir, f"{game_pk}{extension or self.extension}")
+
+    def _find(self, game_pk: int) -> Path:
+        """Finds a cached feed, whichever compression it was written with."""
+        for extension in (self.extension, ".json.zst", ".json.gz"):
+            path = self._path_for(game_pk, extension)
+            if path.is_file():
+                return path
+        return None
+
+    def _compress(self, raw: bytes) -> bytes:
+        if self.compression == "zstd":
+            return zstd.ZstdCompressor(level=10).compress(raw)
+        return gzip.compress(raw, compresslevel=6)
+
+    def has(self, game_pk: int) -> bool:
+        return self._find(game_pk) is not None
+
+    def get_raw(self, game_pk: int) -> bytes:
+        """Returns the uncompressed feed bytes, or None on a cache miss."""
+        path = self._find(game_pk)
+        if path is None:
+            return None
+        try:
+            raw = read_feed_file(path)
+        except Exception as e:
+            print(f"[WARNING] Dropping unreadable cached feed '{path}': {e}")
+            self.remove(game_pk)
+            return None
+
+        ## Bump the mtime so eviction treats this feed as recently used.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return raw
+
+    def get(self, game_pk: int) -> dict:
+        """Returns the decoded feed, or None on a cache miss."""
+        raw = self.get_raw(game_pk)
+        if raw is None:
+            return None
+        return loads(raw)
+
+    def put(self, game_pk: int, raw: bytes) -> Path:
+        """Stores the raw feed bytes for a game. Writes are atomic."""
+        blob = self._compress(raw)
+        path = self._path_for(game_pk)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{game_pk}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            with self._lock:
+                previous = self._find(game_pk)
+                if previous is not None:
+                    if self._size is not None:
+                        self._size -= previous.stat().st_size
+                    if previous != path:
+                        os.remove(previous)
+                os.replace(tmp_path, path)
+                if self._size is not None:
+                    self._size += len(blob)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+        return path
+
+    def remove(self, game_pk: int):
+        with self._lock:
+            path = self._find(game_pk)
+            while path is not None:
+                if self._size is not None:
+                    self._size -= path.stat().st_size
+                os.remove(path)
+                path = self._find(game_pk)
+
+    def _entries(self) -> list:
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith((".json.zst", ".json.gz")):
+                    entries.append(entry)
+        return entries
+
+    def size(self) -> int:
+        with self._lock:
+            if self._size is None:
+                self._size = 0
+                for entry in self._entries():
+                    try:
+                        self._size += entry.stat().st_size
+                    except FileNotFoundError:
+                        continue
+            return self._size
+
+    def evict(self) -> list:
+        """Removes least recently used feeds until we're back under the cap."""
+        evicted = []
+        if self.size() <= self.max_bytes:
+            return evicted
+        with self._lock:
+            ## Other processes may share this directory and evict the same
+            ## files, so anything that vanishes underneath us is just skipped.
+            entries = []
+            for entry in self._entries():
+                try:
+                    entries.append((entry.stat().st_mtime, entry.stat().st_size, entry.path))
+                except FileNotFoundError:
+                    continue
+            self._size = sum(entry_size for mtime, entry_size, path in entries)
+            for mtime, entry_size, path in sorted(entries):
+                if self._size <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                self._size -= entry_size
+                evicted.append(path)
+        return evicted
@@ -1,11 +1,46 @@
 #!/usr/bin/env python3
 
+import json
+import os
 import pprint
-import requests
+import tempfile
+import time
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
 from typing import Optional
 
+from . import basic as basic
 from . import constants as const
+from . import func_database as dbmgr
+from . import httpclient as http
+from .configurator import ConfigReader
+from .feedcache import FeedCache
+from .gamefeed import GameFeed
+from .models import AtBat, GameInfo, HbpEvent, PlayerInfo, TeamResult
+
+
+## -------------------------------------------------------------------------- ##
+## LIVE FEED CONFIG
+## -------------------------------------------------------------------------- ##
+
+config       = ConfigReader(basic.verify_file_path(basic.sanitize_path(const.DEFAULT_CONFIG_INI_FILE)))
+stream_feeds = bool(int(config.get("http", "stream_live_feeds")))
+feed_cache   = None
+if bool(int(config.get("cache", "feed_cache_enabled"))):
+    feed_cache = FeedCache(
+        Path(config.get("paths", "cache_dir"), "feeds"),
+        float(config.get("cache", "feed_cache_max_mb")),
+        config.get("cache", "feed_cache_compression"),
+    )
+
+## Feeds we're polling with diffPatch, keyed by game_pk.
+live_feeds = {}
+
+## One file per season listing the dates that have games.
+calendar_dir = Path(config.get("paths", "cache_dir"), "calendar")
+calendar_ttl = float(config.get("cache", "calendar_ttl_hours")) * 3600
 
 
 ## -------------------------------------------------------------------------- ##
@@ -25,47 +60,59 @@ def convert_int_to_ordinal_str(n):
     return n_str
 
 
-def build_hbp_event_count(at_bat_deets: list, verbose_bool: Optional[bool] = False) -> str:
-    count_str = f"{at_bat_deets['balls']}-{at_bat_deets['strikes']}, {at_bat_deets['outs_when_up']} out"
-    if at_bat_deets['outs_when_up'] != 1:
+def build_hbp_event_count(at_bat_deets: AtBat, verbose_bool: Optional[bool] = False) -> str:
+    count_str = f"{at_bat_deets.balls}-{at_bat_deets.strikes}, {at_bat_deets.outs_when_up} out"
+    if at_bat_deets.outs_when_up != 1:
         count_str = count_str + 's'
-    count_str = count_str + f", {at_bat_deets['half_inning'].lower()} of " + convert_int_to_ordinal_str(at_bat_deets['inning'])
+    count_str = count_str + f", {at_bat_deets.half_inning.lower()} of " + convert_int_to_ordinal_str(at_bat_deets.inning)
     return count_str
 
 
-def build_hbp_event_pitch(at_bat_deets: list, verbose_bool: Optional[bool] = False) -> str:
-    effective_speed = (at_bat_deets['start_speed'] + at_bat_deets['end_speed'])/2.0
-    return f"{effective_speed:.1f} mph {at_bat_deets['pitch_name'].lower()}"
+def build_hbp_event_pitch(at_bat_deets: AtBat, verbose_bool: Optional[bool] = False) -> str:
+    effective_speed = (at_bat_deets.start_speed + at_bat_deets.end_speed)/2.0
+    return f"{effective_speed:.1f} mph {at_bat_deets.pitch_name.lower()}"
 
 
-def build_mlb_player_display_string(player: list, verbose_bool: Optional[bool] = False) -> str:
-    player_string = f"{player['name']} ({player['hand']}) - {player['team']}"
+def build_mlb_player_display_string(player: PlayerInfo, verbose_bool: Optional[bool] = False) -> str:
+    player_string = f"{player.name} ({player.hand}) - {player.team}"
     if verbose_bool:
-        player_string = player_string + f" [id = {player['id']}]"
+        player_string = player_string + f" [id = {player.id}]"
     return player_string
 
 
-def get_mlb_game_deets(game: list, verbose_bool: Optional[bool] = False) -> list:
-    game_deets = {
-        'home': {
-            'team'       : game['teams']['home']['team']['name'] if 'name' in game['teams']['home']['team'] else 'N/A',
-            'final_score': game['teams']['home']['score'] if 'score' in game['teams']['home'] else None,
-            'wins'       : game['teams']['home']['leagueRecord']['wins'],
-            'losses'     : game['teams']['home']['leagueRecord']['losses'],
-            'pct'        : game['teams']['home']['leagueRecord']['pct'],
-        },
-        'away': {
-            'team'       : game['teams']['away']['team']['name'] if 'name' in game['teams']['away']['team'] else 'N/A',
-            'final_score': game['teams']['away']['score'] if 'score' in game['teams']['away'] else None,
-            'wins'       : game['teams']['away']['leagueRecord']['wins'],
-            'losses'     : game['teams']['away']['leagueRecord']['losses'],
-            'pct'        : game['teams']['away']['leagueRecord']['pct'],
-        },
-        'description': game['seriesDescription'],
-        'date'       : game['officialDate'],
-        'innings'    : get_mlb_game_total_innings(game['gamePk'], verbose_bool),
-        'game_pk'    : game['gamePk'],
-    }
+def get_mlb_game_deets(game: list, verbose_bool: Optional[bool] = False, feed: Optional[GameFeed] = None) -> GameInfo:
+    ## A hydrated schedule entry usually has everything; only fall back to
+    ## the live feed when it doesn't.
+    home, away = game['teams']['home'], game['teams']['away']
+    innings    = get_mlb_scheduled_game_innings(game)
+    if feed is None and (innings is None or 'score' not in home or 'score' not in away):
+        feed = get_mlb_game_feed(game['gamePk'])
+    if feed is not None:
+        ## Only trust the feed's count if it has one; never lose the schedule's.
+        innings = get_mlb_game_total_innings(game['gamePk'], verbose_bool, feed) or innings
+
+    final_scores = feed.final_scores if feed is not None else {}
+    game_deets = GameInfo(
+        home=TeamResult(
+            team=home['team'].get('name', 'N/A'),
+            final_score=home['score'] if 'score' in home else final_scores.get('home'),
+            wins=home['leagueRecord']['wins'],
+            losses=home['leagueRecord']['losses'],
+            pct=home['leagueRecord']['pct'],
+        ),
+        away=TeamResult(
+            team=away['team'].get('name', 'N/A'),
+            final_score=away['score'] if 'score' in away else final_scores.get('away'),
+            wins=away['leagueRecord']['wins'],
+            losses=away['leagueRecord']['losses'],
+            pct=away['leagueRecord']['pct'],
+        ),
+        description=game['seriesDescription'],
+        date=game['officialDate'],
+        innings=innings,
+        game_pk=game['gamePk'],
+        state=game.get('status', {}).get('abstractGameState'),
+    )
     if verbose_bool:
         pprint.pprint(game)
         print("---------->")
@@ -78,9 +125,11 @@ def get_mlb_games_for_date(date_str: str, verbose_bool: Optional[bool] = False)
     url = const.MLB_STATS_BASE_URL + const.MLB_STATS_SCHEDULE_STUB
     params = {
         "sportId": 1,
-        "date": date_str
+        "date": date_str,
+        "hydrate": const.MLB_STATS_SCHEDULE_HYDRATE,
+        "fields": const.MLB_STATS_SCHEDULE_FIELDS,
     }
-    response = requests.get(url, params=params, timeout=10)
+    response = http.get(url, params=params, conditional=True)
     response.raise_for_status()
     data = response.json()
     games = []
@@ -89,98 +138,348 @@ def get_mlb_games_for_date(date_str: str, verbose_bool: Optional[bool] = False)
     return games
 
 
-def get_mlb_hit_by_pitch_events_from_single_game(game: list, verbose_bool: Optional[bool] = False) -> list:
-    hit_by_pitch_events = []
+def get_mlb_games_for_dates(date_list: list, verbose_bool: Optional[bool] = False, refresh_cache: Optional[bool] = False) -> dict:
+    '''
+    Pulls the schedule for a whole run of dates in one request. Returns the
+    games grouped by date, keyed in the same order as date_list (so backward
+    runs stay backward). Dates without games map to an empty list. With
+    refresh_cache set, the locally kept copy isn't offered to the server.
+    '''
+    games_by_date = {str(game_date): [] for game_date in date_list}
+    if not games_by_date:
+        return games_by_date
 
-    try:
-        live_feed_url = const.MLB_STATS_BASE_URL + game['link']
-        response      = requests.get(live_feed_url, timeout=10)
-        response.raise_for_status()
-        data      = response.json()
-        all_plays = data.get("liveData", {}).get("plays", {}).get("allPlays", [])
-    except: 
-        print(f"[ERROR] Something went wrong querying {const.MLB_STATS_BASE_URL + game['link']}!")
-        all_plays = []
-
-    for play in all_plays:
-        # Identify HBP at the play-result level (most reliable)
-        if play.get("result", {}).get("event") != "Hit By Pitch":
-            continue
-
-        # Find the final pitch event to extract play_id
-        play_id = None
-        pitch_events = [
-            e for e in play.get("playEvents", [])
-            if e.get("isPitch")
-        ]
-
-        if pitch_events:
-            play_id = pitch_events[-1].get("playId")
+    url = const.MLB_STATS_BASE_URL + const.MLB_STATS_SCHEDULE_STUB
+    params = {
+        "sportId"  : 1,
+        "startDate": min(games_by_date),
+        "endDate"  : max(games_by_date),
+        "hydrate"  : const.MLB_STATS_SCHEDULE_HYDRATE,
+        "fields"   : const.MLB_STATS_SCHEDULE_FIELDS,
+    }
+    response = http.get(url, params=params, conditional=not refresh_cache)
+    response.raise_for_status()
+    data = response.json()
+    for date_block in data.get("dates", []):
+        if date_block.get("date") in games_by_date:
+            games_by_date[date_block["date"]].extend(date_block.get("games", []))
 
+    if verbose_bool:
+        pprint.pprint({game_date: len(games) for game_date, games in games_by_date.items()})
+    return games_by_date
+
+
+def get_mlb_scheduled_game_hbp_count(game: list) -> int:
+    '''
+    Hit-by-pitches in a game according to the boxscore hydrated into its
+    schedule entry. None when the schedule didn't say, which callers have to
+    treat as "maybe some".
+    '''
+    hbp_count = 0
+    for side in ('home', 'away'):
+        batting = game.get('boxscore', {}).get('teams', {}).get(side, {}).get('teamStats', {}).get('batting', {})
+        if 'hitByPitch' not in batting:
+            return None
+        hbp_count = hbp_count + int(batting['hitByPitch'])
+    return hbp_count
+
+
+def get_mlb_scheduled_game_innings(game: list) -> int:
+    '''Innings played according to the linescore hydrated into a schedule entry, if any.'''
+    linescore = game.get('linescore', {})
+    if linescore.get('innings'):
+        return len(linescore['innings'])
+    return linescore.get('currentInning')
+
+
+def mlb_game_needs_feed(game: list) -> bool:
+    '''
+    A finished game that the schedule says had no HBPs has nothing for us in
+    its live feed, so there's no point downloading it.
+    '''
+    if game.get('status', {}).get('abstractGameState') != "Final":
+        return True
+    return get_mlb_scheduled_game_hbp_count(game) != 0
+
+
+def get_mlb_game_from_schedule(game_pk: int, verbose_bool: Optional[bool] = False) -> list:
+    '''A single game's hydrated schedule entry, looked up by game_pk. None if there isn't one.'''
+    url = const.MLB_STATS_BASE_URL + const.MLB_STATS_SCHEDULE_STUB
+    params = {
+        "sportId": 1,
+        "gamePk" : game_pk,
+        "hydrate": const.MLB_STATS_SCHEDULE_HYDRATE,
+        "fields" : const.MLB_STATS_SCHEDULE_FIELDS,
+    }
+    response = http.get(url, params=params, conditional=True)
+    response.raise_for_status()
+    for date_block in response.json().get("dates", []):
+        for game in date_block.get("games", []):
+            if verbose_bool:
+                pprint.pprint(game)
+            return game
+    return None
+
+
+def retry_failed_mlb_games(step: str, handle_game, verbose_bool: Optional[bool] = False) -> tuple:
+    '''
+    Works through the games on the retry queue for step that are due. Each
+    one's schedule entry is fetched fresh and passed to handle_game(game),
+    which should raise if the game still can't be processed; those go back
+    on the queue with a longer wait. Returns (recovered, failed_again).
+    '''
+    recovered    = 0
+    failed_again = 0
+    for game_pk, game_date, attempts in dbmgr.get_due_fetch_retries(step):
+        try:
+            game = get_mlb_game_from_schedule(game_pk, verbose_bool)
+            if game is None:
+                raise RuntimeError("not on the schedule")
+            handle_game(game)
+        except Exception as e:
+            attempts = dbmgr.queue_fetch_retry(game_pk, game_date, step, e)
+            print(f"[ERROR] Retry {attempts} of game {game_pk} ({game_date}) failed: {e}")
+            failed_again = failed_again + 1
+            continue
+        dbmgr.clear_fetch_retry(game_pk, step)
+        recovered = recovered + 1
+    return recovered, failed_again
+
+
+def drop_processed_mlb_games(games_by_date: dict, step: str) -> tuple:
+    '''
+    Takes games grouped by date and leaves out the ones the games ledger says
+    already went through step. Returns (games_by_date, number_dropped).
+    '''
+    processed_games = dbmgr.get_processed_games(
+        [game['gamePk'] for mlb_games in games_by_date.values() for game in mlb_games],
+        step
+    )
+    games_by_date = {
+        game_date: [game for game in mlb_games if game['gamePk'] not in processed_games]
+        for game_date, mlb_games in games_by_date.items()
+    }
+    return games_by_date, len(processed_games)
+
+
+def collect_mlb_game(
+    game: list,
+    verbose_bool: Optional[bool] = False,
+    use_cache: Optional[bool] = True,
+    refresh_cache: Optional[bool] = False,
+    retry_step: Optional[str] = None
+) -> tuple:
+    '''
+    A game's (game_deets, hbp_events), fetching its live feed only if the
+    schedule can't already tell us nobody got hit. With retry_step set, a
+    game an earlier run queued for a retry comes off that step's queue.
+    '''
+    if not mlb_game_needs_feed(game):
+        game_deets, hbp_events = get_mlb_game_deets(game, verbose_bool), []
+    else:
+        game_feed  = get_mlb_game_feed(game['gamePk'], verbose_bool, use_cache, refresh_cache)
+        game_deets = get_mlb_game_deets(game, verbose_bool, game_feed)
+        hbp_events = get_mlb_hit_by_pitch_events_from_single_game(game, verbose_bool, game_feed)
+    if retry_step is not None:
+        dbmgr.clear_fetch_retry(game['gamePk'], retry_step)
+    return game_deets, hbp_events
+
+
+def collect_mlb_hit_by_pitch_events_for_dates(
+    date_list: list, 
+    verbose_bool: Optional[bool] = False, 
+    use_cache: Optional[bool] = True,
+    refresh_cache: Optional[bool] = False,
+    skip_processed: Optional[bool] = True
+) -> tuple:
+    '''
+    Everything a range of dates has to offer, as (game_deets, hbp_events)
+    pairs in schedule order. Self-contained so it can run in a worker process.
+    Final games the games ledger says were already populated are left out
+    unless skip_processed is off. Games whose feed couldn't be fetched come
+    back separately as (game_pk, game_date, error) for the retry queue.
+    Returns (games_and_events, failed_games).
+    '''
+    games_and_events = []
+    failed_games     = []
+    games_by_date    = get_mlb_games_for_dates(date_list, verbose_bool, refresh_cache)
+    if skip_processed:
+        games_by_date, skipped_games = drop_processed_mlb_games(games_by_date, "populated")
+        if skipped_games > 0:
+            print(f"⏭️ Skipping {skipped_games} games between {min(date_list)} and {max(date_list)} that were already populated.")
+    for mlb_games in games_by_date.values():
+        for game in mlb_games:
+            try:
+                games_and_events.append(collect_mlb_game(game, verbose_bool, use_cache, refresh_cache))
+            except Exception as e:
+                print(f"[ERROR] Couldn't fetch game {game['gamePk']}: {e}")
+                failed_games.append((game['gamePk'], game['officialDate'], str(e)))
+    return games_and_events, failed_games
+
+
+def get_mlb_hit_by_pitch_events_from_single_game(game: list, verbose_bool: Optional[bool] = False, feed: Optional[GameFeed] = None) -> list:
+    if feed is None:
+        feed = get_mlb_game_feed(game['gamePk'])
+
+    ## Identify HBP at the play-result level (most reliable). A feed that
+    ## can't be fetched raises, so the game isn't mistaken for an HBP-free one.
+    hbp_plays = feed.get_plays_by_event("Hit By Pitch")
+
+    home_team = game['teams']['home']['team']['name']
+    away_team = game['teams']['away']['team']['name']
+    hit_by_pitch_events = []
+    for play in hbp_plays:
         if verbose_bool:
             print("@@-- Start --@@")
             pprint.pprint(play['playEvents'][-1])
             print("@@--  End  --@@")
-
-        hit_by_pitch_events.append({
-            "game_pk"    : game['gamePk'],
-            "play_id"    : play_id,
-            "batter": {
-                "id"  : play["matchup"]["batter"]["id"],
-                "name": play["matchup"]["batter"]["fullName"],
-                "hand": play["matchup"]["batSide"]["code"],
-                "team": game['teams']['away']['team']['name'] if play["about"]["halfInning"] == "top" else game['teams']['home']['team']['name']
-            },
-            "pitcher": {
-                "id"  : play["matchup"]["pitcher"]["id"],
-                "name": play["matchup"]["pitcher"]["fullName"],
-                "hand": play["matchup"]["pitchHand"]["code"],
-                "team": game['teams']['away']['team']['name'] if play["about"]["halfInning"] == "bottom" else game['teams']['home']['team']['name']
-            },
-            "at_bat": {
-                'home_score'  : play['result']['homeScore'],
-                'away_score'  : play['result']['awayScore'],
-                'balls'       : play['playEvents'][-1]["count"]["balls"],
-                'strikes'     : play['playEvents'][-1]["count"]["strikes"],
-                'outs_when_up': play['playEvents'][-1]["count"]["outs"],
-                'inning'      : play["about"]["inning"],
-                'half_inning' : play["about"]["halfInning"],
-                'start_speed' : play['playEvents'][-1]['pitchData']['startSpeed'] if 'pitchData' in play['playEvents'][-1] and 'startSpeed' in play['playEvents'][-1]['pitchData'] else None,
-                'end_speed'   : play['playEvents'][-1]['pitchData']['endSpeed'] if 'pitchData' in play['playEvents'][-1] and 'endSpeed' in play['playEvents'][-1]['pitchData'] else None,
-                'plate_x'     : play['playEvents'][-1]['pitchData']['coordinates']['pX'] if 'pitchData' in play['playEvents'][-1] and 'pX' in play['playEvents'][-1]['pitchData']['coordinates'] else None,   ## in feet!
-                'plate_z'     : play['playEvents'][-1]['pitchData']['coordinates']['pZ'] if 'pitchData' in play['playEvents'][-1] and 'pZ' in play['playEvents'][-1]['pitchData']['coordinates'] else None,   ## in feet!
-                'pitch_name'  : play['playEvents'][-1]['details']['type']['description'] if 'type' in play['playEvents'][-1]['details'] and play['playEvents'][-1]['details']['type'] != 'no_pitch' else None,
-            },
-            "description": play['result']['description'],
-        })
+        hit_by_pitch_events.append(HbpEvent.from_play(play, game['gamePk'], home_team, away_team))
 
     return hit_by_pitch_events
 
 
+def get_mlb_game_deets_from_feed(feed: GameFeed, verbose_bool: Optional[bool] = False) -> GameInfo:
+    '''
+    Same as get_mlb_game_deets, but everything comes out of the feed's
+    gameData and linescore, so no schedule entry (or network) is needed.
+    '''
+    game_data    = feed.data.get("gameData", {})
+    final_scores = feed.final_scores if feed.abstract_game_state == "Final" else {}
+    teams        = {}
+    for side in ('home', 'away'):
+        team   = game_data.get("teams", {}).get(side, {})
+        record = team.get("record", {}).get("leagueRecord", {})
+        teams[side] = TeamResult(
+            team=team.get("name", "N/A"),
+            final_score=final_scores.get(side),
+            wins=record.get("wins"),
+            losses=record.get("losses"),
+            pct=record.get("pct"),
+        )
+    game_deets = GameInfo(
+        home=teams['home'],
+        away=teams['away'],
+        description=game_data.get("game", {}).get("seriesDescription", ""),
+        date=game_data.get("datetime", {}).get("officialDate"),
+        innings=feed.total_innings,
+        game_pk=feed.game_pk,
+        state=feed.abstract_game_state,
+    )
+    if verbose_bool:
+        pprint.pprint(game_deets)
+    return game_deets
+
+
+def get_mlb_hit_by_pitch_events_from_feed(feed: GameFeed, verbose_bool: Optional[bool] = False) -> list:
+    '''Same as get_mlb_hit_by_pitch_events_from_single_game, for a feed without a schedule entry.'''
+    teams     = feed.data.get("gameData", {}).get("teams", {})
+    home_team = teams.get("home", {}).get("name")
+    away_team = teams.get("away", {}).get("name")
+    return [
+        HbpEvent.from_play(play, feed.game_pk, home_team, away_team)
+        for play in feed.get_plays_by_event("Hit By Pitch")
+    ]
+
+
+def get_mlb_hit_by_pitch_play_ids(game_pk: int, verbose_bool: Optional[bool] = False) -> dict:
+    '''
+    Maps at-bat number (1-based, like Statcast's at_bat_number) to the
+    play_id of the pitch that hit the batter, for every HBP in a game.
+    '''
+    play_ids = {}
+    feed     = get_mlb_game_feed(game_pk, verbose_bool)
+    for play in feed.get_plays_by_event("Hit By Pitch"):
+        pitch_events = [e for e in play.get("playEvents", []) if e.get("isPitch")]
+        if pitch_events:
+            play_ids[play["about"]["atBatIndex"] + 1] = pitch_events[-1].get("playId")
+    return play_ids
+
+
 def get_mlb_player_details(player_id: int, verbose_bool: Optional[bool] = False) -> list:
-    player_details_url = const.MLB_STATS_BASE_URL + const.MLB_STATS_PLAYER_STUB.replace('<<PLAYER_ID>>', str(player_id))
-    response = requests.get(player_details_url, timeout=10)
+    return get_mlb_players_details([player_id], verbose_bool)[int(player_id)]
+
+
+def get_mlb_players_details(player_ids: list, verbose_bool: Optional[bool] = False, use_cache: Optional[bool] = True) -> dict:
+    '''
+    Details for a bunch of players at once, keyed by player id. Anything in
+    the players cache that hasn't expired comes from there; the rest is
+    fetched from /people in batches and written back to the cache.
+    '''
+    player_ids     = {int(player_id) for player_id in player_ids}
+    player_details = dbmgr.get_cached_players(player_ids) if use_cache else {}
+    missing_ids    = sorted(player_ids - set(player_details))
+
+    url = const.MLB_STATS_BASE_URL + const.MLB_STATS_PEOPLE_STUB
+    for i in range(0, len(missing_ids), const.MLB_STATS_PEOPLE_BATCH_SIZE):
+        batch_ids = missing_ids[i:i + const.MLB_STATS_PEOPLE_BATCH_SIZE]
+        response  = http.get(url, params={"personIds": ",".join(str(player_id) for player_id in batch_ids)}, conditional=True)
+        response.raise_for_status()
+        data = response.json()
+
+        if verbose_bool:
+            pprint.pprint(data)
+
+        fetched_players = [build_mlb_player_details(person) for person in data.get('people', [])]
+        dbmgr.store_players(fetched_players)
+        for player in fetched_players:
+            player_details[player['id']] = player
+
+    return player_details
+
+
+def build_mlb_player_details(person: list) -> list:
+    return {
+        'id'              : person['id'],
+        'link'            : person['link'],
+        'name'            : person['fullName'],
+        'birthdate'       : person['birthDate'],
+        'height'          : person['height'],
+        'jersey_number'   : person['primaryNumber'] if 'primaryNumber' in person else None,
+        'primary_position': person['primaryPosition']['abbreviation'],
+        'pitches'         : person['pitchHand']['code'],
+        'hits'            : person['batSide']['code'],
+        'strike_zone_top' : person['strikeZoneTop'],
+        'strike_zone_bot' : person['strikeZoneBottom']
+    } 
+
+
+def get_mlb_team_roster_players(team_id: str, verbose_bool: Optional[bool] = False) -> list:
+    '''Player details for a team's active roster, from one hydrated request.'''
+    url = const.MLB_STATS_BASE_URL + const.MLB_STATS_ROSTER_STUB.replace('<<TEAM_ID>>', str(team_id))
+    params = {
+        "rosterType": "active",
+        "hydrate"   : "person",
+    }
+    response = http.get(url, params=params, conditional=True)
     response.raise_for_status()
     data = response.json()
-    
+
     if verbose_bool:
         pprint.pprint(data)
-    
-    player_details = {
-        'id'              : data['people'][0]['id'],
-        'link'            : data['people'][0]['link'],
-        'name'            : data['people'][0]['fullName'],
-        'birthdate'       : data['people'][0]['birthDate'],
-        'height'          : data['people'][0]['height'],
-        'jersey_number'   : data['people'][0]['primaryNumber'] if 'primaryNumber' in data['people'][0] else None,
-        'primary_position': data['people'][0]['primaryPosition']['abbreviation'],
-        'pitches'         : data['people'][0]['pitchHand']['code'],
-        'hits'            : data['people'][0]['batSide']['code'],
-        'strike_zone_top' : data['people'][0]['strikeZoneTop'],
-        'strike_zone_bot' : data['people'][0]['strikeZoneBottom']
-    } 
-    
-    return player_details
+
+    roster_players = []
+    for roster_entry in data.get('roster', []):
+        try:
+            roster_players.append(build_mlb_player_details(roster_entry['person']))
+        except KeyError:
+            ## Not enough here to cache; a lazy /people lookup will catch it.
+            continue
+    return roster_players
+
+
+def prewarm_mlb_player_cache(team_ids: list, max_workers: Optional[int] = 4, verbose_bool: Optional[bool] = False) -> dict:
+    '''
+    Pulls every active roster and fills the player cache with it, so the
+    plotting and posting steps don't have to look anybody up. Returns the
+    number of players cached per team id.
+    '''
+    players_per_team = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        rosters = executor.map(lambda team_id: get_mlb_team_roster_players(team_id, verbose_bool), team_ids)
+        for team_id, roster_players in zip(team_ids, rosters):
+            dbmgr.store_players(roster_players)
+            players_per_team[team_id] = len(roster_players)
+    return players_per_team
 
 
 def get_mlb_team_attribute(full_team_str: str, sought_after_attr: str, verbose_bool: Optional[bool] = False) -> str:
@@ -191,14 +490,114 @@ def get_mlb_team_attribute(full_team_str: str, sought_after_attr: str, verbose_b
     return team_attr
 
 
-def get_mlb_game_total_innings(game_pk: str, verbose_bool: Optional[bool] = False) -> int:
-    live_feed_url = const.MLB_STATS_BASE_URL + const.MLB_STATS_LIVE_FEED_STUB.replace('<<GAME_PK>>', str(game_pk))
-    response = requests.get(live_feed_url, timeout=10)
+def get_mlb_game_feed(
+    game_pk: str, 
+    verbose_bool: Optional[bool] = False, 
+    use_cache: Optional[bool] = True, 
+    refresh_cache: Optional[bool] = False,
+    stream: Optional[bool] = stream_feeds
+) -> GameFeed:
+    cache = feed_cache if use_cache else None
+    return GameFeed(game_pk, verbose_bool, cache, refresh_cache, stream)
+
+
+def get_mlb_game_total_innings(game_pk: str, verbose_bool: Optional[bool] = False, feed: Optional[GameFeed] = None) -> int:
+    if feed is None:
+        feed = get_mlb_game_feed(game_pk, verbose_bool)
+    return feed.total_innings
+
+
+
+def poll_mlb_game_feed(game_pk: str, verbose_bool: Optional[bool] = False, use_cache: Optional[bool] = False) -> GameFeed:
+    '''
+    Polling mode for in-progress games. The first call for a game downloads
+    its full feed; every later call only pulls the diffPatch since the last
+    timecode we saw and applies it to our local copy. With use_cache set,
+    the first call reads through the feed cache, which is only worth it for
+    games that are already Final.
+    '''
+    feed = live_feeds.get(game_pk)
+    if feed is None:
+        feed = GameFeed(game_pk, verbose_bool, feed_cache if use_cache else None, False, False)
+        live_feeds[game_pk] = feed
+    feed.update()
+    return feed
+
+
+def forget_mlb_game_feed(game_pk: str) -> GameFeed:
+    '''Stops tracking a polled game. Returns its feed, if there was one.'''
+    return live_feeds.pop(game_pk, None)
+
+
+## -------------------------------------------------------------------------- ##
+## SEASON CALENDAR FUNCTIONS
+## -------------------------------------------------------------------------- ##
+
+def get_mlb_season_calendar(season: int, verbose_bool: Optional[bool] = False) -> dict:
+    '''
+    Maps every date in a season that has games to that day's game_pks. Built
+    from a single schedule request and kept on disk. A calendar written after
+    its season was over never changes; anything older (including one written
+    mid-season, for a season that's over now) is refreshed once it's older
+    than the TTL.
+    '''
+    calendar_path = Path(calendar_dir, f"{season}.json")
+    try:
+        written  = calendar_path.stat().st_mtime
+        is_final = written >= datetime(int(season) + 1, 1, 1).timestamp()
+        is_fresh = is_final or time.time() - written < calendar_ttl
+        if is_fresh:
+            with open(calendar_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+
+    url = const.MLB_STATS_BASE_URL + const.MLB_STATS_SCHEDULE_STUB
+    params = {
+        "sportId"  : 1,
+        "startDate": f"{season}-01-01",
+        "endDate"  : f"{season}-12-31",
+        "fields"   : "dates,date,games,gamePk",
+    }
+    response = http.get(url, params=params, conditional=True)
     response.raise_for_status()
-    data = response.json()
-    
+    calendar = {
+        date_block["date"]: [game["gamePk"] for game in date_block["games"]]
+        for date_block in response.json().get("dates", [])
+        if date_block.get("games")
+    }
+
+    ## Backfill workers can all be doing this at once, so write atomically.
+    os.makedirs(calendar_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=calendar_dir, prefix=f".{season}.", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(calendar, f)
+    os.replace(tmp_path, calendar_path)
+
     if verbose_bool:
-        pprint.pprint(data)
-    
-    all_plays = data.get("liveData", {}).get("plays", {}).get("allPlays", [])    
-    return all_plays[-1]['about']['inning']
\ No newline at end of file
+        print(f"Season {season}: {len(calendar)} dates with games.")
+    return calendar
+
+
+def filter_mlb_game_dates(date_list: list, verbose_bool: Optional[bool] = False) -> list:
+    '''The dates out of date_list that actually have games, in the same order.'''
+    calendars  = {}
+    game_dates = []
+    for game_date in date_list:
+        season = int(str(game_date)[:4])
+        if season not in calendars:
+            calendars[season] = get_mlb_season_calendar(season, verbose_bool)
+        if str(game_date) in calendars[season]:
+            game_dates.append(str(game_date))
+    return game_dates
+
+
+def get_latest_mlb_game_date(on_or_before: str, verbose_bool: Optional[bool] = False) -> str:
+    '''The last date with games on or before the given one, looking back as far as last season.'''
+    on_or_before = str(on_or_before)
+    season       = int(on_or_before[:4])
+    for calendar_season in (season, season - 1):
+        game_dates = [game_date for game_date in get_mlb_season_calendar(calendar_season, verbose_bool) if game_date <= on_or_before]
+        if game_dates:
+            return max(game_dates)
+    return None
@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 
+import json
 import pprint
+import time
 
 from . import basic as basic
 from . import constants as const
 from .configurator import ConfigReader
+from .models import GameInfo, HbpEvent
 from .sqlitemgr import SQLiteManager
 
 from pathlib import Path
@@ -20,6 +23,19 @@ db_file_path = Path(
     config.get("paths", "db_dir"), 
     config.get("database", "hbp_db_filename")
 )
+player_ttl   = float(config.get("database", "player_cache_ttl_hours")) * 3600
+retry_base   = float(config.get("retry", "base_seconds"))
+retry_max    = float(config.get("retry", "max_seconds"))
+retry_limit  = int(config.get("retry", "max_attempts"))
+
+## Older SQLite builds allow at most 999 parameters per statement, so long
+## IN (...) lists get split into batches of this many.
+SQL_BATCH_SIZE = 500
+
+
+def _batched(items: list, batch_size: int = SQL_BATCH_SIZE):
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
 
 
 ## -------------------------------------------------------------------------- ##
@@ -84,6 +100,23 @@ def get_latest_date_that_hasnt_been_downloaded() -> str:
         )
     return select_data[0][0]    
     
+def get_player_ids_for_plays(play_ids: list, dbfile: str = db_file_path, dbtable: str = db_table) -> set:
+    player_ids = set()
+    play_ids   = list(play_ids)
+    if not play_ids:
+        return player_ids
+    select_data = []
+    with SQLiteManager(dbfile) as db: 
+        for batch in _batched(play_ids):
+            select_data.extend(db.query_hbpdata(
+                f"SELECT pitcher_id, batter_id FROM {dbtable} WHERE play_id IN ({','.join('?' * len(batch))})",
+                batch
+            ))
+    for pitcher_id, batter_id in select_data:
+        player_ids.update([pitcher_id, batter_id])
+    return player_ids
+
+
 def get_season_data(season: int, dbfile: str = db_file_path, dbtable: str = db_table) -> list:
     season_data = []
     season_start = f"{season}-01-01"
@@ -164,29 +197,306 @@ def set_hbp_flag(play_id: str, flag: str, dbfile: str = db_file_path, dbtable: s
     return flag_status
 
 
+## -------------------------->
+## Player Cache Funcs
+## -------------------------->
+
+def get_cached_players(player_ids: list, ttl: float = player_ttl, dbfile: str = db_file_path) -> dict:
+    """Player details we already have that are younger than ttl seconds, keyed by id."""
+    cached_players = {}
+    player_ids     = [int(player_id) for player_id in player_ids]
+    if not player_ids:
+        return cached_players
+    select_data = []
+    with SQLiteManager(dbfile) as db: 
+        for batch in _batched(player_ids):
+            select_data.extend(db.query_hbpdata(
+                f"SELECT player_id, details FROM players WHERE fetched_at >= ? AND player_id IN ({','.join('?' * len(batch))})",
+                [time.time() - ttl] + batch
+            ))
+    for player_id, details in select_data:
+        cached_players[player_id] = json.loads(details)
+    return cached_players
+
+
+def store_players(players: list, dbfile: str = db_file_path) -> int:
+    fetched_at = time.time()
+    with SQLiteManager(dbfile) as db: 
+        return db.upsert_players([
+            (player['id'], json.dumps(player), fetched_at) for player in players
+        ])
+
+
+## -------------------------->
+## Video URL Cache Funcs
+## -------------------------->
+
+def get_cached_video_url(play_id: str, dbfile: str = db_file_path) -> str:
+    """The mp4 URL we resolved for a play before, or None."""
+    with SQLiteManager(dbfile) as db: 
+        select_data = db.query_hbpdata(
+            "SELECT video_url FROM video_urls WHERE play_id = ?",
+            [play_id]
+        )
+    return select_data[0][0] if select_data else None
+
+
+def store_video_url(play_id: str, video_url: str, dbfile: str = db_file_path) -> bool:
+    with SQLiteManager(dbfile) as db: 
+        update_data = db.update_hbpdata_data(
+            """
+            INSERT INTO video_urls (play_id, video_url, resolved_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(play_id) DO UPDATE SET
+                video_url = excluded.video_url,
+                resolved_at = excluded.resolved_at
+            """,
+            [play_id, video_url, time.time()]
+        )
+    return update_data == 1
+
+
+def forget_video_url(play_id: str, dbfile: str = db_file_path) -> bool:
+    """For cached URLs that stopped working, so the next try asks Savant again."""
+    with SQLiteManager(dbfile) as db: 
+        delete_data = db.update_hbpdata_data(
+            "DELETE FROM video_urls WHERE play_id = ?",
+            [play_id]
+        )
+    return delete_data == 1
+
+
+## -------------------------->
+## Backfill Checkpoint Funcs
+## -------------------------->
+
+def get_backfill_shard_status(dbfile: str = db_file_path) -> dict:
+    """Maps (shard_start, shard_end) to that shard's last recorded status."""
+    with SQLiteManager(dbfile) as db: 
+        select_data = db.query_hbpdata(
+            "SELECT shard_start, shard_end, status FROM backfill_shards",
+            []
+        )
+    return {(shard_start, shard_end): status for shard_start, shard_end, status in select_data}
+
+
+def set_backfill_shard_status(
+    shard_start: str, 
+    shard_end: str, 
+    status: str, 
+    hbp_count: int = 0, 
+    dbfile: str = db_file_path
+) -> bool:
+    with SQLiteManager(dbfile) as db: 
+        update_data = db.update_hbpdata_data(
+            """
+            INSERT INTO backfill_shards (shard_start, shard_end, status, hbp_count, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(shard_start, shard_end) DO UPDATE SET
+                status = excluded.status,
+                hbp_count = excluded.hbp_count,
+                updated_at = excluded.updated_at
+            """,
+            [str(shard_start), str(shard_end), status, hbp_count, time.time()]
+        )
+    return update_data == 1
+
+
+## -------------------------->
+## Games Ledger Funcs
+## -------------------------->
+
+def get_processed_games(game_pks: list, step: str, dbfile: str = db_file_path) -> set:
+    """The game_pks out of game_pks that already went through step ('populated' or 'downloaded')."""
+    steps    = ['populated', 'downloaded']
+    game_pks = [int(game_pk) for game_pk in game_pks]
+    if step not in steps or not game_pks:
+        return set()
+    select_data = []
+    with SQLiteManager(dbfile) as db: 
+        for batch in _batched(game_pks):
+            select_data.extend(db.query_hbpdata(
+                f"SELECT game_pk FROM games WHERE {step} = 1 AND state = 'Final' AND game_pk IN ({','.join('?' * len(batch))})",
+                batch
+            ))
+    return {game_pk for (game_pk,) in select_data}
+
+
+def set_games_processed(games_and_events: list, step: str, dbfile: str = db_file_path) -> int:
+    """
+    Records (game_deets, hbp_events) pairs in the games ledger as having been
+    through step. Only Final games are recorded; anything else could still
+    change and has to be looked at again next time.
+    """
+    steps = ['populated', 'downloaded']
+    if step not in steps:
+        return 0
+    processed_at = time.time()
+    rows = [
+        (game.game_pk, game.date, game.state, len(events), processed_at)
+        for game, events in games_and_events
+        if game.state == "Final"
+    ]
+    if not rows:
+        return 0
+    with SQLiteManager(dbfile) as db: 
+        return db.upsert_games(rows, step)
+
+
+## -------------------------->
+## Fetch Retry Queue Funcs
+## -------------------------->
+
+def queue_fetch_retry(game_pk: int, game_date: str, step: str, error: str, dbfile: str = db_file_path) -> int:
+    """
+    Puts a game whose fetch failed (back) on the retry queue for step. Each
+    failure doubles the wait before the next try, up to retry_max seconds.
+    Returns how many times it has failed so far.
+    """
+    with SQLiteManager(dbfile) as db: 
+        select_data = db.query_hbpdata(
+            "SELECT attempts FROM fetch_retries WHERE game_pk = ? AND step = ?",
+            [int(game_pk), step]
+        )
+        attempts = (select_data[0][0] if select_data else 0) + 1
+        delay    = min(retry_base * 2 ** (attempts - 1), retry_max)
+        db.update_hbpdata_data(
+            """
+            INSERT INTO fetch_retries (game_pk, step, game_date, attempts, next_retry_at, last_error)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(game_pk, step) DO UPDATE SET
+                attempts = excluded.attempts,
+                next_retry_at = excluded.next_retry_at,
+                last_error = excluded.last_error
+            """,
+            [int(game_pk), step, str(game_date), attempts, time.time() + delay, str(error)]
+        )
+    return attempts
+
+
+def get_due_fetch_retries(step: str, max_attempts: int = retry_limit, dbfile: str = db_file_path) -> list:
+    """(game_pk, game_date, attempts) for every queued game that's due another try, oldest first."""
+    with SQLiteManager(dbfile) as db: 
+        return db.query_hbpdata(
+            """
+            SELECT game_pk, game_date, attempts FROM fetch_retries
+            WHERE step = ? AND next_retry_at <= ? AND attempts < ?
+            ORDER BY next_retry_at
+            """,
+            [step, time.time(), max_attempts]
+        )
+
+
+def clear_fetch_retry(game_pk: int, step: str, dbfile: str = db_file_path) -> bool:
+    with SQLiteManager(dbfile) as db: 
+        delete_data = db.update_hbpdata_data(
+            "DELETE FROM fetch_retries WHERE game_pk = ? AND step = ?",
+            [int(game_pk), step]
+        )
+    return delete_data == 1
+
+
+def clear_fetch_retries(game_pks: list, step: str, dbfile: str = db_file_path) -> int:
+    """Takes every game in game_pks off the retry queue for step. Returns how many were on it."""
+    game_pks    = [int(game_pk) for game_pk in game_pks]
+    delete_data = 0
+    if not game_pks:
+        return delete_data
+    with SQLiteManager(dbfile) as db: 
+        for batch in _batched(game_pks):
+            delete_data = delete_data + db.update_hbpdata_data(
+                f"DELETE FROM fetch_retries WHERE step = ? AND game_pk IN ({','.join('?' * len(batch))})",
+                [step] + batch
+            )
+    return delete_data
+
+
 ## -------------------------->
 ## DB Maintenance Funcs
 ## -------------------------->
 
-def insert_row(game: list, event: list, dbfile: str = db_file_path, dbtable: str = db_table) -> bool:
+def insert_row(game: GameInfo, event: HbpEvent, dbfile: str = db_file_path, dbtable: str = db_table) -> bool:
     row_inserted = False
-    select_data = get_hbp_play_data(event['play_id'])
+    select_data = get_hbp_play_data(event.play_id)
     if len(select_data) == 0:
         with SQLiteManager(dbfile) as db: 
             db.insert_hbpdata(
-                event['play_id'],              # play_id: str
-                game['game_pk'],               # game_pk: str
-                game['date'],                  # game_date: str
-                event['pitcher']['id'],        # pitcher_id: str
-                event['batter']['id'],         # batter_id: str
-                event['at_bat']['end_speed'],  # end_speed: float
-                event['at_bat']['plate_x'],    # x_pos: float
-                event['at_bat']['plate_z'],    # z_pos: float
+                event.play_id,                # play_id: str
+                game.game_pk,                 # game_pk: str
+                game.date,                    # game_date: str
+                event.pitcher.id,             # pitcher_id: str
+                event.batter.id,              # batter_id: str
+                event.at_bat.end_speed,       # end_speed: float
+                event.at_bat.plate_x,         # x_pos: float
+                event.at_bat.plate_z,         # z_pos: float
             )
             row_inserted = True
     return row_inserted
 
 
+def build_hbpdata_rows(games_and_events: list) -> list:
+    """Turns (game_deets, hbp_events) pairs into hbpdata tuples (play_id through z_pos)."""
+    rows = []
+    for game, events in games_and_events:
+        for event in events:
+            if event.play_id is None:
+                continue
+            rows.append((
+                event.play_id,                # play_id: str
+                game.game_pk,                 # game_pk: str
+                game.date,                    # game_date: str
+                event.pitcher.id,             # pitcher_id: str
+                event.batter.id,              # batter_id: str
+                event.at_bat.end_speed,       # end_speed: float
+                event.at_bat.plate_x,         # x_pos: float
+                event.at_bat.plate_z,         # z_pos: float
+            ))
+    return rows
+
+
+def insert_rows(games_and_events: list, dbfile: str = db_file_path) -> int:
+    """
+    Bulk version of insert_row. Takes (game_deets, hbp_events) pairs and writes
+    every event in one transaction. Returns the number of new rows.
+    """
+    return insert_hbpdata_rows(build_hbpdata_rows(games_and_events), dbfile)
+
+
+def upsert_rows(games_and_events: list, dbfile: str = db_file_path) -> int:
+    """
+    Like insert_rows, but plays we already have get their data overwritten.
+    The downloaded/analyzed/skeeted flags are left as they are.
+    """
+    rows = build_hbpdata_rows(games_and_events)
+    if not rows:
+        return 0
+    with SQLiteManager(dbfile) as db: 
+        return db.upsert_hbpdata_many(rows)
+
+
+def rebuild_rows(games_and_events: list, dbfile: str = db_file_path) -> int:
+    """
+    Replaces everything hbpdata has for these games with the given events, in
+    one transaction. Plays that are still there afterwards keep their flags;
+    plays the events no longer include are dropped. Other games are untouched.
+    """
+    game_pks = [game.game_pk for game, events in games_and_events]
+    with SQLiteManager(dbfile) as db: 
+        return db.replace_hbpdata_for_games(game_pks, build_hbpdata_rows(games_and_events))
+
+
+def insert_hbpdata_rows(rows: list, dbfile: str = db_file_path) -> int:
+    """
+    Writes ready-made hbpdata tuples (play_id through z_pos) in one
+    transaction. Rows we already have are left alone. Returns the number of
+    new rows.
+    """
+    if not rows:
+        return 0
+    with SQLiteManager(dbfile) as db: 
+        return db.insert_hbpdata_many(rows)
+
+
 def remove_row(play_id: str, dbfile: str = db_file_path, dbtable: str = db_table) -> bool:
     deleted = False
     with SQLiteManager(dbfile) as db: 
@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 
 import argparse
+import html
 import os
 import pprint
+import re
 import requests
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from datetime import datetime, date, timedelta
 from pathlib import Path
 from tqdm import tqdm
@@ -13,6 +15,8 @@ from typing import Optional
 
 from . import basic as basic
 from . import constants as const
+from . import func_database as dbmgr
+from . import httpclient as http
 from .configurator import ConfigReader
 
 
@@ -25,6 +29,18 @@ plot_dir  = config.get("paths", "plot_dir")
 skeet_dir = config.get("paths", "skeet_dir")
 video_dir = config.get("paths", "video_dir")
 
+## What we look for in a sporty-videos page: the video-box div, then the
+## first mp4 <source> after it. video-box has to be a whole class name, not
+## the front of one like video-box-header.
+VIDEO_BOX_MARKER   = "video-box"
+VIDEO_BOX_PATTERN  = re.compile(r'<div\b[^>]*\bclass\s*=\s*["\'](?:[^"\']*\s)?video-box["\'\s]', re.IGNORECASE)
+SOURCE_TAG_PATTERN = re.compile(r'<source\b[^>]*>', re.IGNORECASE)
+TAG_ATTR_PATTERN   = re.compile(r'([\w-]+)\s*=\s*"([^"]*)"')
+
+## Videos are a few MB. Big enough to keep syscalls down, small enough that
+## an interrupted download keeps most of what it got.
+VIDEO_CHUNK_SIZE = 256 * 1024
+
 
 ## -------------------------------------------------------------------------- ##
 ## DATE FUNCTIONS
@@ -46,6 +62,36 @@ def subtract_one_day_from_date(date_str: Optional[str] = None):
     return transcend_time_and_space("backward", date_str)
 
 
+def build_date_list(start_date: str, num_days: int, backward: Optional[bool] = False) -> list:
+    '''Every date a multi-day run visits, in the order it visits them.'''
+    date_list    = []
+    current_date = str(start_date)
+    for xday in range(num_days):
+        date_list.append(current_date)
+        if backward:
+            current_date = subtract_one_day_from_date(current_date)
+        else:
+            current_date = add_one_day_to_date(current_date)
+    return date_list
+
+
+def build_season_shards(start_season: int, end_season: int, shard_days: int) -> list:
+    '''
+    Splits the baseball part of each season (no winters) into (start, end)
+    date string pairs of at most shard_days days. Never goes past yesterday.
+    '''
+    shards    = []
+    yesterday = date.today() - timedelta(days=1)
+    for season in range(start_season, end_season + 1):
+        shard_start = parse_date_string(f"{season}-{const.SEASON_START_MONTH_DAY}")
+        season_end  = min(parse_date_string(f"{season}-{const.SEASON_END_MONTH_DAY}"), yesterday)
+        while shard_start <= season_end:
+            shard_end = min(shard_start + timedelta(days=shard_days - 1), season_end)
+            shards.append((shard_start.strftime("%Y-%m-%d"), shard_end.strftime("%Y-%m-%d")))
+            shard_start = shard_end + timedelta(days=1)
+    return shards
+
+
 def transcend_time_and_space(direction: str, date_str: Optional[str] = None):
     return_date = None
     if date_str is None:
@@ -66,44 +112,156 @@ def transcend_time_and_space(direction: str, date_str: Optional[str] = None):
 ## VIDEO FUNCTIONS
 ## -------------------------------------------------------------------------- ##
 
+def get_video_file_path(game_pk: str, play_id: str, video_dir: Optional[str] = video_dir) -> Path:
+    return Path(video_dir, f"{game_pk}_{play_id}.mp4")
+
+
+def get_video_part_path(video_file_path: Path) -> Path:
+    """Where a video lives until it's completely downloaded."""
+    return Path(f"{video_file_path}.part")
+
+
+def find_savant_video_url(page_html: str) -> str:
+    """
+    Pulls the mp4 URL out of a sporty-videos page without building the whole
+    tree. Falls back to parsing just the video-box div if the markup ever
+    stops matching the patterns. None if there's no video (yet).
+    """
+    ## No video-box at all is a play without a video; nothing to parse.
+    if VIDEO_BOX_MARKER not in page_html:
+        return None
+    video_box = VIDEO_BOX_PATTERN.search(page_html)
+    if video_box is not None:
+        ## Only the box's own <video>; a <source> further down is somebody else's.
+        video_end = page_html.find("</video>", video_box.end())
+        if video_end < 0:
+            video_end = len(page_html)
+        for source_tag in SOURCE_TAG_PATTERN.finditer(page_html, video_box.end(), video_end):
+            attrs = dict(TAG_ATTR_PATTERN.findall(source_tag.group(0)))
+            if attrs.get("type") == "video/mp4" and attrs.get("src"):
+                return html.unescape(attrs["src"])
+
+    soup   = BeautifulSoup(page_html, "lxml", parse_only=SoupStrainer('div', class_='video-box'))
+    source = soup.find('source', type='video/mp4')
+    return source['src'] if source else None
+
+
+def resolve_baseball_savant_video_url(play_id: str, verbose_bool: Optional[bool] = False) -> str:
+    """
+    The mp4 URL for a play. Ones we've resolved before come out of the
+    database; the rest cost one page fetch and get stored for next time.
+    """
+    video_url = dbmgr.get_cached_video_url(play_id)
+    if video_url is not None:
+        if verbose_bool:
+            print(f"Video URL for {play_id} is cached: {video_url}")
+        return video_url
+
+    page_url = f"{const.BASEBALL_SAVANT_PLAY_VIDEO_URL}?playId={play_id}"
+    response = http.get(page_url)
+    response.raise_for_status()
+    video_url = find_savant_video_url(response.text)
+    if video_url is not None:
+        dbmgr.store_video_url(play_id, video_url)
+    return video_url
+
+
+def parse_content_range_total(content_range: Optional[str]) -> int:
+    """The full size out of a 'bytes 100-199/1234' (or 'bytes */1234') header, or 0."""
+    if not content_range or "/" not in content_range:
+        return 0
+    total = content_range.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else 0
+
+
+def download_video_file(video_url: str, video_file_path: Path, chunk_size: Optional[int] = VIDEO_CHUNK_SIZE) -> int:
+    """
+    Streams a video into '<video_file_path>.part' and only renames it into
+    place once its length checks out, so an interrupted download never looks
+    finished. If a .part file is already there, picks up where it left off
+    with a Range request. Raises if the download comes up short. Returns how
+    many bytes came over the wire this time.
+    """
+    part_path   = get_video_part_path(video_file_path)
+    resume_from = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    ## Ask for the bytes as stored, so content-length and Range line up with the file.
+    headers     = {"Accept-Encoding": "identity"}
+    if resume_from > 0:
+        headers["Range"] = f"bytes={resume_from}-"
+
+    video_res = http.get(video_url, stream=True, headers=headers)
+    if video_res.status_code == 416:
+        ## Nothing left to send: either the .part is already whole, or it's
+        ## stale and bigger than the video. Keep the first, redo the second.
+        video_res.close()
+        if resume_from > 0 and resume_from == parse_content_range_total(video_res.headers.get('content-range')):
+            os.replace(part_path, video_file_path)
+            return 0
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        resume_from = 0
+        headers.pop("Range", None)
+        video_res   = http.get(video_url, stream=True, headers=headers)
+    video_res.raise_for_status()
+
+    if video_res.status_code == 206:
+        total_size = parse_content_range_total(video_res.headers.get('content-range'))
+    else:
+        ## The server ignored the Range header; start over.
+        resume_from = 0
+        total_size  = int(video_res.headers.get('content-length', 0))
+
+    ## https://stackoverflow.com/a/37573701
+    transferred = 0
+    with video_res, tqdm(total=total_size, initial=resume_from, unit="B", unit_scale=True) as progress_bar:
+        with open(part_path, "ab" if resume_from > 0 else "wb", buffering=chunk_size) as file:
+            for data in video_res.iter_content(chunk_size):
+                progress_bar.update(len(data))
+                file.write(data)
+                transferred = transferred + len(data)
+
+    downloaded_size = os.path.getsize(part_path)
+    if total_size != 0 and downloaded_size != total_size:
+        raise RuntimeError(f"Could not download file: got {downloaded_size} of {total_size} bytes, will resume next time")
+    os.replace(part_path, video_file_path)
+    return transferred
+
+
+class VideoUrlError(RuntimeError):
+    """Savant's video page for a play couldn't be fetched."""
+
+
 def download_baseball_savant_play(
     game_pk: str, 
     play_id: str, 
     verbose_bool: Optional[bool] = False, 
     video_dir: Optional[str] = video_dir
-) -> str:
-    page_url        = f"{const.BASEBALL_SAVANT_PLAY_VIDEO_URL}?playId={play_id}"
+) -> tuple:
+    '''
+    Returns (video_file_path, bytes_transferred). The path is None if Savant
+    hasn't published the video yet. Raises VideoUrlError if the video page
+    couldn't be fetched; download errors are raised as they are.
+    '''
     video_url       = None
-    video_file_path = None
+    video_file_path = get_video_file_path(game_pk, play_id, video_dir)
 
-    try:
-        response = requests.get(page_url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "lxml")
-        video_container = soup.find('div', class_='video-box')
-
-        ## Download that sucker!
-        if video_container:
-            video_url       = video_container.find('video').find('source', type='video/mp4')['src']
-            video_file_path = Path(video_dir, f"{game_pk}_{play_id}.mp4")
-
-            if not os.path.exists(video_file_path):
-                video_res = requests.get(video_url, stream=True)
-                video_res.raise_for_status()
-
-                ## https://stackoverflow.com/a/37573701
-                total_size = int(video_res.headers.get('content-length', 0))
-                chunk_size = 1024  # 1 KB chunks
-                with tqdm(total=total_size, unit="B", unit_scale=True) as progress_bar:
-                    with open(video_file_path, "wb") as file:
-                        for data in video_res.iter_content(chunk_size):
-                            progress_bar.update(len(data))
-                            file.write(data)
-
-                if total_size != 0 and progress_bar.n != total_size:
-                    raise RuntimeError("Could not download file")
+    ## Only finished downloads ever get this name, so there's nothing to fetch.
+    if os.path.exists(video_file_path):
+        return video_file_path, 0
 
+    try:
+        video_url = resolve_baseball_savant_video_url(play_id, verbose_bool)
     except Exception as e:
-        print(f"Error fetching video URL from {page_url}: {e}.")
+        raise VideoUrlError(f"Couldn't fetch the video URL for {play_id}: {e}") from e
 
-    return video_file_path
+    ## Savant hasn't published the video yet.
+    if video_url is None:
+        return None, 0
+
+    ## Download that sucker!
+    try:
+        return video_file_path, download_video_file(video_url, video_file_path)
+    except requests.HTTPError:
+        ## The URL itself went bad; resolve it again next time.
+        dbmgr.forget_video_url(play_id)
+        raise
@@ -12,6 +12,7 @@ from . import basic as basic
 from . import constants as const
 from . import func_baseball as bb
 from .configurator import ConfigReader
+from .models import GameInfo, HbpEvent
 
 
 ## -------------------------------------------------------------------------- ##
@@ -71,7 +72,7 @@ def read_skeet_text(filename: str, verbose_bool: Optional[bool] = False) -> str:
     return file_contents
 
 
-def write_desc_skeet_text(game: list, event: list, skeet_dir: str, verbose_bool: Optional[bool] = False) -> str:
+def write_desc_skeet_text(game: GameInfo, event: HbpEvent, skeet_dir: str, verbose_bool: Optional[bool] = False) -> str:
     '''Returns the filename of the skeet, not the actual skeet!'''
     if verbose_bool:
         print("# --------- >")
@@ -79,42 +80,42 @@ def write_desc_skeet_text(game: list, event: list, skeet_dir: str, verbose_bool:
         print("# ---")
         pprint.pprint(event)
 
-    game_datetime_obj = datetime.strptime(game['date'], "%Y-%m-%d")
+    game_datetime_obj = datetime.strptime(game.date, "%Y-%m-%d")
     date_str          = f"⚾💥 {game_datetime_obj.strftime("%d %B %Y")} 💥⚾"
-    series_desc_str   = f"Game: {game['description']}"
+    series_desc_str   = f"Game: {game.description}"
 
     ## If the game is finished, there'll be a final score.
-    if 'final_score' in game['home']:
-        winning_team       = game['away']['team']
-        winning_score      = game['away']['final_score']
-        losing_score       = game['home']['final_score']
-        if game['home']['final_score'] > game['away']['final_score']:
-            winning_team  = game['home']['team']
-            winning_score = game['home']['final_score']
-            losing_score  = game['away']['final_score']
+    if game.is_final:
+        winning_team       = game.away.team
+        winning_score      = game.away.final_score
+        losing_score       = game.home.final_score
+        if game.home.final_score > game.away.final_score:
+            winning_team  = game.home.team
+            winning_score = game.home.final_score
+            losing_score  = game.away.final_score
 
     ## If nobody got hit, add that to the skeet_strs list.
-    if len(event) == 0:
-        team_str           = f"⚾🧤 {game['away']['team']} at {game['home']['team']} 🧤⚾"
+    if not event:
+        team_str           = f"⚾🧤 {game.away.team} at {game.home.team} 🧤⚾"
         nobody_got_hit_str = f"👍 Nobody got hit!"
         
         winning_line_str = ''
-        if 'final_score' in game['home']: 
-            winning_line_str = f"{winning_team} won {winning_score}-{losing_score} in {game['innings']} innings"  
+        if game.is_final: 
+            winning_line_str = f"{winning_team} won {winning_score}-{losing_score} in {game.innings} innings"  
             
         skeet_strs = [team_str, date_str, series_desc_str, nobody_got_hit_str, winning_line_str]
 
     ## Somebody got hit!
     else:
         game_is_tied   = False
-        leading_team   = game['away']['team']
-        leading_score  = event['at_bat']['away_score']
-        trailing_score = event['at_bat']['home_score']
-        if event['at_bat']['home_score'] > event['at_bat']['away_score']:
-            leading_team   = game['home']['team']
-            leading_score  = event['at_bat']['home_score']
-            trailing_score = event['at_bat']['away_score']
-        elif event['at_bat']['home_score'] == event['at_bat']['away_score']:
+        leading_team   = game.away.team
+        leading_score  = event.at_bat.away_score
+        trailing_score = event.at_bat.home_score
+        if event.at_bat.home_score > event.at_bat.away_score:
+            leading_team   = game.home.team
+            leading_score  = event.at_bat.home_score
+            trailing_score = event.at_bat.away_score
+        elif event.at_bat.home_score == event.at_bat.away_score:
             game_is_tied = True
 
         teamname_str = bb.get_mlb_team_attribute(leading_team, 'teamname')
@@ -124,14 +125,14 @@ def write_desc_skeet_text(game: list, event: list, skeet_dir: str, verbose_bool:
         if game_is_tied: 
             score_str = f"tied at {leading_score}-{trailing_score}"
 
-        batter_str      = f"Batter: {bb.build_mlb_player_display_string(event['batter'])}"
-        pitcher_str     = f"Pitcher: {bb.build_mlb_player_display_string(event['pitcher'])}"
-        count_str       = f"The Play: {bb.build_hbp_event_count(event['at_bat'])}, {score_str}"
-        pitch_str       = f"The Pitch: {bb.build_hbp_event_pitch(event['at_bat'])}"
+        batter_str      = f"Batter: {bb.build_mlb_player_display_string(event.batter)}"
+        pitcher_str     = f"Pitcher: {bb.build_mlb_player_display_string(event.pitcher)}"
+        count_str       = f"The Play: {bb.build_hbp_event_count(event.at_bat)}, {score_str}"
+        pitch_str       = f"The Pitch: {bb.build_hbp_event_pitch(event.at_bat)}"
 
         final_score_str = ''
-        if 'final_score' in game['home']: 
-            final_score_str = f"Final: {winning_team} won {winning_score}-{losing_score} in {game['innings']} innings."
+        if game.is_final: 
+            final_score_str = f"Final: {winning_team} won {winning_score}-{losing_score} in {game.innings} innings."
 
         skeet_strs = [date_str, series_desc_str, pitcher_str, batter_str, count_str, pitch_str, final_score_str]
 
@@ -141,9 +142,9 @@ def write_desc_skeet_text(game: list, event: list, skeet_dir: str, verbose_bool:
         raise Exception("Basic skeet text is already too long!")
 
     ## Build filename
-    skeet_file_path = Path(skeet_dir, f"{game['game_pk']}_clean.txt")
-    if len(event) > 0:
-        skeet_file_path = Path(skeet_dir, f"{game['game_pk']}_{event['play_id']}_desc.txt")
+    skeet_file_path = Path(skeet_dir, f"{game.game_pk}_clean.txt")
+    if event:
+        skeet_file_path = Path(skeet_dir, f"{game.game_pk}_{event.play_id}_desc.txt")
 
     with open(skeet_file_path, 'w', encoding='utf-8') as f:
         f.write(total_skeet_str)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+
+import os
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from pybaseball import statcast
+from typing import Optional
+
+from . import basic as basic
+from . import constants as const
+from . import func_baseball as bb
+from . import func_database as dbmgr
+from . import func_general as gen
+from .configurator import ConfigReader
+from .ratelimiter import TokenBucket
+
+
+## -------------------------------------------------------------------------- ##
+## STATCAST CONFIG
+## -------------------------------------------------------------------------- ##
+
+config            = ConfigReader(basic.verify_file_path(basic.sanitize_path(const.DEFAULT_CONFIG_INI_FILE)))
+statcast_dir      = Path(config.get("paths", "cache_dir"), "statcast")
+statcast_chunk    = int(config.get("statcast", "chunk_days"))
+statcast_workers  = int(config.get("statcast", "workers"))
+
+## Where the live feed's endSpeed is measured: the front of home plate.
+PLATE_FRONT_Y_FT  = 17 / 12
+FT_PER_SEC_TO_MPH = 3600 / 5280
+
+TRAJECTORY_COLUMNS = ["vx0", "vy0", "vz0", "ax", "ay", "az"]
+
+HBP_COLUMNS = [
+    "game_pk", "game_date", "at_bat_number", "pitcher", "batter", "plate_x", "plate_z",
+] + TRAJECTORY_COLUMNS
+
+## Everything a Savant search export needs to have for us to load it.
+SAVANT_CSV_COLUMNS = set(HBP_COLUMNS + ["events", "play_id", "end_speed"])
+
+
+## -------------------------------------------------------------------------- ##
+## STATCAST FUNCTIONS
+## -------------------------------------------------------------------------- ##
+
+def build_date_chunks(start_date: str, end_date: str, chunk_days: Optional[int] = statcast_chunk) -> list:
+    '''Splits a date range into (start, end) date string pairs of at most chunk_days days.'''
+    chunks      = []
+    chunk_start = gen.parse_date_string(str(start_date))
+    last_day    = gen.parse_date_string(str(end_date))
+    while chunk_start <= last_day:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), last_day)
+        chunks.append((chunk_start.strftime("%Y-%m-%d"), chunk_end.strftime("%Y-%m-%d")))
+        chunk_start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def get_statcast_chunk(start_date: str, end_date: str, use_cache: Optional[bool] = True) -> pd.DataFrame:
+    '''
+    Every pitch Statcast has between two dates. Chunks that are entirely in
+    the past are kept as Parquet files, since Statcast doesn't change them
+    after the fact; recent chunks are always fetched fresh.
+    '''
+    chunk_path = Path(statcast_dir, f"{start_date}_{end_date}.parquet")
+    if use_cache and chunk_path.is_file():
+        return pd.read_parquet(chunk_path)
+
+    pitches = statcast(start_dt=start_date, end_dt=end_date, verbose=False, parallel=False)
+    if pitches is None:
+        pitches = pd.DataFrame(columns=HBP_COLUMNS)
+
+    if use_cache and gen.parse_date_string(end_date) < date.today() - timedelta(days=1):
+        os.makedirs(statcast_dir, exist_ok=True)
+        tmp_path = chunk_path.with_suffix(".parquet.tmp")
+        pitches.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, chunk_path)
+    return pitches
+
+
+def filter_hit_by_pitch_events(pitches: pd.DataFrame) -> pd.DataFrame:
+    '''Just the HBPs, with the columns we need and end_speed worked out.'''
+    if "events" not in pitches.columns:
+        return pd.DataFrame(columns=HBP_COLUMNS + ["end_speed"])
+
+    columns = [column for column in HBP_COLUMNS + ["play_id", "end_speed"] if column in pitches.columns]
+    hbps    = pitches.loc[pitches["events"].eq("hit_by_pitch"), columns].copy()
+    hbps["game_date"] = pd.to_datetime(hbps["game_date"]).dt.strftime("%Y-%m-%d")
+
+    ## Older exports still carry end_speed; only fill in what's missing.
+    if set(TRAJECTORY_COLUMNS).issubset(hbps.columns):
+        end_speed = compute_end_speed(hbps)
+        hbps["end_speed"] = hbps["end_speed"].fillna(end_speed) if "end_speed" in hbps.columns else end_speed
+    elif "end_speed" not in hbps.columns:
+        hbps["end_speed"] = np.nan
+    return hbps.reset_index(drop=True)
+
+
+def compute_end_speed(pitches: pd.DataFrame) -> pd.Series:
+    '''
+    Statcast only gives us release speed. Run the nine-parameter pitch fit
+    forward to the front of the plate to get the same endSpeed the live feed
+    reports, in mph.
+    '''
+    vx0, vy0, vz0 = pitches["vx0"], pitches["vy0"], pitches["vz0"]
+    ax,  ay,  az  = pitches["ax"],  pitches["ay"],  pitches["az"]
+
+    ## The fit starts at y = 50 ft; solve y(t) = PLATE_FRONT_Y_FT for t.
+    distance = 50 - PLATE_FRONT_Y_FT
+    t = (-vy0 - np.sqrt(vy0**2 - 2 * ay * distance)) / ay
+
+    speed = np.sqrt((vx0 + ax * t)**2 + (vy0 + ay * t)**2 + (vz0 + az * t)**2)
+    return (speed * FT_PER_SEC_TO_MPH).round(1)
+
+
+def resolve_missing_play_ids(
+    hbps: pd.DataFrame,
+    verbose_bool: Optional[bool] = False,
+    limiter: Optional[TokenBucket] = None,
+    max_workers: Optional[int] = 1
+) -> pd.DataFrame:
+    '''
+    Statcast exports don't always carry play_id, which is what the rest of
+    the app keys on. Fill the gaps from each game's live feed, matching on
+    at-bat number. That's one feed per game with an HBP: cheap once the feed
+    cache is warm, but about as many requests as the feed path when it's
+    cold. Lookups go through limiter, max_workers at a time.
+    '''
+    if "play_id" not in hbps.columns:
+        hbps["play_id"] = None
+    missing = hbps["play_id"].isna()
+
+    def lookup(game_pk) -> tuple:
+        if limiter is not None:
+            limiter.acquire()
+        return game_pk, bb.get_mlb_hit_by_pitch_play_ids(int(game_pk), verbose_bool)
+
+    game_pks = list(hbps.loc[missing, "game_pk"].unique())
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for game_pk, play_ids in executor.map(lookup, game_pks):
+            in_game = missing & hbps["game_pk"].eq(game_pk)
+            hbps.loc[in_game, "play_id"] = hbps.loc[in_game, "at_bat_number"].map(play_ids)
+    return hbps
+
+
+def build_hbpdata_rows(hbps: pd.DataFrame) -> list:
+    '''
+    hbpdata rows in insert_hbpdata_many() order, one per play_id. Rows
+    missing anything hbpdata can't do without are dropped; NaNs become NULLs.
+    '''
+    columns = ["play_id", "game_pk", "game_date", "pitcher", "batter", "end_speed", "plate_x", "plate_z"]
+    hbps    = hbps.reindex(columns=columns).dropna(subset=columns[:5]).drop_duplicates("play_id")
+    hbps    = hbps.astype(object)
+    hbps    = hbps.where(hbps.notna(), None)
+    return list(hbps.itertuples(index=False, name=None))
+
+
+def read_savant_csv(csv_path: str, chunk_rows: Optional[int] = 250000):
+    '''
+    Reads a Baseball Savant search export a chunk at a time, so memory use
+    doesn't grow with the file. Yields (hbp_count, rows) per chunk, where
+    rows are ready for insert_hbpdata_rows(). No network involved: HBPs
+    without a play_id are counted but not loaded.
+    '''
+    chunks = pd.read_csv(
+        csv_path,
+        chunksize=chunk_rows,
+        usecols=lambda column: column in SAVANT_CSV_COLUMNS,
+        low_memory=False,
+    )
+    for chunk in chunks:
+        hbps = filter_hit_by_pitch_events(chunk)
+        if "play_id" not in hbps.columns:
+            hbps["play_id"] = None
+        yield len(hbps), build_hbpdata_rows(hbps)
+
+
+def populate_from_statcast(
+    start_date: str,
+    end_date: str,
+    max_workers: Optional[int] = statcast_workers,
+    use_cache: Optional[bool] = True,
+    verbose_bool: Optional[bool] = False,
+    limiter: Optional[TokenBucket] = None,
+    lookup_workers: Optional[int] = 1
+) -> tuple:
+    '''
+    Bulk loads every HBP between two dates into hbpdata, pulling Statcast in
+    chunks across a thread pool. Missing play_ids are looked up through
+    limiter, lookup_workers at a time. Returns (hbp_count, new_rows).
+    '''
+    chunks = build_date_chunks(start_date, end_date)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        chunk_hbps = list(executor.map(
+            lambda chunk: filter_hit_by_pitch_events(get_statcast_chunk(*chunk, use_cache)),
+            chunks
+        ))
+
+    hbps = pd.concat(chunk_hbps, ignore_index=True) if chunk_hbps else pd.DataFrame(columns=HBP_COLUMNS)
+    if hbps.empty:
+        return 0, 0
+
+    hbps = resolve_missing_play_ids(hbps, verbose_bool, limiter, lookup_workers)
+    rows = build_hbpdata_rows(hbps)
+    if verbose_bool:
+        print(f"  {len(hbps)} HBPs in Statcast, {len(rows)} with a play_id.")
+    return len(hbps), dbmgr.insert_hbpdata_rows(rows)
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+
+import copy
+import pprint
+
+from typing import Optional
+
+from . import constants as const
+from . import httpclient as http
+from .feedcache import FeedCache
+from .models import loads
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+PLAY_PREFIX          = "liveData.plays.allPlays.item"
+STREAM_CHUNK_SIZE    = 64 * 1024
+STREAMED_SCALARS     = {
+    "gameData.status.abstractGameState": ("gameData", "status", "abstractGameState"),
+    "liveData.linescore.teams.home.runs": ("liveData", "linescore", "teams", "home", "runs"),
+    "liveData.linescore.teams.away.runs": ("liveData", "linescore", "teams", "away", "runs"),
+    "liveData.linescore.currentInning"  : ("liveData", "linescore", "currentInning"),
+}
+
+
+def _split_json_pointer(pointer: str) -> list:
+    if pointer == "":
+        return []
+    return [part.replace("~1", "/").replace("~0", "~") for part in pointer.lstrip("/").split("/")]
+
+
+def _resolve_json_pointer_parent(doc, pointer: str) -> tuple:
+    parts  = _split_json_pointer(pointer)
+    target = doc
+    for part in parts[:-1]:
+        target = target[int(part)] if isinstance(target, list) else target[part]
+    return target, parts[-1]
+
+
+def _get_json_pointer(doc, pointer: str):
+    target = doc
+    for part in _split_json_pointer(pointer):
+        target = target[int(part)] if isinstance(target, list) else target[part]
+    return target
+
+
+def apply_json_patch(doc, operations: list):
+    """
+    Applies RFC 6902 JSON Patch operations to doc in place, which is what the
+    live feed's diffPatch endpoint hands back. Returns the patched document
+    (a new one, if an operation replaced the root).
+    """
+    for operation in operations:
+        op   = operation["op"]
+        path = operation["path"]
+
+        if op in ("copy", "move"):
+            value = copy.deepcopy(_get_json_pointer(doc, operation["from"]))
+            if op == "move":
+                doc = apply_json_patch(doc, [{"op": "remove", "path": operation["from"]}])
+            op, operation = "add", {"op": "add", "path": path, "value": value}
+        if op == "test":
+            if _get_json_pointer(doc, path) != operation["value"]:
+                raise ValueError(f"JSON patch test failed at '{path}'.")
+            continue
+
+        if path == "":
+            if op == "remove":
+                doc = None
+            else:
+                doc = operation["value"]
+            continue
+
+        parent, key = _resolve_json_pointer_parent(doc, path)
+        if isinstance(parent, list):
+            if op == "add":
+                if key == "-":
+                    parent.append(operation["value"])
+                else:
+                    parent.insert(int(key), operation["value"])
+            elif op == "replace":
+                parent[int(key)] = operation["value"]
+            elif op == "remove":
+                del parent[int(key)]
+            else:
+                raise ValueError(f"Unknown JSON patch operation '{op}'.")
+        else:
+            if op in ("add", "replace"):
+                parent[key] = operation["value"]
+            elif op == "remove":
+                del parent[key]
+            else:
+                raise ValueError(f"Unknown JSON patch operation '{op}'.")
+    return doc
+
+
+class _ResponseStream:
+    """Just enough of a file object over a streamed response for ijson."""
+    def __init__(self, response, chunk_size: Optional[int] = STREAM_CHUNK_SIZE):
+        self._chunks = response.iter_content(chunk_size)
+        self._buffer = b""
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class GameFeed:
+    def __init__(
+        self,
+        game_pk: int,
+        verbose_bool: Optional[bool] = False,
+        cache: Optional[FeedCache] = None,
+        refresh: Optional[bool] = False,
+        stream: Optional[bool] = False,
+        keep_events: Optional[tuple] = ("Hit By Pitch",),
+    ):
+        """
+        Wraps a single game's live feed. The feed is downloaded and decoded at
+        most once, no matter how many pieces of it get asked for.
+
+        :param game_pk: The MLB game_pk of the game.
+        :param verbose_bool: Dump the decoded feed when it gets loaded.
+        :param cache: Optional on-disk cache to read Final feeds through.
+        :param refresh: Ignore any cached copy, but still update the cache.
+        :param stream: Parse the feed incrementally off the wire and only hold
+                       on to plays whose result is in keep_events. Streamed
+                       feeds are never written to the cache.
+        :param keep_events: Play results worth keeping when streaming.
+        """
+        self.game_pk      = game_pk
+        self.verbose_bool = verbose_bool
+        self.cache        = cache
+        self.refresh      = refresh
+        self.stream       = stream and ijson is not None
+        self.keep_events  = keep_events
+        self.from_cache   = False
+        self.streamed     = False
+        self._innings     = None
+        self.url          = const.MLB_STATS_BASE_URL + const.MLB_STATS_LIVE_FEED_STUB.replace('<<GAME_PK>>', str(game_pk))
+        self.diff_url     = const.MLB_STATS_BASE_URL + const.MLB_STATS_LIVE_DIFF_STUB.replace('<<GAME_PK>>', str(game_pk))
+        self._data        = None
+
+    @classmethod
+    def from_data(cls, data: dict, verbose_bool: Optional[bool] = False) -> "GameFeed":
+        """Wraps an already decoded feed, e.g. one read from an archive. Never touches the network."""
+        feed       = cls(data.get("gamePk") or data["gameData"]["game"]["pk"], verbose_bool)
+        feed._data = data
+        return feed
+
+    @property
+    def data(self) -> dict:
+        """The decoded live feed. Fetched on first access."""
+        if self._data is None:
+            self._data = self._fetch()
+            if self.verbose_bool:
+                pprint.pprint(self._data)
+        return self._data
+
+    def _fetch(self) -> dict:
+        if self.cache is not None and not self.refresh:
+            data = self.cache.get(self.game_pk)
+            if data is not None:
+                self.from_cache = True
+                return data
+
+        if self.stream:
+            return self._fetch_streaming()
+
+        response = http.get(self.url)
+        response.raise_for_status()
+        data = loads(response.content)
+
+        ## Finished games are done changing, so they're safe to keep around.
+        if self.cache is not None and data.get("gameData", {}).get("status", {}).get("abstractGameState") == "Final":
+            self.cache.put(self.game_pk, response.content)
+        return data
+
+    def _fetch_streaming(self) -> dict:
+        """
+        Walks the feed as it comes off the wire. Only the handful of fields we
+        need plus the plays in keep_events are ever built into Python objects;
+        everything else (boxscore, players, pitch trajectories) is skipped.
+        The result is a skeleton shaped like the full feed.
+        """
+        data = {
+            "gameData": {"status": {}},
+            "liveData": {"linescore": {"teams": {"home": {}, "away": {}}}, "plays": {"allPlays": []}},
+        }
+        kept_plays = data["liveData"]["plays"]["allPlays"]
+        self.streamed = True
+
+        with http.get(self.url, stream=True) as response:
+            response.raise_for_status()
+            builder = None
+            for prefix, event, value in ijson.parse(_ResponseStream(response), use_float=True):
+                if prefix == PLAY_PREFIX:
+                    if event == "start_map":
+                        builder = ijson.ObjectBuilder()
+                        builder.event(event, value)
+                    elif event == "end_map" and builder is not None:
+                        builder.event(event, value)
+                        kept_plays.append(builder.value)
+                        builder = None
+                    elif builder is not None:
+                        builder.event(event, value)
+                    continue
+
+                if prefix.startswith(PLAY_PREFIX):
+                    if prefix == PLAY_PREFIX + ".about.inning":
+                        self._innings = value
+                    elif prefix == PLAY_PREFIX + ".result.event" and value not in self.keep_events:
+                        ## Not a play we care about; stop building it.
+                        builder = None
+                    if builder is not None:
+                        builder.event(event, value)
+                    continue
+
+                if prefix in STREAMED_SCALARS:
+                    *parents, key = STREAMED_SCALARS[prefix]
+                    target = data
+                    for parent in parents:
+                        target = target[parent]
+                    target[key] = value
+
+        ## The result can show up after playEvents; drop anything we couldn't
+        ## rule out early but doesn't match either.
+        kept_plays[:] = [
+            play for play in kept_plays
+            if play.get("result", {}).get("event") in self.keep_events
+        ]
+        return data
+
+    def update(self) -> bool:
+        """
+        Brings an already-loaded feed up to date by asking diffPatch for just
+        the changes since our last timecode and applying them locally. Loads
+        the full feed if we don't have one yet. Returns True if anything
+        changed. Doesn't work on streamed feeds, which are only a skeleton.
+        """
+        if self.stream:
+            raise RuntimeError("Streamed feeds can't be patched; create the GameFeed with stream=False.")
+        if self._data is None or self.timecode is None:
+            self._data = self._fetch()
+            return True
+
+        response = http.get(self.diff_url, params={"startTimecode": self.timecode})
+        response.raise_for_status()
+        patches = loads(response.content)
+
+        ## Too far behind, statsapi just sends the whole feed back.
+        if isinstance(patches, dict):
+            changed    = patches.get("metaData", {}).get("timeStamp") != self.timecode
+            self._data = patches
+            return changed
+
+        for patch in patches:
+            self._data = apply_json_patch(self._data, patch.get("diff", []))
+        if self.verbose_bool and patches:
+            print(f"[DEBUG] Applied {len(patches)} diffPatch updates to game {self.game_pk}; now at {self.timecode}.")
+        return len(patches) > 0
+
+    @property
+    def timecode(self) -> str:
+        """The feed's metaData.timeStamp, which diffPatch takes as startTimecode."""
+        if self._data is None:
+            return None
+        return self._data.get("metaData", {}).get("timeStamp")
+
+    @property
+    def abstract_game_state(self) -> str:
+        return self.data.get("gameData", {}).get("status", {}).get("abstractGameState")
+
+    @property
+    def all_plays(self) -> list:
+        return self.data.get("liveData", {}).get("plays", {}).get("allPlays", [])
+
+    @property
+    def total_innings(self) -> int:
+        ## A streamed skeleton only kept some plays; the last inning seen on
+        ## the wire is the real count. Feeds served from the cache are whole.
+        if self.streamed and self._innings is not None:
+            return self._innings
+        all_plays = self.all_plays
+        if all_plays and not self.streamed:
+            return all_plays[-1]['about']['inning']
+        return self.data.get("liveData", {}).get("linescore", {}).get("currentInning")
+
+    @property
+    def final_scores(self) -> dict:
+        """Runs per side according to the linescore, e.g. {'home': 3, 'away': 2}."""
+        teams = self.data.get("liveData", {}).get("linescore", {}).get("teams", {})
+        return {
+            'home': teams.get('home', {}).get('runs'),
+            'away': teams.get('away', {}).get('runs'),
+        }
+
+    def get_plays_by_event(self, event: str) -> list:
+        return [
+            play for play in self.all_plays
+            if play.get("result", {}).get("event") == event
+        ]
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+
+import hashlib
+import io
+import json
+import os
+import random
+import threading
+import time
+import requests
+
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from urllib3.response import HTTPResponse
+from urllib3.util.retry import Retry
+
+from . import basic as basic
+from . import constants as const
+from .configurator import ConfigReader
+from .feedcache import FeedCache
+from .ratelimiter import AdaptiveLimiter, TokenBucket
+
+
+## -------------------------------------------------------------------------- ##
+## HTTP CONFIG
+## -------------------------------------------------------------------------- ##
+
+config             = ConfigReader(basic.verify_file_path(basic.sanitize_path(const.DEFAULT_CONFIG_INI_FILE)))
+http_timeout       = float(config.get("http", "timeout"))
+http_retries       = int(config.get("http", "retries"))
+http_backoff       = float(config.get("http", "backoff_factor"))
+http_backoff_max   = float(config.get("http", "backoff_max"))
+http_jitter        = float(config.get("http", "backoff_jitter"))
+http_pool_hosts    = int(config.get("http", "pool_connections"))
+http_pool_per_host = int(config.get("http", "pool_maxsize"))
+http_user_agent    = config.get("http", "user_agent")
+http_mode          = config.get("http", "mode")
+http_fixture_dir   = config.get("paths", "fixture_dir")
+http_replay_delay  = float(config.get("http", "replay_latency_ms")) / 1000.0
+http_adaptive      = bool(int(config.get("http", "adaptive_concurrency")))
+http_min_in_flight = int(config.get("http", "min_in_flight"))
+http_max_in_flight = int(config.get("http", "max_in_flight"))
+http_latency_slack = float(config.get("http", "latency_tolerance"))
+
+HTTP_MODES         = ("live", "record", "replay")
+
+## Bodies and validators for conditional GETs. Only used against the live
+## network, so recordings and replays always see full responses.
+http_cache = None
+if bool(int(config.get("cache", "http_cache_enabled"))) and http_mode == "live":
+    http_cache = FeedCache(
+        Path(config.get("paths", "cache_dir"), "http"),
+        float(config.get("cache", "http_cache_max_mb")),
+        config.get("cache", "feed_cache_compression"),
+    )
+
+## How many requests we let into flight at once. Starts halfway between the
+## bounds and follows the server's latency, errors and Retry-After from there.
+http_limiter = None
+if http_adaptive:
+    http_limiter = AdaptiveLimiter(
+        (http_min_in_flight + http_max_in_flight) // 2,
+        http_min_in_flight,
+        http_max_in_flight,
+        http_latency_slack,
+    )
+
+## Headers that describe the transfer rather than the body we keep.
+TRANSFER_HEADERS   = ("content-encoding", "content-length", "transfer-encoding")
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+## Responses that mean "slow down", as opposed to "something broke".
+THROTTLE_STATUS_CODES = (429, 503)
+
+_session      = None
+_session_lock = threading.Lock()
+
+## Optional requests/second ceiling for every request this process sends.
+## Worker pools use it to share one politeness budget; see set_rate_limit().
+_rate_limit   = None
+
+
+## -------------------------------------------------------------------------- ##
+## RETRY POLICY
+## -------------------------------------------------------------------------- ##
+
+class JitterRetry(Retry):
+    """
+    A urllib3 Retry policy that adds a random jitter on top of the usual
+    exponential backoff, so a burst of failed requests doesn't come back
+    to the server in lockstep.
+    """
+    jitter = 0.0
+
+    def new(self, **kw):
+        ## urllib3 builds a fresh Retry after every attempt; carry the jitter.
+        retry = super().new(**kw)
+        retry.jitter = self.jitter
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        ## Every failed attempt passes through here, even ones the caller never
+        ## sees because a later retry worked; tell the concurrency limiter.
+        if http_limiter is not None:
+            if response is not None and response.status in THROTTLE_STATUS_CODES:
+                http_limiter.backoff(self.get_retry_after(response))
+            elif error is not None or response is not None:
+                http_limiter.backoff()
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return min(http_backoff_max, backoff + random.uniform(0, self.jitter))
+
+
+## -------------------------------------------------------------------------- ##
+## RECORD / REPLAY
+## -------------------------------------------------------------------------- ##
+
+class FixtureStore:
+    def __init__(self, fixture_dir: str):
+        """
+        Keeps recorded HTTP responses on disk, one metadata file plus one body
+        file per response. Requests are keyed by method and URL (with the query
+        string sorted). A URL that gets requested several times in a run, like
+        a polled feed, keeps each response in order.
+
+        :param fixture_dir: Directory holding the recorded responses.
+        """
+        self.fixture_dir = Path(fixture_dir)
+        self._counters   = {}
+        self._lock       = threading.Lock()
+
+    @staticmethod
+    def request_key(method: str, url: str) -> str:
+        parts = urlsplit(url)
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        canonical_url = urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+        return hashlib.sha256(f"{method.upper()} {canonical_url}".encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str, sequence: int) -> tuple:
+        fixture_subdir = Path(self.fixture_dir, key[:2])
+        return Path(fixture_subdir, f"{key}.{sequence}.json"), Path(fixture_subdir, f"{key}.{sequence}.body")
+
+    def _next_sequence(self, key: str) -> int:
+        with self._lock:
+            sequence = self._counters.get(key, 0)
+            self._counters[key] = sequence + 1
+        return sequence
+
+    def save(self, method: str, url: str, status: int, headers: dict, body: bytes):
+        key                  = self.request_key(method, url)
+        meta_path, body_path = self._paths(key, self._next_sequence(key))
+        os.makedirs(meta_path.parent, exist_ok=True)
+
+        ## requests already undid any gzip, so don't claim otherwise on replay.
+        headers = {name: value for name, value in headers.items() if name.lower() not in TRANSFER_HEADERS}
+        with open(body_path, "wb") as f:
+            f.write(body)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"method": method, "url": url, "status": status, "headers": headers}, f, indent=2)
+
+    def load(self, method: str, url: str) -> tuple:
+        """
+        Returns (status, headers, body) for the next recorded response to this
+        request. Once the recorded ones run out, the last one repeats.
+        """
+        key      = self.request_key(method, url)
+        sequence = self._next_sequence(key)
+        while sequence >= 0:
+            meta_path, body_path = self._paths(key, sequence)
+            if meta_path.is_file():
+                break
+            sequence = sequence - 1
+        else:
+            return None
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            body = f.read()
+        return meta["status"], meta["headers"], body
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Goes to the network as usual, then saves every response to the fixture store."""
+    def __init__(self, fixture_store: FixtureStore, *adapter_args, **adapter_kwargs):
+        self.fixture_store = fixture_store
+        super().__init__(*adapter_args, **adapter_kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        ## Reading .content here means streamed responses get buffered while
+        ## recording; iter_content() still works on them afterwards.
+        self.fixture_store.save(request.method, request.url, response.status_code, response.headers, response.content)
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Never touches the network; serves responses out of the fixture store."""
+    def __init__(self, fixture_store: FixtureStore, latency: Optional[float] = 0.0, *adapter_args, **adapter_kwargs):
+        self.fixture_store = fixture_store
+        self.latency       = latency
+        super().__init__(*adapter_args, **adapter_kwargs)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        recorded = self.fixture_store.load(request.method, request.url)
+        if recorded is None:
+            raise requests.ConnectionError(f"No recorded response for {request.method} {request.url}", request=request)
+        status, headers, body = recorded
+
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers=headers,
+            status=status,
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
+
+
+## -------------------------------------------------------------------------- ##
+## CONDITIONAL GET
+## -------------------------------------------------------------------------- ##
+
+def _conditional_cache_key(url: str, params: Optional[dict] = None) -> str:
+    return FixtureStore.request_key("GET", requests.Request("GET", url, params=params).prepare().url)
+
+
+def _load_validated(key: str) -> tuple:
+    """Returns (validators, body) for a cached response, or None."""
+    raw = http_cache.get_raw(key)
+    if raw is None:
+        return None
+    meta, _, body = raw.partition(b"\n")
+    return json.loads(meta), body
+
+
+def _store_validated(key: str, response: requests.Response):
+    etag          = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag is None and last_modified is None:
+        return
+    meta = {
+        "etag"         : etag,
+        "last_modified": last_modified,
+        "headers"      : {name: value for name, value in response.headers.items() if name.lower() not in TRANSFER_HEADERS},
+    }
+    http_cache.put(key, json.dumps(meta).encode("utf-8") + b"\n" + response.content)
+
+
+def _not_modified_response(meta: dict, body: bytes, response: requests.Response) -> requests.Response:
+    """Dresses the cached body up as the 200 the server would have sent."""
+    cached             = requests.Response()
+    cached.status_code = 200
+    cached.reason      = "OK"
+    cached.headers     = CaseInsensitiveDict(meta["headers"])
+    cached.encoding    = get_encoding_from_headers(cached.headers)
+    cached.url         = response.url
+    cached.request     = response.request
+    cached.elapsed     = response.elapsed
+    cached._content    = body
+    cached.from_cache  = True
+    return cached
+
+
+## -------------------------------------------------------------------------- ##
+## SESSION FUNCTIONS
+## -------------------------------------------------------------------------- ##
+
+
+def build_session(
+    retries: Optional[int] = http_retries,
+    backoff_factor: Optional[float] = http_backoff,
+    jitter: Optional[float] = http_jitter,
+    pool_connections: Optional[int] = http_pool_hosts,
+    pool_maxsize: Optional[int] = http_pool_per_host,
+    mode: Optional[str] = http_mode,
+    fixture_dir: Optional[str] = http_fixture_dir,
+    replay_latency: Optional[float] = http_replay_delay,
+) -> requests.Session:
+    """
+    Builds a pooled, retrying session. In 'record' mode every response is
+    also saved under fixture_dir; in 'replay' mode responses only ever come
+    from there, optionally delayed by replay_latency seconds.
+    """
+    if mode not in HTTP_MODES:
+        raise ValueError(f"Unknown HTTP mode '{mode}'. Expected one of {', '.join(HTTP_MODES)}.")
+
+    retry_policy = JitterRetry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    retry_policy.jitter = jitter
+
+    ## pool_block keeps us at pool_maxsize connections per host, no matter how
+    ## many threads are asking for one.
+    adapter_kwargs = {
+        "pool_connections": pool_connections,
+        "pool_maxsize"    : pool_maxsize,
+        "pool_block"      : True,
+        "max_retries"     : retry_policy,
+    }
+    if mode == "record":
+        adapter = RecordingAdapter(FixtureStore(fixture_dir), **adapter_kwargs)
+    elif mode == "replay":
+        adapter = ReplayAdapter(FixtureStore(fixture_dir), replay_latency, **adapter_kwargs)
+    else:
+        adapter = HTTPAdapter(**adapter_kwargs)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection"     : "keep-alive",
+        "User-Agent"     : http_user_agent,
+    })
+    return session
+
+
+def get_session() -> requests.Session:
+    """Returns the shared, pooled session. Built on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def close_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def reset_session():
+    """
+    Forgets the shared session without closing it. Forked worker processes
+    call this so they open their own connections instead of talking over
+    sockets that belong to the parent.
+    """
+    global _session, http_limiter
+    _session = None
+    if http_limiter is not None:
+        http_limiter = AdaptiveLimiter(
+            http_limiter.concurrency,
+            http_limiter.minimum,
+            http_limiter.maximum,
+            http_limiter.latency_tolerance,
+        )
+
+
+def concurrency_summary() -> str:
+    """One line on where the adaptive concurrency limit ended up, for run logs."""
+    if http_limiter is None:
+        return "adaptive concurrency is off"
+    return http_limiter.summary()
+
+
+def set_rate_limit(rate: float, burst: Optional[float] = None):
+    """
+    Caps how many requests per second this process sends, on top of the
+    adaptive concurrency limit. Process pools give each worker its share of
+    the overall budget, so the total doesn't grow with the worker count.
+    Zero or less turns the cap off.
+    """
+    global _rate_limit
+    _rate_limit = TokenBucket(rate, burst) if rate > 0 else None
+
+
+def _attempt_latency(response: Optional[requests.Response]) -> Optional[float]:
+    """
+    How long the request behind response took to get its headers back, or
+    None if it shouldn't count. That's when it raised, or when urllib3 retried
+    it: every failed attempt already went through JitterRetry.increment(),
+    and the time spent sleeping between attempts isn't server latency.
+    """
+    if response is None:
+        return None
+    retries = getattr(response.raw, "retries", None)
+    if retries is not None and retries.history:
+        return None
+    return response.elapsed.total_seconds()
+
+
+def _send(url: str, params: Optional[dict] = None, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+    """Sends a GET through the shared session, inside the adaptive concurrency limit."""
+    if _rate_limit is not None:
+        _rate_limit.acquire()
+    if http_limiter is None:
+        return get_session().get(url, params=params, timeout=timeout, **kwargs)
+
+    http_limiter.acquire()
+    response = None
+    try:
+        response = get_session().get(url, params=params, timeout=timeout, **kwargs)
+        return response
+    finally:
+        ## Streamed bodies are still on their way; time-to-headers is what we judge them by.
+        ok = response is not None and response.status_code < 500 and response.status_code not in THROTTLE_STATUS_CODES
+        http_limiter.release(_attempt_latency(response), ok)
+
+
+def get(
+    url: str,
+    params: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    conditional: Optional[bool] = False,
+    **kwargs
+) -> requests.Response:
+    """
+    Drop-in replacement for requests.get() that goes through the shared
+    session, so connections are kept alive and failed requests are retried.
+    How many requests are in flight at once adapts to how the server is
+    coping; see AdaptiveLimiter.
+
+    With conditional set, the response's ETag/Last-Modified are kept along
+    with its body, and the next request for the same URL asks the server
+    whether anything changed. A 304 comes back as a 200 built from the
+    local copy.
+    """
+    if timeout is None:
+        timeout = http_timeout
+    if not conditional or http_cache is None or kwargs.get("stream"):
+        return _send(url, params=params, timeout=timeout, **kwargs)
+
+    key     = _conditional_cache_key(url, params)
+    cached  = _load_validated(key)
+    headers = dict(kwargs.pop("headers", None) or {})
+    if cached is not None:
+        meta, body = cached
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = _send(url, params=params, timeout=timeout, headers=headers, **kwargs)
+    if response.status_code == 304 and cached is not None:
+        return _not_modified_response(meta, body, response)
+    if response.status_code == 200:
+        _store_validated(key, response)
+    return response
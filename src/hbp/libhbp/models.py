@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+import json
+
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+## -------------------------------------------------------------------------- ##
+## JSON DECODING
+## -------------------------------------------------------------------------- ##
+
+def loads(raw) -> dict:
+    """Decodes JSON with orjson when it's installed, the standard library otherwise."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+## -------------------------------------------------------------------------- ##
+## RECORD TYPES
+## -------------------------------------------------------------------------- ##
+
+class _Record:
+    """
+    Lets the typed records below still be read like the dicts they replaced,
+    e.g. event['at_bat']['end_speed'], for any code that hasn't moved over to
+    attributes yet.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+
+@dataclass(slots=True)
+class PlayerInfo(_Record):
+    id  : int
+    name: str
+    hand: str
+    team: str
+
+
+@dataclass(slots=True)
+class AtBat(_Record):
+    home_score  : int
+    away_score  : int
+    balls       : int
+    strikes     : int
+    outs_when_up: int
+    inning      : int
+    half_inning : str
+    start_speed : Optional[float] = None
+    end_speed   : Optional[float] = None
+    plate_x     : Optional[float] = None    ## in feet!
+    plate_z     : Optional[float] = None    ## in feet!
+    pitch_name  : Optional[str]   = None
+
+
+@dataclass(slots=True)
+class HbpEvent(_Record):
+    game_pk    : int
+    play_id    : Optional[str]
+    batter     : PlayerInfo
+    pitcher    : PlayerInfo
+    at_bat     : AtBat
+    description: str
+
+    @classmethod
+    def from_play(cls, play: dict, game_pk: int, home_team: str, away_team: str) -> "HbpEvent":
+        """
+        Decodes a single allPlays entry from the live feed, touching each
+        nested object only once and keeping just the fields we use.
+        """
+        matchup     = play["matchup"]
+        about       = play["about"]
+        result      = play["result"]
+        play_events = play.get("playEvents", [])
+        last_event  = play_events[-1]
+        count       = last_event["count"]
+        pitch_data  = last_event.get("pitchData", {})
+        coordinates = pitch_data.get("coordinates", {})
+        pitch_type  = last_event.get("details", {}).get("type")
+
+        ## The play_id lives on the final pitch, which isn't always the final event.
+        play_id = None
+        for play_event in reversed(play_events):
+            if play_event.get("isPitch"):
+                play_id = play_event.get("playId")
+                break
+
+        batting_team, pitching_team = (away_team, home_team) if about["halfInning"] == "top" else (home_team, away_team)
+        return cls(
+            game_pk=game_pk,
+            play_id=play_id,
+            batter=PlayerInfo(
+                id=matchup["batter"]["id"],
+                name=matchup["batter"]["fullName"],
+                hand=matchup["batSide"]["code"],
+                team=batting_team,
+            ),
+            pitcher=PlayerInfo(
+                id=matchup["pitcher"]["id"],
+                name=matchup["pitcher"]["fullName"],
+                hand=matchup["pitchHand"]["code"],
+                team=pitching_team,
+            ),
+            at_bat=AtBat(
+                home_score=result["homeScore"],
+                away_score=result["awayScore"],
+                balls=count["balls"],
+                strikes=count["strikes"],
+                outs_when_up=count["outs"],
+                inning=about["inning"],
+                half_inning=about["halfInning"],
+                start_speed=pitch_data.get("startSpeed"),
+                end_speed=pitch_data.get("endSpeed"),
+                plate_x=coordinates.get("pX"),
+                plate_z=coordinates.get("pZ"),
+                pitch_name=pitch_type["description"] if pitch_type and pitch_type != "no_pitch" else None,
+            ),
+            description=result["description"],
+        )
+
+
+@dataclass(slots=True)
+class TeamResult(_Record):
+    team       : str
+    final_score: Optional[int]
+    wins       : int
+    losses     : int
+    pct        : str
+
+
+@dataclass(slots=True)
+class GameInfo(_Record):
+    home       : TeamResult
+    away       : TeamResult
+    description: str
+    date       : str
+    innings    : Optional[int]
+    game_pk    : int
+    state      : Optional[str] = None
+
+    @property
+    def is_final(self) -> bool:
+        """Whether there's a final score to report."""
+        return self.home.final_score is not None and self.away.final_score is not None
+
+    def drop_final_scores(self):
+        """For games still in progress, whose scores aren't final yet."""
+        self.home.final_score = None
+        self.away.final_score = None
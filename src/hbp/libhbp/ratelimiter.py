@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+import asyncio
+import threading
+import time
+
+from typing import Optional
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Classic token bucket. Tokens drip in at 'rate' per second up to
+        'capacity', and every request spends one. Callers that find the bucket
+        empty reserve a token anyway and wait until it would have arrived, so
+        waiters are served in order and the long-run rate never exceeds 'rate'.
+
+        :param rate: Sustained requests per second. Zero or less disables limiting.
+        :param capacity: Largest burst allowed. Defaults to one second's worth.
+        """
+        self.rate      = float(rate)
+        self.capacity  = float(capacity) if capacity else max(1.0, self.rate)
+        self._tokens   = self.capacity
+        self._last     = time.monotonic()
+        self._lock     = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Takes a token and returns how long the caller has to wait for it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now          = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last   = now
+            self._tokens = self._tokens - 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AdaptiveLimiter:
+    ## Below this, latency is noise (cached and local responses), not congestion.
+    LATENCY_FLOOR = 0.05
+
+    def __init__(
+        self,
+        initial: Optional[int] = 4,
+        minimum: Optional[int] = 1,
+        maximum: Optional[int] = 8,
+        latency_tolerance: Optional[float] = 2.0,
+    ):
+        """
+        AIMD concurrency limit, the way TCP picks a window. Every request that
+        comes back healthy grows the limit by 1/limit, so about one extra slot
+        per round of requests. A throttled or failed request, or latency
+        climbing past latency_tolerance times the best we've seen, halves it,
+        at most once per round trip. A Retry-After also holds new requests
+        back until it expires.
+
+        :param initial: Requests allowed in flight to start with.
+        :param minimum: Never allow fewer than this in flight.
+        :param maximum: Never allow more than this in flight.
+        :param latency_tolerance: How many times the baseline latency counts as congestion.
+        """
+        self.minimum           = max(1, int(minimum))
+        self.maximum           = max(self.minimum, int(maximum))
+        self.limit             = float(min(self.maximum, max(self.minimum, initial)))
+        self.latency_tolerance = float(latency_tolerance)
+        self.in_flight         = 0
+        self.peak_limit        = self.limit
+        self.low_limit         = self.limit
+        self.requests          = 0
+        self.throttled         = 0
+        self._latency          = None
+        self._baseline         = None
+        self._paused_until     = 0.0
+        self._last_decrease    = 0.0
+        self._cond             = threading.Condition()
+
+    @property
+    def concurrency(self) -> int:
+        """Requests currently allowed in flight."""
+        return int(self.limit)
+
+    def acquire(self):
+        """Blocks until there's a free slot and no Retry-After is pending."""
+        with self._cond:
+            while True:
+                wait = self._paused_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    break
+                self._cond.wait(wait if wait > 0 else None)
+            self.in_flight = self.in_flight + 1
+
+    def release(self, latency: Optional[float] = None, ok: Optional[bool] = True):
+        """
+        Frees a slot and adjusts the limit from how the request went. Without
+        a latency the slot is just freed, for requests whose failed attempts
+        already reported in through backoff().
+        """
+        with self._cond:
+            self.in_flight = self.in_flight - 1
+            self.requests  = self.requests + 1
+            if latency is None:
+                pass
+            elif ok:
+                self._observe(latency)
+                if self._latency > self.latency_tolerance * max(self._baseline, self.LATENCY_FLOOR):
+                    self._decrease()
+                else:
+                    self.limit      = min(self.maximum, self.limit + 1 / self.limit)
+                    self.peak_limit = max(self.peak_limit, self.limit)
+            else:
+                self._decrease()
+            self._cond.notify_all()
+
+    def backoff(self, retry_after: Optional[float] = None):
+        """The server pushed back: cut the limit and honor any Retry-After."""
+        with self._cond:
+            self.throttled = self.throttled + 1
+            self._decrease()
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._cond.notify_all()
+
+    def _observe(self, latency: float):
+        self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        else:
+            ## Let the baseline drift up slowly, so one lucky response doesn't
+            ## make every later one look congested.
+            self._baseline = self._baseline + 0.01 * (latency - self._baseline)
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self._last_decrease < (self._latency or 0.0):
+            return
+        self._last_decrease = now
+        self.limit          = max(self.minimum, self.limit / 2)
+        self.low_limit      = min(self.low_limit, self.limit)
+
+    def summary(self) -> str:
+        with self._cond:
+            latency = f", ~{self._latency * 1000:.0f} ms latency" if self._latency is not None else ""
+            return (
+                f"{int(self.limit)} requests in flight (ranged {int(self.low_limit)}-{int(self.peak_limit)} of {self.maximum}), "
+                f"{self.requests} requests, {self.throttled} throttled{latency}"
+            )
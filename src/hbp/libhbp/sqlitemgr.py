@@ -1,11 +1,34 @@
+import os
 import sqlite3
+import threading
 from typing import Optional
 
+## Database files this process has already created the schema in. The
+## CREATE TABLEs only need to run once, not on every connection.
+_schema_ready = set()
+_schema_lock  = threading.Lock()
+
 class SQLiteManager:
     def __init__(self, db_file):
         self.conn   = sqlite3.connect(db_file)
         self.cursor = self.conn.cursor()
-        self.create_table()
+        self.create_schema(db_file)
+
+    def create_schema(self, db_file):
+        schema_key = os.path.abspath(db_file) if str(db_file) != ":memory:" else None
+        if schema_key is not None and schema_key in _schema_ready:
+            return
+        with _schema_lock:
+            if schema_key is not None and schema_key in _schema_ready:
+                return
+            self.create_table()
+            self.create_players_table()
+            self.create_backfill_table()
+            self.create_games_table()
+            self.create_retry_table()
+            self.create_video_urls_table()
+            if schema_key is not None:
+                _schema_ready.add(schema_key)
 
     def create_table(self):
         self.cursor.execute(f"""
@@ -25,6 +48,97 @@ class SQLiteManager:
         """)
         self.conn.commit()
 
+    def create_players_table(self):
+        self.cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS players (
+                player_id INTEGER PRIMARY KEY,
+                details TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def create_backfill_table(self):
+        self.cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS backfill_shards (
+                shard_start DATE NOT NULL,
+                shard_end DATE NOT NULL,
+                status TEXT NOT NULL,
+                hbp_count INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (shard_start, shard_end)
+            )
+        """)
+        self.conn.commit()
+
+    def create_games_table(self):
+        self.cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS games (
+                game_pk INTEGER PRIMARY KEY,
+                game_date DATE NOT NULL,
+                state TEXT NOT NULL,
+                hbp_count INTEGER NOT NULL DEFAULT 0,
+                populated INTEGER NOT NULL DEFAULT 0,
+                downloaded INTEGER NOT NULL DEFAULT 0,
+                processed_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def create_retry_table(self):
+        self.cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS fetch_retries (
+                game_pk INTEGER NOT NULL,
+                step TEXT NOT NULL,
+                game_date DATE NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_retry_at REAL NOT NULL,
+                last_error TEXT,
+                PRIMARY KEY (game_pk, step)
+            )
+        """)
+        self.conn.commit()
+
+    def create_video_urls_table(self):
+        self.cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS video_urls (
+                play_id TEXT PRIMARY KEY,
+                video_url TEXT NOT NULL,
+                resolved_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def upsert_games(self, rows: list, step: str) -> int:
+        """rows: (game_pk, game_date, state, hbp_count, processed_at) tuples. Sets the step's flag."""
+        self.cursor.executemany(f"""
+            INSERT INTO games (game_pk, game_date, state, hbp_count, {step}, processed_at)
+            VALUES (?, ?, ?, ?, 1, ?)
+            ON CONFLICT(game_pk) DO UPDATE SET
+                state = excluded.state,
+                hbp_count = excluded.hbp_count,
+                {step} = 1,
+                processed_at = excluded.processed_at
+            """,
+            rows
+        )
+        self.conn.commit()
+        return self.cursor.rowcount
+
+    def upsert_players(self, rows: list) -> int:
+        """rows: (player_id, details_json, fetched_at) tuples."""
+        self.cursor.executemany(f"""
+            INSERT INTO players (player_id, details, fetched_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(player_id) DO UPDATE SET
+                details = excluded.details,
+                fetched_at = excluded.fetched_at
+            """,
+            rows
+        )
+        self.conn.commit()
+        return self.cursor.rowcount
+
     def insert_hbpdata(self, play_id: str, game_pk: int, game_date: str, pitcher_id: int, batter_id: int, end_speed: float, x_pos: float, z_pos: float) -> bool:
         insert_result = False
         try:
@@ -42,6 +156,113 @@ class SQLiteManager:
             print(f"An error occurred: {e}")
         return insert_result
     
+    def insert_hbpdata_many(self, rows: list) -> int:
+        """
+        Bulk insert in a single transaction. rows are tuples in the same order
+        as insert_hbpdata's arguments. Plays we already have are left alone.
+        Returns the number of rows actually inserted.
+        """
+        changes_before = self.conn.total_changes
+        try:
+            self.cursor.executemany(f"""
+                INSERT OR IGNORE INTO hbpdata 
+                    (play_id, game_pk, game_date, pitcher_id, batter_id, end_speed, x_pos, z_pos) 
+                VALUES 
+                    (?, ?, ?, ?, ?, ?, ?, ?)
+                """, 
+                rows
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"An error occurred: {e}")
+            return 0
+        return self.conn.total_changes - changes_before
+
+    def upsert_hbpdata_many(self, rows: list) -> int:
+        """
+        Like insert_hbpdata_many, but plays we already have get their data
+        overwritten. The downloaded/analyzed/skeeted flags are left alone.
+        Returns the number of rows written.
+        """
+        changes_before = self.conn.total_changes
+        try:
+            self.cursor.executemany(f"""
+                INSERT INTO hbpdata
+                    (play_id, game_pk, game_date, pitcher_id, batter_id, end_speed, x_pos, z_pos)
+                VALUES
+                    (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(play_id) DO UPDATE SET
+                    game_pk = excluded.game_pk,
+                    game_date = excluded.game_date,
+                    pitcher_id = excluded.pitcher_id,
+                    batter_id = excluded.batter_id,
+                    end_speed = excluded.end_speed,
+                    x_pos = excluded.x_pos,
+                    z_pos = excluded.z_pos
+                """,
+                rows
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"An error occurred: {e}")
+            return 0
+        return self.conn.total_changes - changes_before
+
+    def replace_hbpdata_for_games(self, game_pks: list, rows: list) -> int:
+        """
+        Swaps out every hbpdata row for the given games with rows, in a single
+        transaction. Plays that survive keep their flags. Returns the number
+        of rows written.
+        """
+        game_pks = list(game_pks)
+        if not game_pks:
+            return 0
+        try:
+            self.cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS hbpdata_flags (
+                    play_id TEXT PRIMARY KEY,
+                    downloaded INTEGER NOT NULL,
+                    analyzed INTEGER NOT NULL,
+                    skeeted INTEGER NOT NULL
+                )
+            """)
+            self.cursor.execute("DELETE FROM hbpdata_flags")
+            self.cursor.executemany(f"""
+                INSERT INTO hbpdata_flags
+                SELECT play_id, downloaded, analyzed, skeeted FROM hbpdata WHERE game_pk = ?
+                """,
+                [(game_pk,) for game_pk in game_pks]
+            )
+            self.cursor.executemany(
+                "DELETE FROM hbpdata WHERE game_pk = ?",
+                [(game_pk,) for game_pk in game_pks]
+            )
+            changes_before = self.conn.total_changes
+            self.cursor.executemany(f"""
+                INSERT OR REPLACE INTO hbpdata
+                    (play_id, game_pk, game_date, pitcher_id, batter_id, end_speed, x_pos, z_pos)
+                VALUES
+                    (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+            inserted = self.conn.total_changes - changes_before
+            self.cursor.execute("""
+                UPDATE hbpdata SET (downloaded, analyzed, skeeted) = (
+                    SELECT downloaded, analyzed, skeeted FROM hbpdata_flags
+                    WHERE hbpdata_flags.play_id = hbpdata.play_id
+                )
+                WHERE play_id IN (SELECT play_id FROM hbpdata_flags)
+            """)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"An error occurred: {e}")
+            return 0
+        return inserted
+
     def query_hbpdata(self, query: str, args: list) -> list:
         self.cursor.execute(query, args)
         records = self.cursor.fetchall()
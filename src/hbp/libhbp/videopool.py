@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Optional
+
+from . import func_general as gen
+
+
+@dataclass(slots=True)
+class VideoDownload:
+    game_pk: int
+    play_id: str
+    path   : Optional[str]
+    nbytes : int
+    seconds: float
+    error  : Optional[str] = None
+    on_disk: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class VideoDownloadPool:
+    def __init__(self, max_workers: Optional[int] = 4, video_dir: Optional[str] = gen.video_dir, verbose_bool: Optional[bool] = False):
+        """
+        Downloads play videos on a few background threads, so the caller can
+        get on with the next game instead of waiting on every mp4. Nothing
+        here touches the database: finished downloads are handed back through
+        completed(), and the caller decides what to flag.
+
+        :param max_workers: Videos downloading at once.
+        :param video_dir: Where the videos go.
+        :param verbose_bool: Passed through to the downloader.
+        """
+        self.max_workers  = max(1, int(max_workers))
+        self.video_dir    = video_dir
+        self.verbose_bool = verbose_bool
+        self.total_bytes  = 0
+        self.downloaded   = 0
+        self.skipped      = 0
+        self.failed       = 0
+        self._executor    = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="video")
+        self._pending     = set()
+        self._lock        = threading.Lock()
+        self._active      = 0
+        self._busy_since  = None
+        self._busy_time   = 0.0
+
+    def _download(self, game_pk: int, play_id: str) -> VideoDownload:
+        ## Throughput is judged over the time anything was downloading, so idle
+        ## stretches between batches (the watcher's polls) don't drag it down.
+        with self._lock:
+            if self._active == 0:
+                self._busy_since = time.monotonic()
+            self._active = self._active + 1
+
+        already_there = os.path.exists(gen.get_video_file_path(game_pk, play_id, self.video_dir))
+        start         = time.monotonic()
+        try:
+            path, nbytes = gen.download_baseball_savant_play(game_pk, play_id, self.verbose_bool, self.video_dir)
+            if path is None:
+                return VideoDownload(game_pk, play_id, None, 0, time.monotonic() - start, "video unavailable")
+            return VideoDownload(game_pk, play_id, str(path), nbytes, time.monotonic() - start, on_disk=already_there)
+        except Exception as e:
+            return VideoDownload(game_pk, play_id, None, 0, time.monotonic() - start, str(e))
+        finally:
+            with self._lock:
+                self._active = self._active - 1
+                if self._active == 0:
+                    self._busy_time  = self._busy_time + time.monotonic() - self._busy_since
+                    self._busy_since = None
+
+    def submit(self, game_pk: int, play_id: str):
+        with self._lock:
+            self._pending.add(self._executor.submit(self._download, game_pk, play_id))
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def completed(self, block: Optional[bool] = False) -> list:
+        """
+        Hands back the downloads that have finished since the last call. With
+        block set, waits until every submitted video is done first.
+        """
+        with self._lock:
+            pending = set(self._pending)
+        if block:
+            wait(pending)
+        done = [future for future in pending if future.done()]
+
+        results = []
+        with self._lock:
+            for future in done:
+                self._pending.discard(future)
+                result = future.result()
+                if not result.ok:
+                    self.failed = self.failed + 1
+                elif result.on_disk:
+                    self.skipped = self.skipped + 1
+                else:
+                    self.downloaded  = self.downloaded + 1
+                    self.total_bytes = self.total_bytes + result.nbytes
+                results.append(result)
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def summary(self) -> str:
+        with self._lock:
+            busy_time = self._busy_time + (time.monotonic() - self._busy_since if self._busy_since is not None else 0.0)
+            rate      = self.total_bytes / busy_time if busy_time > 0 else 0.0
+            return (
+                f"{self.downloaded} videos downloaded ({self.total_bytes / 1e6:.1f} MB at {rate / 1e6:.2f} MB/s), "
+                f"{self.skipped} already on disk, {self.failed} failed"
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
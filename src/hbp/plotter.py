@@ -130,6 +130,14 @@ def main() -> int:
         skeet_dir_files = sorted(os.listdir(skeet_dir))
         if verbose:
             pprint.pprint(skeet_dir_files)
+
+        ## Look up every pitcher and batter we're about to need in one go, so
+        ## the loop below is served from the player cache.
+        queued_play_ids = [
+            skeet_file.split('_')[1] for skeet_file in skeet_dir_files
+            if skeet_file.split('_')[0].isdigit() and skeet_file.endswith('_desc.txt')
+        ]
+        bb.get_mlb_players_details(dbmgr.get_player_ids_for_plays(queued_play_ids), double_verbose)
             
         for skeet_file in skeet_dir_files:
             full_skeet_filename = Path(skeet_dir, skeet_file)
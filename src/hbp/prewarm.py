@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+## -------------------------------------------------------------------------- ##
+## HBP Prewarm
+## Pulls every active MLB roster and fills the player cache, so the plotter
+## and skeeter don't have to look players up one at a time.
+## -------------------------------------------------------------------------- ##
+
+
+import argparse
+import sys
+import time
+
+# Import application modules
+from .libhbp import basic
+from .libhbp import constants as const
+from .libhbp import func_baseball as bb
+from .libhbp import httpclient as http
+from .libhbp.configurator import ConfigReader
+from .libhbp.logger import PrintLogger
+
+
+## -------------------------------------------------------------------------- ##
+## SETUP
+## -------------------------------------------------------------------------- ##
+
+## Command line parsing
+parser = argparse.ArgumentParser(
+    description="Fills the player cache from all 30 active rosters."
+)
+parser.add_argument(
+    "-w",
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of rosters to fetch at once.",
+)
+parser.add_argument(
+    "-n",
+    "--nolog",
+    action="store_true",
+    default=None,
+    help="Disable logging.",
+)
+parser.add_argument(
+    "-v",
+    "--verbose",
+    action="store_true",
+    default=None,
+    help="Enables verbose output.",
+)
+parser.add_argument(
+    "-vv",
+    "--double-verbose",
+    action="store_true",
+    default=None,
+    help="Enables really verbose output.",
+)
+
+args = parser.parse_args()
+
+## Read and update configuration
+config = ConfigReader(basic.verify_file_path(basic.sanitize_path(const.DEFAULT_CONFIG_INI_FILE)))
+
+num_workers = int(config.get("operations", "prewarm_workers"))
+if args.workers and args.workers > 0:
+    config.set("operations", "prewarm_workers", str(args.workers))
+    num_workers = args.workers
+
+verbose = bool(int(config.get("operations", "verbose_output")))
+if args.verbose:
+    config.set("operations", "verbose_output", "1")
+    verbose = True
+
+double_verbose = bool(int(config.get("operations", "double_verbose")))
+if args.double_verbose:
+    config.set("operations", "verbose_output", "1")
+    config.set("operations", "double_verbose", "1")
+    verbose        = True
+    double_verbose = True
+
+## Set up logging
+if not args.nolog:
+    sys.stdout = PrintLogger(
+        config.get("paths", "log_dir"),
+        config.get("logging", "prewarm_prefix"),
+    )
+
+
+## -------------------------------------------------------------------------- ##
+## MAIN ACTION
+## -------------------------------------------------------------------------- ##
+
+def main() -> int:
+    try:
+        print()
+
+        if verbose:
+            print(config.get_all())
+            print()
+
+        print("="*80)
+        print(f" ⚾ {config.get('app', 'name')} ⚾ ~~> 🔥 Player Cache Prewarm")
+        print("="*80)
+        start_time = time.time()
+
+        team_ids         = [team['mlb_id'] for team in const.TEAMS.values()]
+        players_per_team = bb.prewarm_mlb_player_cache(team_ids, num_workers, double_verbose)
+
+        if verbose:
+            for abbreviation, team in const.TEAMS.items():
+                print(f"  {abbreviation:>3}: {players_per_team.get(team['mlb_id'], 0)} players")
+        print(f"🔥 Cached {sum(players_per_team.values())} players from {len(players_per_team)} rosters.")
+        print(f"🌐 HTTP concurrency: {http.concurrency_summary()}.")
+
+        print()
+        end_time = time.time()
+        elapsed = end_time - start_time
+        print("="*80)
+        print(f'Completed in {elapsed:.2f} seconds')
+        print("="*80)
+        print()
+        return 0
+
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+## -------------------------------------------------------------------------- ##
+## HBP Reprocess
+## Rebuilds the HBP database from archived live feeds, without touching the
+## network. Feeds are decoded and searched for HBPs across a process pool;
+## the parent writes the results back in bulk transactions.
+## -------------------------------------------------------------------------- ##
+
+
+import argparse
+import os
+import sys
+import time
+
+# Import application modules
+from .libhbp import basic
+from .libhbp import constants as const
+from .libhbp import func_baseball as bb
+from .libhbp import func_database as dbmgr
+from .libhbp.configurator import ConfigReader
+from .libhbp.feedcache import FEED_EXTENSIONS, read_feed_file
+from .libhbp.gamefeed import GameFeed
+from .libhbp.logger import PrintLogger
+from .libhbp.models import loads
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+## -------------------------------------------------------------------------- ##
+## SETUP
+## -------------------------------------------------------------------------- ##
+
+## Command line parsing
+parser = argparse.ArgumentParser(
+    description="Rebuilds the sqlite3 database's HBP events from archived live feeds, offline."
+)
+parser.add_argument(
+    "-d",
+    "--feed-dir",
+    type=str,
+    default=None,
+    help="Directory of archived live feeds. Defaults to the live feed cache.",
+)
+parser.add_argument(
+    "-w",
+    "--workers",
+    type=int,
+    default=None,
+    help="Number of worker processes. Defaults to one per core.",
+)
+parser.add_argument(
+    "-b",
+    "--batch-games",
+    type=int,
+    default=None,
+    help="Number of games written per database transaction.",
+)
+parser.add_argument(
+    "--rebuild",
+    action="store_true",
+    help="Replace each archived game's rows outright, dropping plays the feed no longer has. Flags are kept.",
+)
+parser.add_argument(
+    "-n",
+    "--nolog",
+    action="store_true",
+    default=None,
+    help="Disable logging.",
+)
+parser.add_argument(
+    "-v",
+    "--verbose",
+    action="store_true",
+    default=None,
+    help="Enables verbose output.",
+)
+parser.add_argument(
+    "-vv",
+    "--double-verbose",
+    action="store_true",
+    default=None,
+    help="Enables really verbose output.",
+)
+
+args = parser.parse_args()
+
+## Read and update configuration
+config = ConfigReader(basic.verify_file_path(basic.sanitize_path(const.DEFAULT_CONFIG_INI_FILE)))
+
+feed_dir = Path(config.get("paths", "cache_dir"), "feeds")
+if args.feed_dir:
+    feed_dir = Path(args.feed_dir)
+
+num_workers = int(config.get("reprocess", "workers")) or os.cpu_count()
+if args.workers and args.workers > 0:
+    config.set("reprocess", "workers", str(args.workers))
+    num_workers = args.workers
+
+batch_games = int(config.get("reprocess", "batch_games"))
+if args.batch_games and args.batch_games > 0:
+    config.set("reprocess", "batch_games", str(args.batch_games))
+    batch_games = args.batch_games
+
+rebuild = False
+if args.rebuild:
+    rebuild = True
+
+verbose = bool(int(config.get("operations", "verbose_output")))
+if args.verbose:
+    config.set("operations", "verbose_output", "1")
+    verbose = True
+
+double_verbose = bool(int(config.get("operations", "double_verbose")))
+if args.double_verbose:
+    config.set("operations", "verbose_output", "1")
+    config.set("operations", "double_verbose", "1")
+    verbose        = True
+    double_verbose = True
+
+## Set up logging
+if not args.nolog:
+    sys.stdout = PrintLogger(
+        config.get("paths", "log_dir"),
+        config.get("logging", "reprocess_prefix"),
+    )
+
+
+## -------------------------------------------------------------------------- ##
+## HELPER FUNCTIONS
+## -------------------------------------------------------------------------- ##
+
+def find_feed_files(feed_dir: Path) -> list:
+    feed_files = []
+    with os.scandir(feed_dir) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith(FEED_EXTENSIONS) and not entry.name.startswith("."):
+                feed_files.append(Path(entry.path))
+    return sorted(feed_files)
+
+
+def extract_game(feed_path: Path) -> tuple:
+    """Runs in a worker process. Returns (feed_path, (game_deets, hbp_events)) or (feed_path, error)."""
+    try:
+        feed = GameFeed.from_data(loads(read_feed_file(feed_path)))
+        return feed_path, (
+            bb.get_mlb_game_deets_from_feed(feed),
+            bb.get_mlb_hit_by_pitch_events_from_feed(feed),
+        )
+    except Exception as e:
+        return feed_path, e
+
+
+def write_batch(games_and_events: list) -> int:
+    if rebuild:
+        written = dbmgr.rebuild_rows(games_and_events)
+    else:
+        written = dbmgr.upsert_rows(games_and_events)
+    dbmgr.set_games_processed(games_and_events, "populated")
+    return written
+
+
+## -------------------------------------------------------------------------- ##
+## MAIN ACTION
+## -------------------------------------------------------------------------- ##
+
+def main() -> int:
+    try:
+        print()
+
+        if verbose:
+            print(config.get_all())
+            print()
+
+        print("="*80)
+        print(f" ⚾ {config.get('app', 'name')} ⚾ ~~> ♻️ Reprocess")
+        print("="*80)
+        start_time = time.time()
+
+        feed_files = find_feed_files(feed_dir)
+        print(f"♻️ {'Rebuilding' if rebuild else 'Updating'} hbpdata from {len(feed_files)} archived feeds in '{feed_dir}', using {num_workers} workers.")
+        print()
+
+        total_games      = 0
+        total_hbp_events = 0
+        total_written    = 0
+        failed_feeds     = 0
+        batch            = []
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            chunksize = max(1, len(feed_files) // (num_workers * 16))
+            for feed_path, result in executor.map(extract_game, feed_files, chunksize=chunksize):
+                if isinstance(result, Exception):
+                    failed_feeds = failed_feeds + 1
+                    print(f"[WARNING] Couldn't reprocess '{feed_path.name}': {result}")
+                    continue
+
+                game_deets, hbp_events = result
+                total_games      = total_games + 1
+                total_hbp_events = total_hbp_events + len(hbp_events)
+                batch.append(result)
+                if double_verbose:
+                    print(f"  ... {game_deets.game_pk} ({game_deets.date}): {len(hbp_events)} HBPs.")
+
+                if len(batch) >= batch_games:
+                    total_written = total_written + write_batch(batch)
+                    print(f"✅ {total_games}/{len(feed_files)} games reprocessed, {total_hbp_events} HBPs so far.")
+                    batch = []
+
+        if batch:
+            total_written = total_written + write_batch(batch)
+
+        print()
+        if failed_feeds > 0:
+            print(f"[WARNING] {failed_feeds} feeds couldn't be read and were skipped.")
+        print(f"⚾💥 Reprocessed {total_games} games: {total_hbp_events} HBPs, {total_written} rows written.")
+
+        print()
+        end_time = time.time()
+        elapsed = end_time - start_time
+        print("="*80)
+        print(f'Completed in {elapsed:.2f} seconds')
+        print("="*80)
+        print()
+        return 0
+
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
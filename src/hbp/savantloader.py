@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+## -------------------------------------------------------------------------- ##
+## HBP Savant Loader
+## Loads Baseball Savant search CSV exports straight into the HBP database.
+## Works entirely offline; files are read a chunk at a time, so even
+## multi-gigabyte exports don't need much memory.
+## -------------------------------------------------------------------------- ##
+
+
+import argparse
+import sys
+import time
+
+# Import application modules
+from .libhbp import basic
+from .libhbp import constants as const
+from .libhbp import func_database as dbmgr
+from .libhbp import func_statcast as sc
+from .libhbp.configurator import ConfigReader
+from .libhbp.logger import PrintLogger
+
+from pathlib import Path
+
+
+## -------------------------------------------------------------------------- ##
+## SETUP
+## -------------------------------------------------------------------------- ##
+
+## Command line parsing
+parser = argparse.ArgumentParser(
+    description="Loads HBP events from Baseball Savant CSV exports into the sqlite3 database."
+)
+parser.add_argument(
+    "csv_paths",
+    nargs="+",
+    help="CSV files to load. Directories are searched for *.csv and *.csv.gz files.",
+)
+parser.add_argument(
+    "-r",
+    "--chunk-rows",
+    type=int,
+    default=None,
+    help="Number of CSV rows to read at a time.",
+)
+parser.add_argument(
+    "-n",
+    "--nolog",
+    action="store_true",
+    default=None,
+    help="Disable logging.",
+)
+parser.add_argument(
+    "-v",
+    "--verbose",
+    action="store_true",
+    default=None,
+    help="Enables verbose output.",
+)
+parser.add_argument(
+    "-vv",
+    "--double-verbose",
+    action="store_true",
+    default=None,
+    help="Enables really verbose output.",
+)
+
+args = parser.parse_args()
+
+## Read and update configuration
+config = ConfigReader(basic.verify_file_path(basic.sanitize_path(const.DEFAULT_CONFIG_INI_FILE)))
+
+chunk_rows = int(config.get("statcast", "csv_chunk_rows"))
+if args.chunk_rows and args.chunk_rows > 0:
+    config.set("statcast", "csv_chunk_rows", str(args.chunk_rows))
+    chunk_rows = args.chunk_rows
+
+verbose = bool(int(config.get("operations", "verbose_output")))
+if args.verbose:
+    config.set("operations", "verbose_output", "1")
+    verbose = True
+
+double_verbose = bool(int(config.get("operations", "double_verbose")))
+if args.double_verbose:
+    config.set("operations", "verbose_output", "1")
+    config.set("operations", "double_verbose", "1")
+    verbose        = True
+    double_verbose = True
+
+## Set up logging
+if not args.nolog:
+    sys.stdout = PrintLogger(
+        config.get("paths", "log_dir"),
+        config.get("logging", "savantloader_prefix"),
+    )
+
+
+## -------------------------------------------------------------------------- ##
+## HELPER FUNCTIONS
+## -------------------------------------------------------------------------- ##
+
+def find_csv_files(csv_paths: list) -> list:
+    csv_files = []
+    for csv_path in csv_paths:
+        csv_path = Path(csv_path)
+        if csv_path.is_dir():
+            csv_files.extend(sorted(list(csv_path.glob("*.csv")) + list(csv_path.glob("*.csv.gz"))))
+        elif csv_path.is_file():
+            csv_files.append(csv_path)
+        else:
+            print(f"[WARNING] '{csv_path}' doesn't exist, skipping it.")
+    return csv_files
+
+
+## -------------------------------------------------------------------------- ##
+## MAIN ACTION
+## -------------------------------------------------------------------------- ##
+
+def main() -> int:
+    try:
+        print()
+
+        if verbose:
+            print(config.get_all())
+            print()
+
+        print("="*80)
+        print(f" ⚾ {config.get('app', 'name')} ⚾ ~~> 📥 Savant CSV Loader")
+        print("="*80)
+        start_time = time.time()
+
+        csv_files = find_csv_files(args.csv_paths)
+        print(f"📥 Loading {len(csv_files)} CSV files, {chunk_rows} rows at a time.")
+        print()
+
+        total_hbp_events = 0
+        total_new_rows   = 0
+        total_skipped    = 0
+        for xfile, csv_file in enumerate(csv_files):
+            file_hbp_events = 0
+            file_new_rows   = 0
+            file_skipped    = 0
+            for hbp_count, rows in sc.read_savant_csv(csv_file, chunk_rows):
+                new_rows        = dbmgr.insert_hbpdata_rows(rows)
+                file_hbp_events = file_hbp_events + hbp_count
+                file_new_rows   = file_new_rows + new_rows
+                file_skipped    = file_skipped + hbp_count - len(rows)
+                if double_verbose:
+                    print(f"  ... {hbp_count} HBPs in this chunk, {new_rows} new.")
+
+            print(f"✅ [{xfile+1}/{len(csv_files)}] {csv_file.name}: {file_hbp_events} HBPs ({file_new_rows} new).")
+            if file_skipped > 0:
+                print(f"  [WARNING] {file_skipped} HBPs were duplicates or had no play_id and were skipped.")
+            total_hbp_events = total_hbp_events + file_hbp_events
+            total_new_rows   = total_new_rows + file_new_rows
+            total_skipped    = total_skipped + file_skipped
+
+        print()
+        print(f"⚾💥 Read {total_hbp_events} HBPs, {total_new_rows} new to the database, {total_skipped} skipped.")
+
+        print()
+        end_time = time.time()
+        elapsed = end_time - start_time
+        print("="*80)
+        print(f'Completed in {elapsed:.2f} seconds')
+        print("="*80)
+        print()
+        return 0
+
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
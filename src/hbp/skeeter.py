@@ -158,6 +158,13 @@ def main(num_posts: Optional[int] = 1) -> int:
         skeet_dir_files = sorted(os.listdir(skeet_dir))
         if verbose:
             pprint.pprint(skeet_dir_files)
+
+        ## Warm the player cache for everything queued up, in one go.
+        queued_play_ids = [
+            skeet_file.split('_')[1] for skeet_file in skeet_dir_files
+            if skeet_file.split('_')[0].isdigit() and skeet_file.endswith('_desc.txt')
+        ]
+        bb.get_mlb_players_details(dbmgr.get_player_ids_for_plays(queued_play_ids), double_verbose)
         if len(skeet_dir_files) < num_posts:
             print(f"‼️ Number of desired posts ({num_posts}) exceeds number of available skeets. Fixing.")
             num_posts = len(skeet_dir_files)
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+
+## -------------------------------------------------------------------------- ##
+## HBP Watcher
+## Follows today's games while they're being played, catches HBP events as
+## they happen, and hands them straight to the downloader/plotter/skeeter
+## steps instead of waiting for tomorrow's batch run.
+## -------------------------------------------------------------------------- ##
+
+
+import argparse
+import subprocess
+import sys
+import time
+
+# Import application modules
+from .libhbp import basic
+from .libhbp import constants as const
+from .libhbp import func_baseball as bb
+from .libhbp import func_database as dbmgr
+from .libhbp import func_general as gen
+from .libhbp import func_skeet as sk
+from .libhbp import httpclient as http
+from .libhbp.configurator import ConfigReader
+from .libhbp.logger import PrintLogger
+from .libhbp.models import GameInfo, HbpEvent
+from .libhbp.videopool import VideoDownloadPool
+
+from datetime import date, datetime, timezone
+
+
+## -------------------------------------------------------------------------- ##
+## SETUP
+## -------------------------------------------------------------------------- ##
+
+## Command line parsing
+parser = argparse.ArgumentParser(
+    description="Watches live games and processes HBP events as they happen."
+)
+parser.add_argument(
+    "--once",
+    action="store_true",
+    help="Make a single pass over today's games and exit.",
+)
+parser.add_argument(
+    "--skip-video-dl",
+    action="store_true",
+    help="Skips video download for each HBP.",
+)
+parser.add_argument(
+    "-n",
+    "--nolog",
+    action="store_true",
+    default=None,
+    help="Disable logging.",
+)
+parser.add_argument(
+    "-t",
+    "--test-mode",
+    action="store_true",
+    help="Enable test mode, which makes this script pretend to do things.",
+)
+parser.add_argument(
+    "-v",
+    "--verbose",
+    action="store_true",
+    default=None,
+    help="Enables verbose output.",
+)
+parser.add_argument(
+    "-vv",
+    "--double-verbose",
+    action="store_true",
+    default=None,
+    help="Enables really verbose output.",
+)
+
+args = parser.parse_args()
+
+## Read and update configuration
+config = ConfigReader(basic.verify_file_path(basic.sanitize_path(const.DEFAULT_CONFIG_INI_FILE)))
+
+live_poll_seconds        = float(config.get("watcher", "live_poll_seconds"))
+pregame_poll_seconds     = float(config.get("watcher", "pregame_poll_seconds"))
+idle_poll_seconds        = float(config.get("watcher", "idle_poll_seconds"))
+schedule_refresh_seconds = float(config.get("watcher", "schedule_refresh_seconds"))
+video_retry_limit        = int(config.get("watcher", "video_retry_limit"))
+run_plotter              = bool(int(config.get("watcher", "run_plotter")))
+run_skeeter              = bool(int(config.get("watcher", "run_skeeter")))
+
+run_once = False
+if args.once:
+    run_once = True
+
+skip_video_dl = False
+if args.skip_video_dl:
+    skip_video_dl = True
+
+test_mode = bool(int(config.get("operations", "test_mode")))
+if args.test_mode:
+    config.set("operations", "test_mode", "1")
+    test_mode = True
+
+verbose = bool(int(config.get("operations", "verbose_output")))
+if args.verbose:
+    config.set("operations", "verbose_output", "1")
+    verbose = True
+
+double_verbose = bool(int(config.get("operations", "double_verbose")))
+if args.double_verbose:
+    config.set("operations", "verbose_output", "1")
+    config.set("operations", "double_verbose", "1")
+    verbose        = True
+    double_verbose = True
+
+## Set up logging
+if not args.nolog:
+    sys.stdout = PrintLogger(
+        config.get("paths", "log_dir"),
+        config.get("logging", "watcher_prefix"),
+    )
+
+## Other stuff that we can't set on the command line
+skeet_dir = config.get("paths", "skeet_dir")
+
+## Videos Savant hasn't published yet, keyed by play_id: (game_pk, attempts).
+pending_videos = {}
+video_pool     = VideoDownloadPool(int(config.get("operations", "video_workers")), config.get("paths", "video_dir"), verbose)
+
+
+## -------------------------------------------------------------------------- ##
+## HELPER FUNCTIONS
+## -------------------------------------------------------------------------- ##
+
+def get_watched_games() -> list:
+    """Today's games, plus yesterday's in case one is still running past midnight."""
+    date_list     = gen.build_date_list(date.today(), 2, backward=True)
+    games_by_date = bb.get_mlb_games_for_dates(date_list, double_verbose)
+    return [game for mlb_games in games_by_date.values() for game in mlb_games]
+
+
+def get_game_start_time(game: list) -> datetime:
+    return datetime.fromisoformat(game['gameDate'].replace('Z', '+00:00'))
+
+
+def handle_new_event(game: list, game_deets: GameInfo, event: HbpEvent) -> bool:
+    """Stores a brand new HBP and writes its skeet. Returns True if it was new."""
+    if not dbmgr.insert_row(game_deets, event):
+        return False
+    print(f"  👍 HBP {event.play_id} added to database.")
+
+    skeet_filename = sk.write_desc_skeet_text(game_deets, event, skeet_dir, double_verbose)
+    if verbose:
+        print(f"  Skeet File: {skeet_filename}")
+    print(f"{sk.read_skeet_text(skeet_filename)}")
+    print()
+    return True
+
+
+def download_pending_videos(pending_videos: dict) -> list:
+    """
+    Savant usually needs a few minutes before a play's video shows up, so
+    anything that didn't download gets tried again on the next pass.
+    """
+    downloaded = []
+    for play_id, (game_pk, attempts) in list(pending_videos.items()):
+        if test_mode:
+            print(f"  Pretending to download video for {play_id}....")
+            del pending_videos[play_id]
+            continue
+        video_pool.submit(game_pk, play_id)
+
+    for result in video_pool.completed(block=True):
+        play_id           = result.play_id
+        game_pk, attempts = pending_videos[play_id]
+        if result.ok:
+            dbmgr.set_download_flag(play_id)
+            print(f"  🎥 VIDEO: {result.path}")
+            downloaded.append(play_id)
+            del pending_videos[play_id]
+        elif attempts + 1 >= video_retry_limit:
+            print(f"  😢 Giving up on the video for {play_id} after {attempts + 1} tries.")
+            del pending_videos[play_id]
+        else:
+            pending_videos[play_id] = (game_pk, attempts + 1)
+    return downloaded
+
+
+def run_pipeline_step(step: str):
+    """Runs one of the batch scripts (plotter, skeeter) on whatever's new."""
+    step_args = [sys.executable, "-m", f"{__package__}.{step}"]
+    if args.nolog:
+        step_args.append("--nolog")
+    if test_mode:
+        step_args.append("--test-mode")
+    print(f"  🏃 Running the {step}...")
+    result = subprocess.run(step_args)
+    if result.returncode != 0:
+        print(f"[WARNING] The {step} exited with status {result.returncode}.")
+
+
+def poll_live_game(game: list, seen_play_ids: set) -> int:
+    """
+    Catches up on a game in progress. Once the feed says the game is over,
+    it goes in the games ledger. Returns the number of new HBPs.
+    """
+    already_final = game['status']['abstractGameState'] == "Final"
+    game_feed     = bb.poll_mlb_game_feed(game['gamePk'], double_verbose, already_final)
+    game_deets    = bb.get_mlb_game_deets(game, double_verbose, game_feed)
+    hbp_events    = bb.get_mlb_hit_by_pitch_events_from_single_game(game, double_verbose, game_feed)
+
+    ## The skeet only reports a final score for games that are over.
+    if game_feed.abstract_game_state != "Final":
+        game_deets.drop_final_scores()
+
+    new_events = 0
+    for event in hbp_events:
+        if event.play_id is None or event.play_id in seen_play_ids:
+            continue
+        seen_play_ids.add(event.play_id)
+        if handle_new_event(game, game_deets, event):
+            new_events = new_events + 1
+            pending_videos[event.play_id] = (game['gamePk'], 0)
+
+    ## The schedule can lag the feed, so go by the feed. Every HBP is in the
+    ## database now, so neither batch step needs to fetch this game again.
+    if game_feed.abstract_game_state == "Final":
+        game_deets.state = "Final"
+        for step in ("populated", "downloaded"):
+            dbmgr.set_games_processed([(game_deets, hbp_events)], step)
+            dbmgr.clear_fetch_retry(game['gamePk'], step)
+    return new_events
+
+
+def process_retried_game(game: list, seen_play_ids: set) -> int:
+    """
+    Retry queue handler for games a downloader run couldn't fetch. Raises if
+    the game still can't be fetched. Returns the number of new HBPs.
+    """
+    game_deets, hbp_events = bb.collect_mlb_game(game, double_verbose)
+    new_events = 0
+    for event in hbp_events:
+        if event.play_id is None or event.play_id in seen_play_ids:
+            continue
+        seen_play_ids.add(event.play_id)
+        if handle_new_event(game, game_deets, event):
+            new_events = new_events + 1
+            pending_videos[event.play_id] = (game['gamePk'], 0)
+    dbmgr.set_games_processed([(game_deets, hbp_events)], "downloaded")
+    return new_events
+
+
+## -------------------------------------------------------------------------- ##
+## MAIN ACTION
+## -------------------------------------------------------------------------- ##
+
+def main() -> int:
+    try:
+        print()
+
+        if verbose:
+            print(config.get_all())
+            print()
+
+        print("="*80)
+        print(f" ⚾ {config.get('app', 'name')} ⚾ ~~> 👀 Live Watcher")
+        print("="*80)
+        start_time = time.time()
+
+        seen_play_ids    = set()
+        finished_games   = set()
+        mlb_games        = []
+        last_schedule    = 0
+        last_retries     = 0
+        delayed_wait     = live_poll_seconds
+        total_hbp_events = 0
+
+        while True:
+            now = datetime.now(timezone.utc)
+
+            ## The schedule tells us when games start and end. Refresh it
+            ## every so often, or sooner if a game should have started. A
+            ## delayed game gets checked on less and less often.
+            game_should_be_on = any(
+                game['status']['abstractGameState'] == "Preview" and get_game_start_time(game) <= now
+                for game in mlb_games
+            )
+            if not game_should_be_on:
+                delayed_wait = live_poll_seconds
+            since_schedule = time.time() - last_schedule
+            if since_schedule >= schedule_refresh_seconds or (game_should_be_on and since_schedule >= delayed_wait):
+                if game_should_be_on:
+                    delayed_wait = min(delayed_wait * 2, pregame_poll_seconds)
+                try:
+                    mlb_games = get_watched_games()
+                    if verbose:
+                        print(f"[DEBUG] Watching {len(mlb_games)} games.")
+                except Exception as e:
+                    print(f"[ERROR] Couldn't refresh the schedule, sticking with the old one: {e}")
+                last_schedule = time.time()
+
+                ## Games that were over and done with before we started (or
+                ## that an earlier watcher already finished) don't need a feed.
+                finished_games.update(dbmgr.get_processed_games(
+                    [game['gamePk'] for game in mlb_games if game['status']['abstractGameState'] == "Final"],
+                    "downloaded"
+                ))
+
+            if time.time() - last_retries >= schedule_refresh_seconds:
+                recovered, failed_again = bb.retry_failed_mlb_games(
+                    "downloaded",
+                    lambda game: process_retried_game(game, seen_play_ids),
+                    double_verbose
+                )
+                if recovered or failed_again:
+                    print(f"🔁 Retried queued games: {recovered} recovered, {failed_again} still failing.")
+                last_retries = time.time()
+
+            live_games = 0
+            new_events = 0
+            for game in mlb_games:
+                game_pk = game['gamePk']
+                state   = game['status']['abstractGameState']
+                if game_pk in finished_games or state == "Preview":
+                    continue
+
+                print(f"⚾ {game['teams']['away']['team']['name']} at {game['teams']['home']['team']['name']} ({state})")
+                try:
+                    new_events = new_events + poll_live_game(game, seen_play_ids)
+                except Exception as e:
+                    ## Try again next pass rather than taking the whole watcher down.
+                    print(f"[ERROR] Problem polling game {game_pk}: {e}")
+                    live_games = live_games + 1
+                    continue
+                if bb.live_feeds[game_pk].abstract_game_state == "Final":
+                    ## One last pass has been made over the finished game.
+                    finished_games.add(game_pk)
+                    bb.forget_mlb_game_feed(game_pk)
+                else:
+                    live_games = live_games + 1
+
+            total_hbp_events = total_hbp_events + new_events
+
+            if not skip_video_dl and pending_videos:
+                download_pending_videos(pending_videos)
+            if new_events > 0:
+                if run_plotter:
+                    run_pipeline_step("plotter")
+                if run_skeeter:
+                    run_pipeline_step("skeeter")
+
+            if run_once:
+                break
+
+            ## Poll fast while games are on, otherwise sleep until the next
+            ## first pitch (checking in every so often), or idle.
+            if live_games > 0 or pending_videos:
+                wait = live_poll_seconds
+            else:
+                upcoming = [
+                    (get_game_start_time(game) - now).total_seconds()
+                    for game in mlb_games
+                    if game['status']['abstractGameState'] == "Preview"
+                ]
+                if upcoming:
+                    wait = max(live_poll_seconds, min(min(upcoming), pregame_poll_seconds))
+                else:
+                    wait = idle_poll_seconds
+            if double_verbose:
+                print(f"[DEBUG] {live_games} live games; sleeping {wait:.0f} seconds.")
+            time.sleep(wait)
+
+    except KeyboardInterrupt:
+        print("👋 Watcher stopped.")
+
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return 1
+
+    print(f"⚾💥 Captured {total_hbp_events} during this run.")
+    print(f"🎥 Videos: {video_pool.summary()}.")
+    print(f"🌐 HTTP concurrency: {http.concurrency_summary()}.")
+    print()
+    end_time = time.time()
+    elapsed = end_time - start_time
+    print("="*80)
+    print(f'Completed in {elapsed:.2f} seconds')
+    print("="*80)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
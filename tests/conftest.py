@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import pytest
+
+from pathlib import Path
+from types import SimpleNamespace
+
+
+## The modules read config/settings.ini relative to the working directory
+## when they're imported, same as when the run scripts start them.
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+os.chdir(PROJECT_DIR)
+sys.path.insert(0, str(PROJECT_DIR))
+
+from src.hbp.libhbp import httpclient as http
+
+
+@pytest.fixture
+def fixture_store(tmp_path) -> http.FixtureStore:
+    """An empty fixture store to record responses into."""
+    return http.FixtureStore(Path(tmp_path, "fixtures"))
+
+
+@pytest.fixture
+def replay(monkeypatch, fixture_store) -> http.FixtureStore:
+    """
+    Points the shared session at whatever gets recorded into fixture_store,
+    so nothing goes to the network. The conditional GET cache, adaptive
+    limiter and rate limit are switched off; tests that want them set them.
+    """
+    session = http.build_session(retries=0, mode="replay", fixture_dir=fixture_store.fixture_dir, replay_latency=0.0)
+    monkeypatch.setattr(http, "_session", session)
+    monkeypatch.setattr(http, "http_cache", None)
+    monkeypatch.setattr(http, "http_limiter", None)
+    monkeypatch.setattr(http, "_rate_limit", None)
+    yield fixture_store
+    session.close()
+
+
+@pytest.fixture
+def database(monkeypatch, tmp_path) -> Path:
+    """
+    A fresh, empty database. The database path in the config is relative,
+    so this just runs the test from a scratch directory.
+    """
+    os.makedirs(Path(tmp_path, "database"))
+    monkeypatch.chdir(tmp_path)
+    from src.hbp.libhbp import func_database as dbmgr
+    return Path(tmp_path, dbmgr.db_file_path)
+
+
+@pytest.fixture
+def savant(monkeypatch) -> SimpleNamespace:
+    """
+    Stands in for the Savant video page lookup and its database cache. Put
+    a URL (None if unpublished, or an exception to raise) in video_urls
+    under a play_id; URLs the downloader gives up on land in forgotten.
+    """
+    from src.hbp.libhbp import func_general as gen
+
+    fake = SimpleNamespace(video_urls={}, forgotten=[])
+
+    def resolve(play_id, verbose_bool=False):
+        video_url = fake.video_urls[play_id]
+        if isinstance(video_url, Exception):
+            raise video_url
+        return video_url
+
+    monkeypatch.setattr(gen, "resolve_baseball_savant_video_url", resolve)
+    monkeypatch.setattr(gen.dbmgr, "forget_video_url", fake.forgotten.append)
+    return fake
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+import os
+import pytest
+
+from src.hbp.libhbp import feedcache
+from src.hbp.libhbp.feedcache import FeedCache, read_feed_file
+
+
+FEED = b'{"gamePk": 1, "gameData": {"status": {"abstractGameState": "Final"}}}'
+
+
+@pytest.mark.parametrize("compression", ["zstd", "gzip"])
+def test_put_get_round_trip(tmp_path, compression):
+    cache = FeedCache(tmp_path, compression=compression)
+    path  = cache.put(1, FEED)
+    assert cache.has(1)
+    assert cache.get_raw(1) == FEED
+    assert cache.get(1)["gamePk"] == 1
+    assert read_feed_file(path) == FEED
+    if compression == "gzip" or feedcache.zstd is None:
+        assert path.name == "1.json.gz"
+
+
+def test_miss(tmp_path):
+    cache = FeedCache(tmp_path)
+    assert not cache.has(2)
+    assert cache.get_raw(2) is None
+    assert cache.get(2) is None
+
+
+def test_put_replaces_other_compression(tmp_path):
+    if feedcache.zstd is None:
+        pytest.skip("zstandard isn't installed")
+    FeedCache(tmp_path, compression="gzip").put(1, b'{"old": true}')
+    cache = FeedCache(tmp_path, compression="zstd")
+    cache.put(1, FEED)
+    assert sorted(os.listdir(tmp_path)) == ["1.json.zst"]
+    assert cache.get_raw(1) == FEED
+
+
+def test_unreadable_feed_is_dropped(tmp_path):
+    cache = FeedCache(tmp_path, compression="gzip")
+    with open(tmp_path / "1.json.gz", "wb") as f:
+        f.write(b"not gzip")
+    assert cache.get_raw(1) is None
+    assert not cache.has(1)
+
+
+def test_remove_keeps_size_in_step(tmp_path):
+    cache = FeedCache(tmp_path)
+    cache.put(1, FEED)
+    cache.put(2, FEED)
+    size = cache.size()
+    cache.remove(1)
+    assert not cache.has(1)
+    assert cache.size() == size - size // 2
+
+
+def test_evict_least_recently_used(tmp_path):
+    ## Random bytes don't compress, so each entry is a little over 4 KB and
+    ## a 10 KB cache holds two of them.
+    cache = FeedCache(tmp_path, max_mb=10 / 1024, compression="gzip")
+    cache.put(1, os.urandom(4096))
+    os.utime(tmp_path / "1.json.gz", (1000, 1000))
+    cache.put(2, os.urandom(4096))
+    os.utime(tmp_path / "2.json.gz", (2000, 2000))
+
+    ## Reading game 1 makes game 2 the stalest.
+    assert cache.get_raw(1) is not None
+    cache.put(3, os.urandom(4096))
+
+    assert cache.has(1)
+    assert not cache.has(2)
+    assert cache.has(3)
+    assert cache.size() <= cache.max_bytes
+
+
+def test_evict_under_cap_does_nothing(tmp_path):
+    cache = FeedCache(tmp_path)
+    cache.put(1, FEED)
+    assert cache.evict() == []
+    assert cache.has(1)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import pytest
+import requests
+
+from datetime import datetime
+
+from src.hbp.libhbp import constants as const
+from src.hbp.libhbp import func_baseball as bb
+from src.hbp.libhbp import func_database as dbmgr
+from src.hbp.libhbp import httpclient as http
+from src.hbp.libhbp.feedcache import FeedCache
+
+
+GAME_PK   = 745123
+GAME_DATE = "2024-06-01"
+
+
+def build_team(name: str, score: int) -> dict:
+    return {
+        "team"        : {"name": name},
+        "score"       : score,
+        "leagueRecord": {"wins": 30, "losses": 28, "pct": ".517"},
+    }
+
+
+def build_game(state: str = "Final", hbp_counts: tuple = (0, 0), game_pk: int = GAME_PK) -> dict:
+    '''A hydrated schedule entry; a hbp_counts of None leaves the boxscore out.'''
+    game = {
+        "gamePk"           : game_pk,
+        "officialDate"     : GAME_DATE,
+        "seriesDescription": "Regular Season",
+        "status"           : {"abstractGameState": state},
+        "teams"            : {"home": build_team("Seattle Mariners", 4), "away": build_team("Texas Rangers", 3)},
+        "linescore"        : {"currentInning": 9, "innings": [{"num": n} for n in range(1, 10)]},
+    }
+    if hbp_counts is not None:
+        game["boxscore"] = {"teams": {
+            side: {"teamStats": {"batting": {"hitByPitch": hbp_count}}}
+            for side, hbp_count in zip(("home", "away"), hbp_counts)
+        }}
+    return game
+
+
+def record_schedule(fixture_store, params: dict, games_by_date: dict):
+    url = requests.Request("GET", const.MLB_STATS_BASE_URL + const.MLB_STATS_SCHEDULE_STUB, params={
+        "sportId": 1,
+        "hydrate": const.MLB_STATS_SCHEDULE_HYDRATE,
+        "fields" : const.MLB_STATS_SCHEDULE_FIELDS,
+        **params,
+    }).prepare().url
+    body = {"dates": [{"date": game_date, "games": games} for game_date, games in games_by_date.items()]}
+    fixture_store.save("GET", url, 200, {"ETag": '"v1"', "Content-Type": "application/json"}, json.dumps(body).encode("utf-8"))
+
+
+## -------------------------------------------------------------------------- ##
+## SCHEDULE
+## -------------------------------------------------------------------------- ##
+
+def test_ranged_schedule_keeps_date_order(replay):
+    record_schedule(replay, {"startDate": "2024-06-01", "endDate": "2024-06-03"}, {
+        "2024-06-01": [build_game(game_pk=1)],
+        "2024-06-03": [build_game(game_pk=3), build_game(game_pk=4)],
+    })
+    games_by_date = bb.get_mlb_games_for_dates(["2024-06-03", "2024-06-02", "2024-06-01"])
+    assert list(games_by_date) == ["2024-06-03", "2024-06-02", "2024-06-01"]
+    assert [[game["gamePk"] for game in games] for games in games_by_date.values()] == [[3, 4], [], [1]]
+
+
+@pytest.mark.parametrize("refresh_cache, revalidated", [(False, True), (True, False)])
+def test_ranged_schedule_refresh_skips_validators(replay, monkeypatch, tmp_path, refresh_cache, revalidated):
+    monkeypatch.setattr(http, "http_cache", FeedCache(tmp_path / "http"))
+    record_schedule(replay, {"startDate": GAME_DATE, "endDate": GAME_DATE}, {GAME_DATE: [build_game()]})
+    sent     = []
+    original = http._send
+
+    def spy(url, **kwargs):
+        sent.append(dict(kwargs.get("headers") or {}))
+        return original(url, **kwargs)
+
+    monkeypatch.setattr(http, "_send", spy)
+    bb.get_mlb_games_for_dates([GAME_DATE])
+    bb.get_mlb_games_for_dates([GAME_DATE], refresh_cache=refresh_cache)
+    assert ("If-None-Match" in sent[1]) == revalidated
+
+
+## -------------------------------------------------------------------------- ##
+## SEASON CALENDAR
+## -------------------------------------------------------------------------- ##
+
+CALENDARS = {
+    2023: {"2023-09-30": [1], "2023-10-01": [2, 3]},
+    2024: {"2024-03-28": [4], "2024-03-30": [5], "2024-04-01": [6]},
+}
+
+
+@pytest.fixture
+def calendars(replay, monkeypatch, tmp_path):
+    monkeypatch.setattr(bb, "calendar_dir", str(tmp_path / "calendars"))
+    for season, calendar in CALENDARS.items():
+        record_calendar(replay, season, calendar)
+    return replay
+
+
+def record_calendar(fixture_store, season: int, calendar: dict):
+    url = requests.Request("GET", const.MLB_STATS_BASE_URL + const.MLB_STATS_SCHEDULE_STUB, params={
+        "sportId"  : 1,
+        "startDate": f"{season}-01-01",
+        "endDate"  : f"{season}-12-31",
+        "fields"   : "dates,date,games,gamePk",
+    }).prepare().url
+    body = {"dates": [
+        {"date": game_date, "games": [{"gamePk": game_pk} for game_pk in game_pks]}
+        for game_date, game_pks in calendar.items()
+    ]}
+    fixture_store.save("GET", url, 200, {"Content-Type": "application/json"}, json.dumps(body).encode("utf-8"))
+
+
+def test_filter_game_dates_keeps_order_across_seasons(calendars):
+    date_list = ["2024-03-30", "2024-03-29", "2024-03-28", "2023-10-02", "2023-10-01"]
+    assert bb.filter_mlb_game_dates(date_list) == ["2024-03-30", "2024-03-28", "2023-10-01"]
+
+
+def test_latest_game_date_looks_back_a_season(calendars):
+    assert bb.get_latest_mlb_game_date("2024-03-31") == "2024-03-30"
+    assert bb.get_latest_mlb_game_date("2024-03-01") == "2023-10-01"
+    record_calendar(calendars, 2022, {})
+    assert bb.get_latest_mlb_game_date("2023-01-01") is None
+
+
+def test_calendar_is_kept_on_disk(calendars):
+    assert bb.get_mlb_season_calendar(2024) == CALENDARS[2024]
+    calendar_path = os.path.join(bb.calendar_dir, "2024.json")
+    ## A fresh copy on disk is used as is.
+    with open(calendar_path, "w", encoding="utf-8") as f:
+        json.dump({"2024-03-28": [4]}, f)
+    assert bb.get_mlb_season_calendar(2024) == {"2024-03-28": [4]}
+
+
+@pytest.mark.parametrize("written, refreshed", [
+    (datetime(2023, 6, 1), True),       ## mid-season, and long past the TTL
+    (datetime(2024, 1, 15), False),     ## after the season; never changes
+])
+def test_stale_calendar_is_refreshed(calendars, written, refreshed):
+    os.makedirs(bb.calendar_dir)
+    calendar_path = os.path.join(bb.calendar_dir, "2023.json")
+    with open(calendar_path, "w", encoding="utf-8") as f:
+        json.dump({"2023-06-01": [9]}, f)
+    os.utime(calendar_path, (written.timestamp(), written.timestamp()))
+    assert (bb.get_mlb_season_calendar(2023) == CALENDARS[2023]) == refreshed
+
+
+## -------------------------------------------------------------------------- ##
+## FEED PREFILTER
+## -------------------------------------------------------------------------- ##
+
+@pytest.mark.parametrize("hbp_counts, hbp_count", [((0, 0), 0), ((1, 2), 3), (None, None)])
+def test_scheduled_game_hbp_count(hbp_counts, hbp_count):
+    assert bb.get_mlb_scheduled_game_hbp_count(build_game(hbp_counts=hbp_counts)) == hbp_count
+
+
+def test_scheduled_game_hbp_count_needs_both_sides():
+    game = build_game()
+    del game["boxscore"]["teams"]["away"]["teamStats"]["batting"]["hitByPitch"]
+    assert bb.get_mlb_scheduled_game_hbp_count(game) is None
+
+
+@pytest.mark.parametrize("state, hbp_counts, needs_feed", [
+    ("Final", (0, 0), False),
+    ("Final", (0, 1), True),
+    ("Final", None, True),
+    ("Live", (0, 0), True),
+    ("Preview", None, True),
+])
+def test_game_needs_feed(state, hbp_counts, needs_feed):
+    assert bb.mlb_game_needs_feed(build_game(state=state, hbp_counts=hbp_counts)) == needs_feed
+
+
+def test_game_without_hbps_skips_the_feed(replay):
+    ## Nothing is recorded, so any feed request would fail.
+    game_deets, hbp_events = bb.collect_mlb_game(build_game(), use_cache=False)
+    assert hbp_events == []
+    assert game_deets.innings == 9
+    assert (game_deets.home.final_score, game_deets.away.final_score) == (4, 3)
+
+
+def test_game_with_hbps_reads_the_feed(replay):
+    with pytest.raises(requests.ConnectionError):
+        bb.collect_mlb_game(build_game(hbp_counts=(1, 0)), use_cache=False)
+
+
+def test_schedule_fields_keep_what_the_prefilter_reads():
+    fields = const.MLB_STATS_SCHEDULE_FIELDS.split(",")
+    for field in ("gamePk", "officialDate", "abstractGameState", "boxscore", "teamStats", "batting", "hitByPitch", "innings", "leagueRecord"):
+        assert field in fields
+
+
+## -------------------------------------------------------------------------- ##
+## COLLECTING GAMES
+## -------------------------------------------------------------------------- ##
+
+def test_collected_game_comes_off_retry_queue(database):
+    dbmgr.queue_fetch_retry(GAME_PK, GAME_DATE, "populated", "timed out")
+    dbmgr.queue_fetch_retry(GAME_PK, GAME_DATE, "downloaded", "timed out")
+
+    game_deets, hbp_events = bb.collect_mlb_game(build_game(), use_cache=False, retry_step="populated")
+    assert game_deets.game_pk == GAME_PK
+    assert hbp_events == []
+    assert not dbmgr.clear_fetch_retry(GAME_PK, "populated")
+    ## Only the step that collected it is done with it.
+    assert dbmgr.clear_fetch_retry(GAME_PK, "downloaded")
+
+
+def test_collected_game_without_retry_step_leaves_queue(database):
+    dbmgr.queue_fetch_retry(GAME_PK, GAME_DATE, "populated", "timed out")
+    bb.collect_mlb_game(build_game(), use_cache=False)
+    assert dbmgr.clear_fetch_retry(GAME_PK, "populated")
+
+
+def test_clear_fetch_retries(database):
+    for game_pk in (1, 2, 3):
+        dbmgr.queue_fetch_retry(game_pk, GAME_DATE, "populated", "timed out")
+    assert dbmgr.clear_fetch_retries([1, 3, 4], "populated") == 2
+    assert dbmgr.clear_fetch_retries([], "populated") == 0
+    assert dbmgr.clear_fetch_retry(2, "populated")
+
+
+def test_collect_dates_skips_processed_games(replay, database, capsys):
+    record_schedule(replay, {"startDate": GAME_DATE, "endDate": GAME_DATE}, {GAME_DATE: [build_game(game_pk=1), build_game(game_pk=2)]})
+    dbmgr.set_games_processed([bb.collect_mlb_game(build_game(game_pk=1), use_cache=False)], "populated")
+
+    games_and_events, failed_games = bb.collect_mlb_hit_by_pitch_events_for_dates([GAME_DATE], use_cache=False)
+    assert [game_deets.game_pk for game_deets, hbp_events in games_and_events] == [2]
+    assert failed_games == []
+    assert "Skipping 1 games" in capsys.readouterr().out
+
+    games_and_events, failed_games = bb.collect_mlb_hit_by_pitch_events_for_dates([GAME_DATE], use_cache=False, skip_processed=False)
+    assert [game_deets.game_pk for game_deets, hbp_events in games_and_events] == [1, 2]
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+from src.hbp.libhbp import func_baseball as bb
+from src.hbp.libhbp import func_database as dbmgr
+from src.hbp.libhbp.models import GameInfo, TeamResult
+
+
+GAME_DATE = "2024-06-01"
+
+
+def build_game_deets(game_pk: int, state: str = "Final") -> GameInfo:
+    return GameInfo(
+        home=TeamResult(team="Seattle Mariners", final_score=4, wins=30, losses=28, pct=".517"),
+        away=TeamResult(team="Texas Rangers", final_score=3, wins=28, losses=30, pct=".483"),
+        description="Regular Season",
+        date=GAME_DATE,
+        innings=9,
+        game_pk=game_pk,
+        state=state,
+    )
+
+
+## -------------------------------------------------------------------------- ##
+## GAMES LEDGER
+## -------------------------------------------------------------------------- ##
+
+def test_only_final_games_are_recorded(database):
+    assert dbmgr.set_games_processed([(build_game_deets(1), []), (build_game_deets(2, "Live"), [])], "populated") == 1
+    assert dbmgr.get_processed_games([1, 2], "populated") == {1}
+
+
+def test_steps_are_tracked_separately(database):
+    dbmgr.set_games_processed([(build_game_deets(1), [])], "populated")
+    assert dbmgr.get_processed_games([1], "downloaded") == set()
+    dbmgr.set_games_processed([(build_game_deets(1), [])], "downloaded")
+    assert dbmgr.get_processed_games([1], "downloaded") == {1}
+    assert dbmgr.get_processed_games([1], "populated") == {1}
+
+
+def test_unknown_step_is_ignored(database):
+    assert dbmgr.set_games_processed([(build_game_deets(1), [])], "analyzed") == 0
+    assert dbmgr.get_processed_games([1], "analyzed") == set()
+    assert dbmgr.get_processed_games([], "populated") == set()
+
+
+def test_lookup_spans_batches(database):
+    game_pks = list(range(1, dbmgr.SQL_BATCH_SIZE * 2 + 2))
+    dbmgr.set_games_processed([(build_game_deets(game_pk), []) for game_pk in game_pks[::2]], "populated")
+    assert dbmgr.get_processed_games(game_pks, "populated") == set(game_pks[::2])
+
+
+def test_drop_processed_games(database):
+    dbmgr.set_games_processed([(build_game_deets(2), []), (build_game_deets(3), [])], "downloaded")
+    games_by_date = {
+        "2024-06-02": [{"gamePk": 3}, {"gamePk": 4}],
+        "2024-06-01": [{"gamePk": 1}, {"gamePk": 2}],
+    }
+    games_by_date, dropped = bb.drop_processed_mlb_games(games_by_date, "downloaded")
+    assert games_by_date == {"2024-06-02": [{"gamePk": 4}], "2024-06-01": [{"gamePk": 1}]}
+    assert dropped == 2
+    assert bb.drop_processed_mlb_games(games_by_date, "populated")[1] == 0
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+
+import os
+import pytest
+
+from pathlib import Path
+
+from src.hbp.libhbp import func_general as gen
+
+
+VIDEO_URL = "https://sporty-clips.mlb.com/abc123.mp4"
+VIDEO     = bytes(range(256)) * 40
+
+## Recorded responses never carry Content-Length (see FixtureStore.save), so
+## only a 206's Content-Range gives the downloader a size to check against.
+
+
+@pytest.fixture
+def sent_headers(replay, monkeypatch) -> list:
+    """The headers of every request download_video_file() sends, in order."""
+    sent     = []
+    original = gen.http.get
+
+    def spy(url, **kwargs):
+        sent.append(dict(kwargs.get("headers") or {}))
+        return original(url, **kwargs)
+
+    monkeypatch.setattr(gen.http, "get", spy)
+    return sent
+
+
+@pytest.fixture
+def video_path(tmp_path) -> Path:
+    return Path(tmp_path, "745123_abc123.mp4")
+
+
+def write_part(video_path: Path, data: bytes):
+    with open(gen.get_video_part_path(video_path), "wb") as f:
+        f.write(data)
+
+
+@pytest.mark.parametrize("content_range, total", [
+    ("bytes 100-199/1234", 1234),
+    ("bytes */1234", 1234),
+    ("bytes 0-99/*", 0),
+    (None, 0),
+])
+def test_parse_content_range_total(content_range, total):
+    assert gen.parse_content_range_total(content_range) == total
+
+
+def test_fresh_download(replay, sent_headers, video_path):
+    replay.save("GET", VIDEO_URL, 200, {}, VIDEO)
+    assert gen.download_video_file(VIDEO_URL, video_path, chunk_size=1024) == len(VIDEO)
+    assert video_path.read_bytes() == VIDEO
+    assert not os.path.exists(gen.get_video_part_path(video_path))
+    assert "Range" not in sent_headers[0]
+    assert sent_headers[0]["Accept-Encoding"] == "identity"
+
+
+def test_resume_from_part(replay, sent_headers, video_path):
+    write_part(video_path, VIDEO[:4000])
+    replay.save("GET", VIDEO_URL, 206, {"Content-Range": f"bytes 4000-{len(VIDEO) - 1}/{len(VIDEO)}"}, VIDEO[4000:])
+    assert gen.download_video_file(VIDEO_URL, video_path, chunk_size=1024) == len(VIDEO) - 4000
+    assert sent_headers[0]["Range"] == "bytes=4000-"
+    assert video_path.read_bytes() == VIDEO
+
+
+def test_range_ignored_starts_over(replay, video_path):
+    write_part(video_path, b"stale" * 100)
+    replay.save("GET", VIDEO_URL, 200, {}, VIDEO)
+    gen.download_video_file(VIDEO_URL, video_path, chunk_size=1024)
+    assert video_path.read_bytes() == VIDEO
+
+
+def test_416_with_complete_part(replay, sent_headers, video_path):
+    write_part(video_path, VIDEO)
+    replay.save("GET", VIDEO_URL, 416, {"Content-Range": f"bytes */{len(VIDEO)}"}, b"")
+    assert gen.download_video_file(VIDEO_URL, video_path) == 0
+    assert len(sent_headers) == 1
+    assert video_path.read_bytes() == VIDEO
+    assert not os.path.exists(gen.get_video_part_path(video_path))
+
+
+def test_416_with_stale_part_starts_over(replay, sent_headers, video_path):
+    write_part(video_path, VIDEO + b"extra")
+    replay.save("GET", VIDEO_URL, 416, {"Content-Range": f"bytes */{len(VIDEO)}"}, b"")
+    replay.save("GET", VIDEO_URL, 200, {}, VIDEO)
+    assert gen.download_video_file(VIDEO_URL, video_path, chunk_size=1024) == len(VIDEO)
+    assert "Range" in sent_headers[0]
+    assert "Range" not in sent_headers[1]
+    assert video_path.read_bytes() == VIDEO
+
+
+def test_416_without_part(replay, sent_headers, video_path):
+    replay.save("GET", VIDEO_URL, 416, {"Content-Range": f"bytes */{len(VIDEO)}"}, b"")
+    replay.save("GET", VIDEO_URL, 200, {}, VIDEO)
+    gen.download_video_file(VIDEO_URL, video_path, chunk_size=1024)
+    assert len(sent_headers) == 2
+    assert video_path.read_bytes() == VIDEO
+
+
+def test_short_download_keeps_part(replay, video_path):
+    write_part(video_path, VIDEO[:1000])
+    replay.save("GET", VIDEO_URL, 206, {"Content-Range": f"bytes 1000-{len(VIDEO) - 1}/{len(VIDEO)}"}, VIDEO[1000:3000])
+    with pytest.raises(RuntimeError):
+        gen.download_video_file(VIDEO_URL, video_path, chunk_size=1024)
+    assert not video_path.exists()
+    assert os.path.getsize(gen.get_video_part_path(video_path)) == 3000
+
+
+## -------------------------------------------------------------------------- ##
+## SAVANT VIDEO PAGES
+## -------------------------------------------------------------------------- ##
+
+PLAY_ID  = "0a1b2c3d-aaaa-bbbb-cccc-0123456789ab"
+PAGE_URL = f"{gen.const.BASEBALL_SAVANT_PLAY_VIDEO_URL}?playId={PLAY_ID}"
+
+
+def build_page(video_box: str) -> bytes:
+    """A sporty-videos page, trimmed to what the lookup cares about."""
+    return f"""<!DOCTYPE html>
+<html><head><title>Baseball Savant</title></head><body>
+<div class="video-box-header"><video><source src="https://sporty-clips.mlb.com/teaser.mp4" type="video/mp4"></video></div>
+{video_box}
+<div class="footer"><video><source src="https://sporty-clips.mlb.com/ad.mp4" type="video/mp4"></video></div>
+</body></html>""".encode("utf-8")
+
+
+@pytest.fixture
+def soup_calls(monkeypatch) -> list:
+    """Every time find_savant_video_url() falls back to BeautifulSoup."""
+    calls    = []
+    original = gen.BeautifulSoup
+
+    def spy(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(gen, "BeautifulSoup", spy)
+    return calls
+
+
+def test_savant_page_pattern(replay, database, soup_calls):
+    replay.save("GET", PAGE_URL, 200, {"Content-Type": "text/html"}, build_page(
+        '<div class="mod video-box"><video controls><source src="https://sporty-clips.mlb.com/play.mp4?a=1&amp;b=2" type="video/mp4"></video></div>'
+    ))
+    assert gen.resolve_baseball_savant_video_url(PLAY_ID) == "https://sporty-clips.mlb.com/play.mp4?a=1&b=2"
+    assert gen.dbmgr.get_cached_video_url(PLAY_ID) == "https://sporty-clips.mlb.com/play.mp4?a=1&b=2"
+    assert soup_calls == []
+
+
+def test_savant_page_without_video(replay, database, soup_calls):
+    replay.save("GET", PAGE_URL, 200, {"Content-Type": "text/html"}, b"<html><body><p>No video for this play.</p></body></html>")
+    assert gen.resolve_baseball_savant_video_url(PLAY_ID) is None
+    assert gen.dbmgr.get_cached_video_url(PLAY_ID) is None
+    assert soup_calls == []
+
+
+def test_savant_page_header_is_not_the_video_box():
+    ## Only video-box-header; the teaser after it isn't the play's video.
+    page_html = build_page("").decode("utf-8")
+    assert gen.VIDEO_BOX_PATTERN.search(page_html) is None
+
+
+def test_savant_page_falls_back_to_soup(replay, database, soup_calls):
+    pytest.importorskip("lxml")
+    ## Single-quoted attributes are past what the patterns read.
+    replay.save("GET", PAGE_URL, 200, {"Content-Type": "text/html"}, build_page(
+        "<div class='video-box'><video><source type='video/mp4' src='https://sporty-clips.mlb.com/play.mp4'></video></div>"
+    ))
+    assert gen.resolve_baseball_savant_video_url(PLAY_ID) == "https://sporty-clips.mlb.com/play.mp4"
+    assert len(soup_calls) == 1
+
+
+## -------------------------------------------------------------------------- ##
+## SAVANT PLAYS
+## -------------------------------------------------------------------------- ##
+
+def test_savant_play_downloads(replay, savant, tmp_path):
+    savant.video_urls["abc123"] = VIDEO_URL
+    replay.save("GET", VIDEO_URL, 200, {}, VIDEO)
+    path, nbytes = gen.download_baseball_savant_play(745123, "abc123", video_dir=tmp_path)
+    assert path.read_bytes() == VIDEO
+    assert nbytes == len(VIDEO)
+
+    ## Already there: nothing to resolve or fetch.
+    savant.video_urls["abc123"] = RuntimeError("shouldn't be asked")
+    assert gen.download_baseball_savant_play(745123, "abc123", video_dir=tmp_path) == (path, 0)
+
+
+def test_savant_play_not_published(savant, tmp_path):
+    savant.video_urls["abc123"] = None
+    assert gen.download_baseball_savant_play(745123, "abc123", video_dir=tmp_path) == (None, 0)
+
+
+def test_savant_play_page_fails(savant, tmp_path):
+    savant.video_urls["abc123"] = ConnectionError("refused")
+    with pytest.raises(gen.VideoUrlError, match="refused"):
+        gen.download_baseball_savant_play(745123, "abc123", video_dir=tmp_path)
+
+
+def test_savant_play_bad_video_url(replay, savant, tmp_path):
+    savant.video_urls["abc123"] = VIDEO_URL
+    replay.save("GET", VIDEO_URL, 404, {}, b"")
+    with pytest.raises(gen.requests.HTTPError):
+        gen.download_baseball_savant_play(745123, "abc123", video_dir=tmp_path)
+    assert savant.forgotten == ["abc123"]
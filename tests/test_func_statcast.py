@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import math
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pybaseball")
+
+from src.hbp.libhbp import func_statcast as sc
+
+
+## Statcast nine-parameter fits, in ft/s and ft/s^2 at y = 50 ft.
+FASTBALL  = {"vx0": 6.2, "vy0": -136.1, "vz0": -5.9, "ax": -14.8, "ay": 28.9, "az": -16.3}
+CURVEBALL = {"vx0": -2.4, "vy0": -114.7, "vz0": 2.1, "ax": 7.9, "ay": 21.3, "az": -46.2}
+
+
+def step_to_plate(pitch: dict, dt: float = 1e-5) -> float:
+    '''The same pitch flown forward a small step at a time, in mph.'''
+    y, vx, vy, vz = 50.0, pitch["vx0"], pitch["vy0"], pitch["vz0"]
+    while y > sc.PLATE_FRONT_Y_FT:
+        y  = y + vy * dt
+        vx = vx + pitch["ax"] * dt
+        vy = vy + pitch["ay"] * dt
+        vz = vz + pitch["az"] * dt
+    return math.sqrt(vx**2 + vy**2 + vz**2) * sc.FT_PER_SEC_TO_MPH
+
+
+def test_end_speed_matches_the_flight():
+    end_speeds = sc.compute_end_speed(pd.DataFrame([FASTBALL, CURVEBALL]))
+    assert list(end_speeds) == pytest.approx([round(step_to_plate(FASTBALL), 1), round(step_to_plate(CURVEBALL), 1)])
+    assert end_speeds[0] == 85.9
+
+
+def test_end_speed_is_slower_than_release():
+    pitches = pd.DataFrame([FASTBALL, CURVEBALL])
+    release = (pitches["vx0"]**2 + pitches["vy0"]**2 + pitches["vz0"]**2)**0.5 * sc.FT_PER_SEC_TO_MPH
+    assert (sc.compute_end_speed(pitches) < release).all()
+
+
+def test_end_speed_without_a_fit():
+    pitches = pd.DataFrame([FASTBALL, {column: None for column in sc.TRAJECTORY_COLUMNS}], dtype=float)
+    end_speeds = sc.compute_end_speed(pitches)
+    assert end_speeds[0] == 85.9
+    assert pd.isna(end_speeds[1])
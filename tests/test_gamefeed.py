@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+import json
+import pytest
+
+from src.hbp.libhbp.feedcache import FeedCache
+from src.hbp.libhbp.gamefeed import GameFeed, apply_json_patch
+
+
+GAME_PK = 745123
+
+
+def build_play(inning: int, event: str, at_bat: int) -> dict:
+    return {
+        "about"     : {"inning": inning, "atBatIndex": at_bat},
+        "result"    : {"event": event},
+        "playEvents": [{"details": {"description": "Ball"}, "pitchData": {"endSpeed": 88.1}}],
+    }
+
+
+def build_feed(state: str = "Final", timestamp: str = "20240601_230000") -> dict:
+    return {
+        "gamePk"  : GAME_PK,
+        "metaData": {"timeStamp": timestamp},
+        "gameData": {"game": {"pk": GAME_PK}, "status": {"abstractGameState": state}},
+        "liveData": {
+            "linescore": {"currentInning": 10, "teams": {"home": {"runs": 4}, "away": {"runs": 3}}},
+            "boxscore" : {"teams": {"home": {"players": {}}, "away": {"players": {}}}},
+            "plays"    : {"allPlays": [
+                build_play(1, "Strikeout", 0),
+                build_play(3, "Hit By Pitch", 1),
+                build_play(7, "Single", 2),
+                build_play(10, "Home Run", 3),
+            ]},
+        },
+    }
+
+
+def record_feed(fixture_store, feed: dict):
+    fixture_store.save("GET", GameFeed(GAME_PK).url, 200, {"Content-Type": "application/json"}, json.dumps(feed).encode("utf-8"))
+
+
+## -------------------------------------------------------------------------- ##
+## JSON PATCH
+## -------------------------------------------------------------------------- ##
+
+def test_apply_json_patch_add_replace_remove():
+    doc = {"a": {"b": 1}, "list": [1, 2, 3]}
+    doc = apply_json_patch(doc, [
+        {"op": "replace", "path": "/a/b", "value": 2},
+        {"op": "add", "path": "/a/c", "value": "new"},
+        {"op": "add", "path": "/list/1", "value": 9},
+        {"op": "add", "path": "/list/-", "value": 4},
+        {"op": "remove", "path": "/list/0"},
+    ])
+    assert doc == {"a": {"b": 2, "c": "new"}, "list": [9, 2, 3, 4]}
+
+
+def test_apply_json_patch_copy_move_and_escaped_pointers():
+    doc = {"a/b": {"x": 1}, "m~n": [5]}
+    doc = apply_json_patch(doc, [
+        {"op": "copy", "from": "/a~1b/x", "path": "/copied"},
+        {"op": "move", "from": "/m~0n/0", "path": "/moved"},
+    ])
+    assert doc == {"a/b": {"x": 1}, "m~n": [], "copied": 1, "moved": 5}
+
+
+def test_apply_json_patch_copies_are_independent():
+    doc = apply_json_patch({"a": {"b": [1]}}, [{"op": "copy", "from": "/a", "path": "/c"}])
+    doc["c"]["b"].append(2)
+    assert doc["a"]["b"] == [1]
+
+
+def test_apply_json_patch_replaces_root():
+    assert apply_json_patch({"a": 1}, [{"op": "replace", "path": "", "value": {"b": 2}}]) == {"b": 2}
+
+
+def test_apply_json_patch_test_op():
+    doc = {"a": 1}
+    assert apply_json_patch(doc, [{"op": "test", "path": "/a", "value": 1}]) == {"a": 1}
+    with pytest.raises(ValueError):
+        apply_json_patch(doc, [{"op": "test", "path": "/a", "value": 2}])
+
+
+def test_apply_json_patch_unknown_op():
+    with pytest.raises(ValueError):
+        apply_json_patch({"a": 1}, [{"op": "frobnicate", "path": "/a", "value": 1}])
+
+
+## -------------------------------------------------------------------------- ##
+## GAME FEED
+## -------------------------------------------------------------------------- ##
+
+def test_full_feed(replay):
+    record_feed(replay, build_feed())
+    feed = GameFeed(GAME_PK)
+    assert feed.abstract_game_state == "Final"
+    assert len(feed.all_plays) == 4
+    assert feed.total_innings == 10
+    assert feed.final_scores == {"home": 4, "away": 3}
+    assert [play["about"]["atBatIndex"] for play in feed.get_plays_by_event("Hit By Pitch")] == [1]
+
+
+def test_streamed_feed_keeps_only_wanted_plays(replay):
+    pytest.importorskip("ijson")
+    record_feed(replay, build_feed())
+    feed = GameFeed(GAME_PK, stream=True)
+    assert feed.abstract_game_state == "Final"
+    assert feed.final_scores == {"home": 4, "away": 3}
+    assert feed.streamed
+    assert [play["result"]["event"] for play in feed.all_plays] == ["Hit By Pitch"]
+    assert feed.all_plays[0]["playEvents"][0]["pitchData"]["endSpeed"] == 88.1
+    ## The last play streamed past, even though it wasn't kept.
+    assert feed.total_innings == 10
+
+
+def test_streamed_feed_keep_events(replay):
+    pytest.importorskip("ijson")
+    record_feed(replay, build_feed())
+    feed = GameFeed(GAME_PK, stream=True, keep_events=("Single", "Home Run"))
+    assert [play["about"]["atBatIndex"] for play in feed.all_plays] == [2, 3]
+
+
+def test_streamed_feed_total_innings_falls_back_to_linescore(replay):
+    pytest.importorskip("ijson")
+    feed_data = build_feed(state="Live")
+    feed_data["liveData"]["plays"]["allPlays"] = []
+    feed_data["liveData"]["linescore"]["currentInning"] = 1
+    record_feed(replay, feed_data)
+    assert GameFeed(GAME_PK, stream=True).total_innings == 1
+
+
+def test_final_feed_goes_through_cache(replay, tmp_path):
+    record_feed(replay, build_feed())
+    cache = FeedCache(tmp_path / "feeds")
+    assert GameFeed(GAME_PK, cache=cache).total_innings == 10
+    assert cache.has(GAME_PK)
+
+    ## Nothing is left to replay that would tell the two apart, so check the flag.
+    cached = GameFeed(GAME_PK, cache=cache)
+    assert cached.total_innings == 10
+    assert cached.from_cache
+
+
+def test_live_feed_is_not_cached(replay, tmp_path):
+    record_feed(replay, build_feed(state="Live"))
+    cache = FeedCache(tmp_path / "feeds")
+    assert GameFeed(GAME_PK, cache=cache).abstract_game_state == "Live"
+    assert not cache.has(GAME_PK)
+
+
+def test_update_applies_diff_patch(replay):
+    record_feed(replay, build_feed(state="Live", timestamp="t1"))
+    feed = GameFeed(GAME_PK)
+    assert feed.timecode is None
+    feed.data
+    assert feed.timecode == "t1"
+
+    patches = [{"diff": [
+        {"op": "replace", "path": "/metaData/timeStamp", "value": "t2"},
+        {"op": "add", "path": "/liveData/plays/allPlays/-", "value": build_play(10, "Hit By Pitch", 4)},
+        {"op": "replace", "path": "/liveData/linescore/teams/home/runs", "value": 5},
+    ]}]
+    replay.save("GET", f"{feed.diff_url}?startTimecode=t1", 200, {}, json.dumps(patches).encode("utf-8"))
+
+    assert feed.update()
+    assert feed.timecode == "t2"
+    assert feed.final_scores["home"] == 5
+    assert len(feed.get_plays_by_event("Hit By Pitch")) == 2
+
+
+def test_update_takes_a_whole_feed(replay):
+    record_feed(replay, build_feed(state="Live", timestamp="t1"))
+    feed = GameFeed(GAME_PK)
+    feed.data
+
+    replay.save("GET", f"{feed.diff_url}?startTimecode=t1", 200, {}, json.dumps(build_feed(timestamp="t9")).encode("utf-8"))
+    assert feed.update()
+    assert feed.timecode == "t9"
+    assert feed.abstract_game_state == "Final"
+
+
+def test_streamed_feed_cannot_update():
+    feed = GameFeed(GAME_PK, stream=True)
+    if not feed.stream:
+        pytest.skip("ijson isn't installed, so the feed won't stream")
+    with pytest.raises(RuntimeError):
+        feed.update()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+import pytest
+import requests
+
+from src.hbp.libhbp import httpclient as http
+from src.hbp.libhbp.feedcache import FeedCache
+
+
+URL = "https://statsapi.mlb.com/api/v1/schedule?sportId=1&date=2024-06-01"
+
+
+## -------------------------------------------------------------------------- ##
+## RECORD / REPLAY
+## -------------------------------------------------------------------------- ##
+
+def test_request_key_ignores_query_order_and_fragment():
+    assert http.FixtureStore.request_key("get", "https://x.test/a?b=2&a=1#top") == \
+           http.FixtureStore.request_key("GET", "https://x.test/a?a=1&b=2")
+    assert http.FixtureStore.request_key("GET", "https://x.test/a?a=1") != \
+           http.FixtureStore.request_key("HEAD", "https://x.test/a?a=1")
+
+
+def test_fixture_store_replays_in_order_then_repeats(fixture_store):
+    fixture_store.save("GET", URL, 200, {"ETag": "one"}, b"first")
+    fixture_store.save("GET", URL, 503, {"Retry-After": "1"}, b"second")
+
+    replay = http.FixtureStore(fixture_store.fixture_dir)
+    assert replay.load("GET", URL) == (200, {"ETag": "one"}, b"first")
+    assert replay.load("GET", URL) == (503, {"Retry-After": "1"}, b"second")
+    assert replay.load("GET", URL) == (503, {"Retry-After": "1"}, b"second")
+
+
+def test_fixture_store_miss(fixture_store):
+    assert fixture_store.load("GET", URL) is None
+
+
+def test_fixture_store_drops_transfer_headers(fixture_store):
+    fixture_store.save("GET", URL, 200, {"Content-Encoding": "gzip", "Content-Length": "5", "Content-Type": "text/plain"}, b"plain")
+    status, headers, body = http.FixtureStore(fixture_store.fixture_dir).load("GET", URL)
+    assert headers == {"Content-Type": "text/plain"}
+    assert body == b"plain"
+
+
+def test_replay_session(replay):
+    replay.save("GET", URL, 200, {"Content-Type": "application/json"}, b'{"dates": []}')
+    response = http.get("https://statsapi.mlb.com/api/v1/schedule", params={"date": "2024-06-01", "sportId": 1})
+    assert response.status_code == 200
+    assert response.json() == {"dates": []}
+
+
+def test_replay_session_streams(replay):
+    replay.save("GET", URL, 200, {}, b"x" * 1000)
+    with http.get(URL, stream=True) as response:
+        assert b"".join(response.iter_content(64)) == b"x" * 1000
+
+
+def test_replay_session_miss(replay):
+    with pytest.raises(requests.ConnectionError):
+        http.get(URL)
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        http.build_session(mode="offline")
+
+
+## -------------------------------------------------------------------------- ##
+## CONDITIONAL GET
+## -------------------------------------------------------------------------- ##
+
+@pytest.fixture
+def http_cache(replay, monkeypatch, tmp_path) -> FeedCache:
+    cache = FeedCache(tmp_path / "http", compression="gzip")
+    monkeypatch.setattr(http, "http_cache", cache)
+    return cache
+
+
+def test_not_modified_serves_cached_body(replay, http_cache):
+    replay.save("GET", URL, 200, {"ETag": '"v1"', "Content-Type": "application/json"}, b'{"dates": [1]}')
+    replay.save("GET", URL, 304, {"ETag": '"v1"'}, b"")
+
+    first = http.get(URL, conditional=True)
+    assert first.status_code == 200
+    assert not getattr(first, "from_cache", False)
+
+    second = http.get(URL, conditional=True)
+    assert second.status_code == 200
+    assert second.from_cache
+    assert second.json() == {"dates": [1]}
+    assert second.headers["Content-Type"] == "application/json"
+    assert second.request.headers["If-None-Match"] == '"v1"'
+
+
+def test_changed_response_replaces_cached_body(replay, http_cache):
+    replay.save("GET", URL, 200, {"Last-Modified": "Sat, 01 Jun 2024 20:00:00 GMT"}, b"old")
+    replay.save("GET", URL, 200, {"Last-Modified": "Sat, 01 Jun 2024 21:00:00 GMT"}, b"new")
+    replay.save("GET", URL, 304, {}, b"")
+
+    assert http.get(URL, conditional=True).content == b"old"
+    second = http.get(URL, conditional=True)
+    assert second.content == b"new"
+    assert second.request.headers["If-Modified-Since"] == "Sat, 01 Jun 2024 20:00:00 GMT"
+
+    third = http.get(URL, conditional=True)
+    assert third.from_cache
+    assert third.content == b"new"
+
+
+def test_response_without_validators_is_not_kept(replay, http_cache):
+    replay.save("GET", URL, 200, {}, b"body")
+    http.get(URL, conditional=True)
+    assert http.get(URL, conditional=True).request.headers.get("If-None-Match") is None
+    assert http_cache.size() == 0
+
+
+def test_plain_get_skips_the_cache(replay, http_cache):
+    replay.save("GET", URL, 200, {"ETag": '"v1"'}, b"body")
+    http.get(URL)
+    assert http_cache.size() == 0
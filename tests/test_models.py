@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import pytest
+
+from src.hbp.libhbp.models import AtBat, HbpEvent, loads
+
+
+GAME_PK = 745123
+
+
+def build_pitch(play_id: str, end_speed: float = 85.3, pitch_type: dict = None) -> dict:
+    return {
+        "isPitch"  : True,
+        "playId"   : play_id,
+        "count"    : {"balls": 1, "strikes": 2, "outs": 1},
+        "details"  : {"type": pitch_type or {"code": "SI", "description": "Sinker"}},
+        "pitchData": {"startSpeed": 93.4, "endSpeed": end_speed, "coordinates": {"pX": -0.91, "pZ": 2.2}},
+    }
+
+
+def build_hbp_play(half_inning: str = "top", play_events: list = None) -> dict:
+    return {
+        "result"    : {"event": "Hit By Pitch", "description": "Julio Rodríguez hit by pitch.", "homeScore": 2, "awayScore": 1},
+        "about"     : {"inning": 6, "halfInning": half_inning, "atBatIndex": 44},
+        "matchup"   : {
+            "batter"   : {"id": 677594, "fullName": "Julio Rodríguez"},
+            "batSide"  : {"code": "R"},
+            "pitcher"  : {"id": 656756, "fullName": "Jordan Montgomery"},
+            "pitchHand": {"code": "L"},
+        },
+        "playEvents": play_events if play_events is not None else [build_pitch("aaaa"), build_pitch("bbbb")],
+    }
+
+
+def test_from_play():
+    event = HbpEvent.from_play(build_hbp_play(), GAME_PK, "Texas Rangers", "Seattle Mariners")
+    assert event.game_pk == GAME_PK
+    assert event.play_id == "bbbb"
+    assert event.description == "Julio Rodríguez hit by pitch."
+    assert (event.batter.id, event.batter.name, event.batter.hand) == (677594, "Julio Rodríguez", "R")
+    assert (event.pitcher.id, event.pitcher.name, event.pitcher.hand) == (656756, "Jordan Montgomery", "L")
+    assert event.at_bat == AtBat(
+        home_score=2, away_score=1, balls=1, strikes=2, outs_when_up=1, inning=6, half_inning="top",
+        start_speed=93.4, end_speed=85.3, plate_x=-0.91, plate_z=2.2, pitch_name="Sinker",
+    )
+
+
+@pytest.mark.parametrize("half_inning, batting_team, pitching_team", [
+    ("top", "Seattle Mariners", "Texas Rangers"),
+    ("bottom", "Texas Rangers", "Seattle Mariners"),
+])
+def test_from_play_sides(half_inning, batting_team, pitching_team):
+    event = HbpEvent.from_play(build_hbp_play(half_inning), GAME_PK, "Texas Rangers", "Seattle Mariners")
+    assert event.batter.team == batting_team
+    assert event.pitcher.team == pitching_team
+
+
+def test_from_play_takes_play_id_from_last_pitch():
+    ## A pickoff throw or mound visit can come after the pitch that hit him.
+    play_events = [build_pitch("aaaa"), build_pitch("bbbb"), {"isPitch": False, "count": {"balls": 1, "strikes": 2, "outs": 1}, "details": {}}]
+    event       = HbpEvent.from_play(build_hbp_play(play_events=play_events), GAME_PK, "Texas Rangers", "Seattle Mariners")
+    assert event.play_id == "bbbb"
+
+
+def test_from_play_without_a_pitch():
+    play_events = [{"isPitch": False, "count": {"balls": 0, "strikes": 0, "outs": 2}, "details": {}}]
+    event       = HbpEvent.from_play(build_hbp_play(play_events=play_events), GAME_PK, "Texas Rangers", "Seattle Mariners")
+    assert event.play_id is None
+    assert event.at_bat.outs_when_up == 2
+
+
+def test_records_read_like_dicts():
+    event = HbpEvent.from_play(build_hbp_play(), GAME_PK, "Texas Rangers", "Seattle Mariners")
+    assert event["at_bat"]["end_speed"] == 85.3
+    assert event.get("nope", "default") == "default"
+    with pytest.raises(KeyError):
+        event["nope"]
+
+
+def test_loads():
+    assert loads(b'{"a": [1, 2.5, "\\u00e9"]}') == {"a": [1, 2.5, "é"]}
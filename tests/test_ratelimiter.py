@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+
+import asyncio
+import threading
+import time
+import pytest
+import requests
+
+from datetime import timedelta
+from types import SimpleNamespace
+from urllib3.util.retry import RequestHistory, Retry
+
+from src.hbp.libhbp import httpclient as http
+from src.hbp.libhbp.ratelimiter import AdaptiveLimiter, TokenBucket
+
+
+## -------------------------------------------------------------------------- ##
+## TOKEN BUCKET
+## -------------------------------------------------------------------------- ##
+
+def test_token_bucket_burst_then_rate():
+    bucket = TokenBucket(10, 3)
+    assert [bucket._reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    ## Each caller past the burst waits one token (0.1 s) longer than the last.
+    assert bucket._reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket._reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_refills():
+    bucket = TokenBucket(100, 1)
+    bucket._reserve()
+    time.sleep(0.02)
+    assert bucket._reserve() == 0.0
+
+
+def test_token_bucket_default_capacity():
+    assert TokenBucket(0.5).capacity == 1.0
+    assert TokenBucket(8).capacity == 8.0
+
+
+def test_token_bucket_disabled():
+    bucket = TokenBucket(0)
+    assert all(bucket._reserve() == 0.0 for _ in range(100))
+
+
+def test_token_bucket_acquire_waits():
+    bucket = TokenBucket(20, 1)
+    start  = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_token_bucket_acquire_async_waits():
+    bucket = TokenBucket(20, 1)
+
+    async def acquire_all():
+        await asyncio.gather(*(bucket.acquire_async() for _ in range(3)))
+
+    start = time.monotonic()
+    asyncio.run(acquire_all())
+    assert time.monotonic() - start >= 0.09
+
+
+## -------------------------------------------------------------------------- ##
+## ADAPTIVE LIMITER
+## -------------------------------------------------------------------------- ##
+
+def run_request(limiter: AdaptiveLimiter, latency: float, ok: bool = True):
+    limiter.acquire()
+    limiter.release(latency, ok)
+
+
+def test_initial_limit_is_clamped():
+    assert AdaptiveLimiter(20, 1, 8).concurrency == 8
+    assert AdaptiveLimiter(0, 2, 8).concurrency == 2
+    assert AdaptiveLimiter(4, 0, 8).minimum == 1
+
+
+def test_additive_increase():
+    limiter = AdaptiveLimiter(2, 1, 4)
+    run_request(limiter, 0.01)
+    assert limiter.limit == pytest.approx(2.5)
+    run_request(limiter, 0.01)
+    assert limiter.limit == pytest.approx(2.9)
+    for _ in range(50):
+        run_request(limiter, 0.01)
+    assert limiter.limit == 4
+    assert limiter.peak_limit == 4
+    assert limiter.requests == 52
+
+
+def test_failure_halves_limit():
+    limiter = AdaptiveLimiter(8, 1, 8)
+    run_request(limiter, 0.01, ok=False)
+    assert limiter.concurrency == 4
+    assert limiter.low_limit == 4
+
+
+def test_backoff_halves_limit_down_to_minimum():
+    limiter = AdaptiveLimiter(4, 3, 8)
+    limiter.backoff()
+    assert limiter.concurrency == 3
+    assert limiter.throttled == 1
+
+
+def test_one_decrease_per_round_trip():
+    limiter = AdaptiveLimiter(8, 1, 8, latency_tolerance=1000)
+    run_request(limiter, 1.0)
+    limiter.backoff()
+    limiter.backoff()
+    run_request(limiter, 1.0, ok=False)
+    ## Everything above was inside one (1 s) round trip of the first cut.
+    assert limiter.concurrency == 4
+    assert limiter.throttled == 2
+
+
+def test_latency_climb_decreases():
+    limiter = AdaptiveLimiter(4, 1, 8, latency_tolerance=2.0)
+    run_request(limiter, 0.1)
+    assert limiter.limit == pytest.approx(4.25)
+    run_request(limiter, 5.0)
+    assert limiter.limit == pytest.approx(2.125)
+
+
+def test_fast_responses_are_not_congestion():
+    ## 10 ms against a 1 ms baseline is ten times slower, but still under the floor.
+    limiter = AdaptiveLimiter(2, 1, 8, latency_tolerance=2.0)
+    run_request(limiter, 0.001)
+    run_request(limiter, 0.01)
+    assert limiter.limit > 2
+
+
+def test_release_without_latency_leaves_limit():
+    limiter = AdaptiveLimiter(4, 1, 8)
+    run_request(limiter, None, ok=False)
+    assert limiter.limit == 4
+    assert limiter.requests == 1
+    assert limiter.in_flight == 0
+
+
+def test_acquire_blocks_at_limit():
+    limiter  = AdaptiveLimiter(1, 1, 1)
+    acquired = threading.Event()
+
+    def second_request():
+        limiter.acquire()
+        acquired.set()
+
+    limiter.acquire()
+    waiter = threading.Thread(target=second_request)
+    waiter.start()
+    assert not acquired.wait(0.05)
+    limiter.release(0.01)
+    assert acquired.wait(1)
+    waiter.join()
+    assert limiter.in_flight == 1
+
+
+def test_retry_after_pauses_new_requests():
+    limiter = AdaptiveLimiter(4, 1, 8)
+    limiter.backoff(0.2)
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.15
+
+
+def test_summary():
+    limiter = AdaptiveLimiter(4, 1, 8)
+    assert limiter.summary() == "4 requests in flight (ranged 4-4 of 8), 0 requests, 0 throttled"
+    run_request(limiter, 0.02)
+    assert "1 requests, 0 throttled, ~20 ms latency" in limiter.summary()
+
+
+## -------------------------------------------------------------------------- ##
+## HTTP CLIENT
+## -------------------------------------------------------------------------- ##
+
+URL = "https://statsapi.mlb.com/api/v1/schedule"
+
+
+def test_throttled_response_cuts_limit(replay, monkeypatch):
+    limiter = AdaptiveLimiter(8, 1, 8)
+    monkeypatch.setattr(http, "http_limiter", limiter)
+    replay.save("GET", URL, 200, {}, b"ok")
+    replay.save("GET", URL, 429, {"Retry-After": "1"}, b"")
+
+    assert http.get(URL).status_code == 200
+    assert limiter.concurrency == 8
+    assert http.get(URL).status_code == 429
+    assert limiter.concurrency == 4
+    assert limiter.requests == 2
+    assert limiter.in_flight == 0
+
+
+def test_not_found_is_not_congestion(replay, monkeypatch):
+    limiter = AdaptiveLimiter(4, 1, 8)
+    monkeypatch.setattr(http, "http_limiter", limiter)
+    replay.save("GET", URL, 404, {}, b"")
+    assert http.get(URL).status_code == 404
+    assert limiter.limit > 4
+
+
+def test_rate_limit_is_shared(replay):
+    replay.save("GET", URL, 200, {}, b"ok")
+    http.set_rate_limit(20, 1)
+    try:
+        start = time.monotonic()
+        for _ in range(3):
+            http.get(URL)
+        assert time.monotonic() - start >= 0.09
+    finally:
+        http.set_rate_limit(0)
+    assert http._rate_limit is None
+
+
+def build_response(status: int, elapsed: float, retried: bool = False) -> requests.Response:
+    history  = (RequestHistory("GET", URL, None, 503, None),) if retried else ()
+    response = requests.Response()
+    response.status_code = status
+    response.elapsed     = timedelta(seconds=elapsed)
+    response.raw         = SimpleNamespace(retries=Retry(total=3, history=history))
+    return response
+
+
+def send_through(monkeypatch, limiter: AdaptiveLimiter, response: requests.Response, delay: float = 0.0):
+    def session_get(*args, **kwargs):
+        time.sleep(delay)
+        return response
+
+    monkeypatch.setattr(http, "http_limiter", limiter)
+    monkeypatch.setattr(http, "_rate_limit", None)
+    monkeypatch.setattr(http, "get_session", lambda: SimpleNamespace(get=session_get))
+    return http.get(URL)
+
+
+def test_latency_is_the_servers_not_ours(monkeypatch):
+    limiter = AdaptiveLimiter(4, 1, 8)
+    send_through(monkeypatch, limiter, build_response(200, 0.01), delay=0.2)
+    assert limiter._latency == pytest.approx(0.01)
+
+
+def test_retried_response_leaves_limit_alone(monkeypatch):
+    ## The failed attempts already cut the limit through JitterRetry; the
+    ## backoff sleeps in between mustn't count as latency, nor cut it again.
+    limiter = AdaptiveLimiter(4, 1, 8)
+    send_through(monkeypatch, limiter, build_response(503, 30.0, retried=True))
+    assert limiter.limit == 4
+    assert limiter._latency is None
+    assert limiter.in_flight == 0
+
+
+def test_failed_request_frees_slot(monkeypatch):
+    limiter = AdaptiveLimiter(4, 1, 8)
+
+    def session_get(*args, **kwargs):
+        raise requests.ConnectionError("refused")
+
+    monkeypatch.setattr(http, "http_limiter", limiter)
+    monkeypatch.setattr(http, "get_session", lambda: SimpleNamespace(get=session_get))
+    with pytest.raises(requests.ConnectionError):
+        http.get(URL)
+    assert limiter.in_flight == 0
+    assert limiter.limit == 4
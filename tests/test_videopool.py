@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import pytest
+
+from pathlib import Path
+
+from src.hbp.libhbp import func_general as gen
+from src.hbp.libhbp.videopool import VideoDownloadPool
+
+
+VIDEO_URL = "https://sporty-clips.mlb.com/<<PLAY_ID>>.mp4"
+VIDEO     = b"\x00\x01" * 2048
+
+
+@pytest.fixture
+def pool(tmp_path):
+    with VideoDownloadPool(2, tmp_path) as video_pool:
+        yield video_pool
+
+
+def publish(replay, savant, play_id: str, status: int = 200, headers: dict = None, body: bytes = VIDEO):
+    video_url = VIDEO_URL.replace("<<PLAY_ID>>", play_id)
+    savant.video_urls[play_id] = video_url
+    replay.save("GET", video_url, status, headers or {}, body)
+
+
+def download(pool, *play_ids) -> dict:
+    for play_id in play_ids:
+        pool.submit(745123, play_id)
+    return {result.play_id: result for result in pool.completed(block=True)}
+
+
+def test_download_counts_bytes(replay, savant, pool):
+    publish(replay, savant, "new")
+    result = download(pool, "new")["new"]
+    assert result.ok
+    assert result.nbytes == len(VIDEO)
+    assert Path(result.path).read_bytes() == VIDEO
+    assert (pool.downloaded, pool.skipped, pool.failed, pool.total_bytes) == (1, 0, 0, len(VIDEO))
+
+
+def test_already_on_disk_is_skipped(replay, savant, pool, tmp_path):
+    gen.get_video_file_path(745123, "old", tmp_path).write_bytes(VIDEO)
+    result = download(pool, "old")["old"]
+    assert result.ok and result.on_disk
+    assert (pool.downloaded, pool.skipped) == (0, 1)
+
+
+def test_part_finished_by_416_counts_as_downloaded(replay, savant, pool, tmp_path):
+    gen.get_video_part_path(gen.get_video_file_path(745123, "whole", tmp_path)).write_bytes(VIDEO)
+    publish(replay, savant, "whole", 416, {"Content-Range": f"bytes */{len(VIDEO)}"}, b"")
+    result = download(pool, "whole")["whole"]
+    assert result.ok and not result.on_disk
+    assert result.nbytes == 0
+    assert (pool.downloaded, pool.skipped) == (1, 0)
+
+
+def test_resumed_download_counts_only_new_bytes(replay, savant, pool, tmp_path):
+    gen.get_video_part_path(gen.get_video_file_path(745123, "half", tmp_path)).write_bytes(VIDEO[:1000])
+    publish(replay, savant, "half", 206, {"Content-Range": f"bytes 1000-{len(VIDEO) - 1}/{len(VIDEO)}"}, VIDEO[1000:])
+    assert download(pool, "half")["half"].nbytes == len(VIDEO) - 1000
+
+
+def test_failures_keep_their_reason(replay, savant, pool):
+    savant.video_urls["later"] = None
+    savant.video_urls["nopage"] = ConnectionError("page refused")
+    publish(replay, savant, "gone", 404, body=b"")
+
+    results = download(pool, "later", "nopage", "gone")
+    assert results["later"].error == "video unavailable"
+    assert "page refused" in results["nopage"].error
+    assert "404" in results["gone"].error
+    assert savant.forgotten == ["gone"]
+    assert pool.failed == 3